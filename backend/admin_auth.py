@@ -0,0 +1,93 @@
+"""
+Admin credential checks and short-lived session tokens.
+
+The admin password is verified against ADMIN_PASSWORD_HASH, a Werkzeug
+password hash (scrypt by default, ~100 ms per check by design). A successful
+check can be exchanged for a session token signed with HMAC-SHA256 and valid
+for ADMIN_SESSION_SECONDS, so the admin UI's many calls per page are
+authorised by one HMAC instead of a password hash each.
+
+Tokens are signed with a key derived from ADMIN_SESSION_SECRET (falling back
+to the Supabase service key) and the stored credentials, so changing the
+username or password invalidates every outstanding token.
+
+Print a hash for ADMIN_PASSWORD_HASH with:
+
+    python admin_auth.py
+"""
+import getpass
+import hashlib
+import hmac
+import os
+import threading
+from itsdangerous import BadData, URLSafeTimedSerializer
+from werkzeug.security import check_password_hash, generate_password_hash
+from config import Config
+
+_password_hash = None
+_serializer = None
+_lock = threading.Lock()
+
+
+def _get_password_hash() -> str:
+    """ADMIN_PASSWORD_HASH, or a hash of the plaintext ADMIN_PASSWORD made once at startup."""
+    global _password_hash
+    if _password_hash is None:
+        with _lock:
+            if _password_hash is None:
+                if Config.ADMIN_PASSWORD_HASH:
+                    _password_hash = Config.ADMIN_PASSWORD_HASH
+                else:
+                    print("ADMIN_PASSWORD_HASH is not set - hashing the plaintext ADMIN_PASSWORD")
+                    _password_hash = generate_password_hash(Config.ADMIN_PASSWORD)
+    return _password_hash
+
+
+def _get_serializer() -> URLSafeTimedSerializer:
+    global _serializer
+    if _serializer is None:
+        with _lock:
+            if _serializer is None:
+                secret = Config.ADMIN_SESSION_SECRET or Config.SUPABASE_SERVICE_KEY
+                if not secret:
+                    # Tokens then only verify on the instance that issued them
+                    secret = os.urandom(32).hex()
+                credentials = Config.ADMIN_PASSWORD_HASH or hashlib.sha256(Config.ADMIN_PASSWORD.encode()).hexdigest()
+                key = hmac.new(secret.encode(), f"{Config.ADMIN_USERNAME}\0{credentials}".encode(), hashlib.sha256).digest()
+                _serializer = URLSafeTimedSerializer(
+                    key, salt='admin-session', signer_kwargs={'digest_method': hashlib.sha256}
+                )
+    return _serializer
+
+
+def check_credentials(username: str, password: str) -> bool:
+    """
+    Check an admin username and password.
+
+    Both parts are always checked, with constant-time comparisons, so the
+    response time doesn't reveal which one was wrong.
+    """
+    username_ok = hmac.compare_digest((username or '').encode(), Config.ADMIN_USERNAME.encode())
+    password_ok = check_password_hash(_get_password_hash(), password or '')
+    return username_ok and password_ok
+
+
+def issue_session_token() -> str:
+    """Sign a session token for the admin user."""
+    return _get_serializer().dumps({'u': Config.ADMIN_USERNAME})
+
+
+def check_session_token(token: str) -> bool:
+    """Return True for an untampered token younger than ADMIN_SESSION_SECONDS."""
+    try:
+        payload = _get_serializer().loads(token, max_age=Config.ADMIN_SESSION_SECONDS)
+    except BadData:
+        return False
+    return isinstance(payload, dict) and payload.get('u') == Config.ADMIN_USERNAME
+
+
+if __name__ == '__main__':
+    password = getpass.getpass('Admin password: ')
+    if password != getpass.getpass('Repeat password: '):
+        raise SystemExit('Passwords do not match')
+    print(generate_password_hash(password))
@@ -2,6 +2,8 @@ import os
 from flask import Flask
 from flask_cors import CORS
 from config import config
+from metrics import init_metrics
+from content_encoding import init_compression
 
 def create_app(config_name=None):
     """Application factory for Flask app."""
@@ -14,6 +16,13 @@ def create_app(config_name=None):
     # Setup CORS
     CORS(app, origins=app.config.get('CORS_ORIGINS', ['http://localhost:5173']))
     
+    # Request timing, Server-Timing headers and /admin/metrics data
+    init_metrics(app)
+    
+    # gzip/brotli/zstd for responses the client accepts encoded; registered
+    # after metrics so request timing includes compression
+    init_compression(app)
+    
     # Register blueprints
     from routes.api import api_bp
     from routes.admin import admin_bp
@@ -21,6 +30,11 @@ def create_app(config_name=None):
     app.register_blueprint(api_bp)
     app.register_blueprint(admin_bp)
     
+    # Fill the catalog cache in the background so the first visitors don't miss
+    if app.config.get('CACHE_PREWARM'):
+        from routes.api import prewarm_catalog
+        prewarm_catalog()
+    
     # Health check endpoint
     @app.route('/health')
     def health_check():
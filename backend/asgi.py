@@ -0,0 +1,167 @@
+"""
+ASGI entry point.
+
+Serves the same Flask app under an ASGI server:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Flask itself stays a WSGI app, so each request runs on a worker thread from
+a pool of ``ASGI_THREADS``, and its Supabase reads share the async client's
+event loop exactly as under gunicorn. asgiref's stock ``WsgiToAsgi`` runs
+every request on one thread-sensitive executor (i.e. one at a time), so the
+WSGI side is bridged here instead, using only the public ASGI and WSGI
+interfaces (PEP 3333).
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app
+from config import Config
+from supabase_client import close_async_clients
+
+
+def build_environ(scope, body: bytes) -> dict:
+    """Translate an ASGI HTTP scope and its request body into a WSGI environ."""
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        # WSGI carries the raw path bytes as latin-1 strings
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for raw_name, raw_value in scope.get('headers', ()):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        value = raw_value.decode('latin-1')
+        if name in environ:
+            # Repeated headers are folded, as an HTTP/1.1 server would
+            value = f"{environ[name]}{'; ' if name == 'HTTP_COOKIE' else ','}{value}"
+        environ[name] = value
+    return environ
+
+
+class _Response:
+    """Relays one WSGI response to an ASGI ``send`` from a worker thread."""
+
+    def __init__(self, send):
+        self.send = send
+        self.start = None
+        self.started = False
+        self.content_length = None
+
+    def start_response(self, status: str, headers, exc_info=None):
+        if exc_info is not None and self.started:
+            raise exc_info[1].with_traceback(exc_info[2])
+        self.start = {
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        }
+        for name, value in headers:
+            if name.lower() == 'content-length':
+                self.content_length = int(value)
+        return self.write
+
+    def write(self, data: bytes) -> None:
+        if not self.started:
+            self.started = True
+            self.send(self.start)
+        if data:
+            self.send({'type': 'http.response.body', 'body': data, 'more_body': True})
+
+    def finish(self) -> None:
+        if not self.started:
+            self.started = True
+            self.send(self.start)
+        self.send({'type': 'http.response.body'})
+
+
+def run_wsgi(application, environ: dict, response: _Response) -> None:
+    """Call a WSGI app and stream its response, never past its Content-Length."""
+    result = application(environ, response.start_response)
+    sent = 0
+    try:
+        for output in result:
+            if response.content_length is not None:
+                output = output[:response.content_length - sent]
+            response.write(output)
+            sent += len(output)
+            if sent == response.content_length:
+                break
+    finally:
+        # Runs the response's close callbacks, as a WSGI server must
+        if hasattr(result, 'close'):
+            result.close()
+    response.finish()
+
+
+class FlaskASGI:
+    """ASGI application that runs a WSGI app on a thread pool and handles lifespan."""
+
+    def __init__(self, wsgi_application, threads: int = None):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(max_workers=threads or Config.ASGI_THREADS, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _http(self, scope, receive, send):
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        loop = asyncio.get_running_loop()
+
+        def send_from_thread(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        environ = build_environ(scope, b''.join(chunks))
+        await loop.run_in_executor(self.executor, run_wsgi, self.wsgi_application, environ, _Response(send_from_thread))
+
+    async def _lifespan(self, receive, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await loop.run_in_executor(None, close_async_clients)
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_name=None) -> FlaskASGI:
+    """Build the Flask app and wrap it for an ASGI server."""
+    return FlaskASGI(create_app(config_name))
+
+
+app = create_asgi_app()
@@ -0,0 +1,62 @@
+"""
+Load benchmark: WSGI (gunicorn gthread) versus ASGI (uvicorn + asgi.py).
+
+Starts ``fake_supabase.py`` with a fixed per-request latency, boots the
+backend under each server in turn against it, drives a fixed number of
+concurrent clients at the read endpoints and reports throughput and latency
+percentiles for both as JSON. The processes and the load driver are shared
+with ``loadtest.py``.
+
+Usage (from the backend directory):
+
+    python benchmarks/bench_async.py [--concurrency 64] [--duration 10]
+        [--latency-ms 50] [--threads 16] [--paths /api/templates /api/bundle]
+"""
+import argparse
+import asyncio
+import json
+
+from loadtest import drive, start_backend, start_fake_supabase, stop
+
+# Uncached reads, so every request reaches (fake) Supabase
+BENCH_ENV = {'CACHE_TTL_SECONDS': '0', 'CACHE_STALE_SECONDS': '0', 'FLASK_ENV': 'production'}
+
+
+def run_mode(mode: str, args, supabase_url: str) -> dict:
+    env = dict(BENCH_ENV, SUPABASE_URL=supabase_url, SUPABASE_KEY='a.b.c',
+               SUPABASE_SERVICE_KEY='a.b.c', ASGI_THREADS=str(args.threads))
+    backend, base_url = start_backend(mode, args.threads, env)
+    try:
+        scenario = ('GET', lambda turn: args.paths[turn % len(args.paths)], None)
+        return asyncio.run(drive(base_url, scenario, args.concurrency, args.duration, warmup=len(args.paths)))
+    finally:
+        stop(backend)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare WSGI and ASGI serving under concurrent load.')
+    parser.add_argument('--concurrency', type=int, default=64, help='requests kept in flight')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per server')
+    parser.add_argument('--latency-ms', type=float, default=50, help='fake Supabase latency per call')
+    parser.add_argument('--threads', type=int, default=16, help='gunicorn threads and ASGI_THREADS')
+    parser.add_argument('--paths', nargs='+', default=['/api/templates', '/api/bundle', '/api/team'])
+    args = parser.parse_args()
+
+    fake, supabase_url = start_fake_supabase(args.latency_ms)
+    try:
+        results = {mode: run_mode(mode, args, supabase_url) for mode in ('wsgi', 'asgi')}
+    finally:
+        stop(fake)
+
+    print(json.dumps({
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'supabase_latency_ms': args.latency_ms,
+        'threads': args.threads,
+        'paths': args.paths,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Micro-benchmark: notification email rendering throughput.
+
+Compares the precompiled Jinja templates in email_utils against the old
+approach of rebuilding the whole HTML document with an f-string per message.
+The UTF-8 encode case shows what pre-encoding the templates' static text
+could save at most, next to the MIME build and serialization it would sit in.
+
+Usage (from the backend directory):
+
+    python benchmarks/bench_email_render.py [--iterations N]
+"""
+import argparse
+import os
+import sys
+import timeit
+from html import escape
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from email.mime.multipart import MIMEMultipart  # noqa: E402
+from email.mime.text import MIMEText  # noqa: E402
+from email_utils import build_contact_message, render_notification, _contact_context  # noqa: E402
+
+CONTACT = {
+    'name': 'Jordan <Dev>',
+    'email': 'jordan@example.com',
+    'phone': '+1 555 0100',
+    'message': 'We need a final year project on traffic prediction & signal optimization.\n' * 8,
+    'submitted_at': '2024-05-01T10:30:00+00:00',
+}
+
+
+def legacy_render(contact_data):
+    """The pre-template implementation: one large f-string per message (escaping added for fairness)."""
+    name = escape(contact_data.get('name', 'N/A'))
+    email = escape(contact_data.get('email', 'N/A'))
+    phone = escape(contact_data.get('phone', 'Not provided'))
+    message = escape(contact_data.get('message', 'No message'))
+    timestamp = contact_data.get('submitted_at')
+    text_content = f"""
+New Contact Form Submission
+===========================
+
+Name: {name}
+Email: {email}
+Phone: {phone}
+
+Message:
+{message}
+
+---
+Submitted at: {timestamp}
+    """
+    html_content = f"""
+<!DOCTYPE html>
+<html>
+<head>
+<style>
+    body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; }}
+    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+    .header {{ background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%); color: white; padding: 30px; border-radius: 12px 12px 0 0; }}
+    .header h1 {{ margin: 0; font-size: 24px; }}
+    .content {{ background: #f8fafc; padding: 30px; border: 1px solid #e2e8f0; border-top: none; border-radius: 0 0 12px 12px; }}
+    .field {{ margin-bottom: 20px; }}
+    .field-label {{ font-size: 12px; font-weight: 600; color: #64748b; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 5px; }}
+    .field-value {{ font-size: 16px; color: #1e293b; }}
+    .message-box {{ background: white; padding: 20px; border-radius: 8px; border: 1px solid #e2e8f0; white-space: pre-wrap; }}
+    .footer {{ text-align: center; margin-top: 20px; font-size: 12px; color: #94a3b8; }}
+</style>
+</head>
+<body>
+<div class="container">
+    <div class="header"><h1>🚀 New Contact Form Submission</h1></div>
+    <div class="content">
+        <div class="field"><div class="field-label">Name</div><div class="field-value">{name}</div></div>
+        <div class="field"><div class="field-label">Email</div><div class="field-value"><a href="mailto:{email}">{email}</a></div></div>
+        <div class="field"><div class="field-label">Phone</div><div class="field-value">{phone}</div></div>
+        <div class="field"><div class="field-label">Message</div><div class="message-box">{message}</div></div>
+    </div>
+    <div class="footer">Submitted on {timestamp} via DevForge Contact Form</div>
+</div>
+</body>
+</html>
+    """
+    return text_content, html_content
+
+
+def legacy_message(contact_data):
+    text_content, html_content = legacy_render(contact_data)
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = f"🚀 New Contact: {contact_data.get('name', 'Unknown')} - DevForge"
+    msg.attach(MIMEText(text_content, 'plain'))
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    cases = {
+        'legacy f-string render': lambda: legacy_render(CONTACT),
+        'legacy render + MIME build': lambda: legacy_message(CONTACT).as_bytes(),
+        'template render': lambda: render_notification('contact_notification', contact=_contact_context(CONTACT)),
+        'template render + UTF-8 encode': lambda: [part.encode() for part in render_notification(
+            'contact_notification', contact=_contact_context(CONTACT))],
+        'template render + MIME build': lambda: build_contact_message(CONTACT).as_bytes(),
+    }
+    for label, func in cases.items():
+        seconds = min(timeit.repeat(func, number=args.iterations, repeat=3))
+        print(f"{label:32s} {args.iterations / seconds:12,.0f} msgs/s  {seconds / args.iterations * 1e6:8.1f} us/msg")
+
+
+if __name__ == '__main__':
+    main()
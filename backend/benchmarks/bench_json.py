@@ -0,0 +1,93 @@
+"""
+JSON serialization benchmark for catalog responses.
+
+Builds realistic ``/api/templates`` payloads (hundreds of templates with tag
+arrays, from ``fake_supabase.seed_tables``) and times, per response:
+
+- ``jsonify`` with the stdlib encoder and with orjson,
+- ``conditional_json`` serving a cached body (identity and each encoding),
+- the cost and size of each encoding at its per-response and cached levels.
+
+Usage (from the backend directory):
+
+    python benchmarks/bench_json.py [--templates 100 500 1000] [--runs 200]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, jsonify  # noqa: E402
+from fake_supabase import seed_tables  # noqa: E402
+from json_provider import FastJSONProvider, orjson  # noqa: E402
+
+
+def time_per_call(func, runs: int) -> float:
+    """Median milliseconds per call over ``runs`` calls (after one warm-up call)."""
+    func()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def make_app(backend: str) -> Flask:
+    app = Flask(__name__)
+    app.config['JSON_BACKEND'] = backend
+    app.json = FastJSONProvider(app)
+    return app
+
+
+def bench_payload(rows: list, runs: int) -> dict:
+    from content_encoding import ENCODINGS, compress
+    from http_cache import body_cache, conditional_json
+
+    result = {}
+    backends = ['stdlib'] + (['orjson'] if orjson is not None else [])
+    for backend in backends:
+        app = make_app(backend)
+        with app.app_context():
+            result[f'jsonify_{backend}_ms'] = time_per_call(lambda: jsonify({'success': True, 'data': rows}), runs)
+
+    app = make_app(backends[-1])
+    body_cache.clear()
+    for encoding in (None,) + ENCODINGS:
+        headers = {'Accept-Encoding': encoding} if encoding else {}
+        with app.test_request_context('/api/templates', headers=headers):
+            label = encoding or 'identity'
+            result[f'cached_body_{label}_ms'] = time_per_call(lambda: conditional_json(rows), runs)
+
+    with app.app_context():
+        body = jsonify({'success': True, 'data': rows}).get_data()
+    result['body_bytes'] = len(body)
+    levels = {'gzip': (6, 9), 'br': (4, 9, 11), 'zstd': (3, 15, 19)}
+    for encoding in ENCODINGS:
+        for level in levels[encoding]:
+            start = time.perf_counter()
+            encoded = compress(body, encoding, level)
+            result[f'{encoding}_{level}_bytes'] = len(encoded)
+            result[f'{encoding}_{level}_compress_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON encoding and cached bodies for catalog payloads.')
+    parser.add_argument('--templates', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    report = {'orjson_available': orjson is not None, 'payloads': {}}
+    for count in args.templates:
+        rows = seed_tables(count)['project_templates']
+        report['payloads'][f'{count}_templates'] = bench_payload(rows, args.runs)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Cold-start benchmark for the serverless entry point.
+
+Boots ``api/index.py`` in fresh interpreters with ``-X importtime`` and
+reports the import-time breakdown by top-level package, the wall-clock time
+to build the app and serve ``/health``, and which heavy modules the health
+check pulled in (it should pull in none).
+
+Usage (from the backend directory):
+
+    python benchmarks/bench_startup.py [--runs N] [--top N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'api'))
+
+HEAVY_MODULES = ('supabase', 'postgrest', 'httpx', 'smtplib', 'email.mime.text', 'storage3', 'gotrue')
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {API_DIR!r})
+import index
+ready = time.perf_counter()
+index.app.test_client().get('/health')
+done = time.perf_counter()
+print(json.dumps({{
+    'import_and_create_app_ms': (ready - start) * 1000,
+    'first_health_request_ms': (done - ready) * 1000,
+    'heavy_modules_loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once():
+    """Run one cold start; return (probe result, {top-level package: self time in us})."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        capture_output=True, text=True, check=True,
+    )
+    by_package = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        by_package[name.strip().split('.')[0]] += int(self_us)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), by_package
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure serverless cold-start time.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='packages to list in the breakdown')
+    args = parser.parse_args()
+
+    results, packages = [], defaultdict(list)
+    for _ in range(args.runs):
+        result, by_package = run_once()
+        results.append(result)
+        for name, us in by_package.items():
+            packages[name].append(us)
+
+    breakdown = sorted(
+        ((name, statistics.median(values) / 1000) for name, values in packages.items()),
+        key=lambda item: item[1], reverse=True,
+    )
+    report = {
+        'runs': args.runs,
+        'import_and_create_app_ms_median': statistics.median(r['import_and_create_app_ms'] for r in results),
+        'first_health_request_ms_median': statistics.median(r['first_health_request_ms'] for r in results),
+        'total_import_self_time_ms_median': sum(ms for _, ms in breakdown),
+        'heavy_modules_loaded_by_health': results[-1]['heavy_modules_loaded'],
+        'import_time_by_package_ms': {name: round(ms, 2) for name, ms in breakdown[:args.top]},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
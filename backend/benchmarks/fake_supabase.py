@@ -0,0 +1,520 @@
+"""
+Offline stand-in for Supabase's PostgREST and Storage APIs, for benchmarks.
+
+Serves ``/rest/v1/<table>`` from in-memory rows and ``/storage/v1/object/``
+from an in-memory bucket, with a configurable delay per request, so the
+backend can be load-tested without a network. It implements the subset the
+backend uses: ``select``, ``eq``/``neq``/``lt``/``gt``/``lte``/``gte``/``is``/
+``in``/``cs`` filters, nested ``or``/``and`` trees, ``order``, ``limit``/
+``offset``, ``Prefer: count=exact``, single-object responses,
+insert/update/delete with ``return=representation`` (an insert reusing an
+``id`` is refused whole, like a primary key violation), the
+``reorder_display_order``, ``search_templates`` (with plain word matching
+instead of Postgres text search), ``take_rate_limit_token`` and
+``apply_row_patches`` RPCs, row versions bumped on update, and object
+upload (with ``x-upsert``), list, public download and delete. ``GET /__stats``
+reports request and row counts, and ``POST /__fault`` with
+``{"status": 503, "latency_ms": 0}`` simulates a brownout: every later
+request waits the extra latency and, if ``status`` is set, fails with it
+(``{}`` clears the fault).
+
+Usage (from the backend directory):
+
+    python benchmarks/fake_supabase.py [--port 54321] [--latency-ms 20] [--rows 50]
+
+then point the backend at it with ``SUPABASE_URL=http://127.0.0.1:54321``
+and any JWT-shaped key (e.g. ``a.b.c``).
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+
+# ==================== Seed data ====================
+
+def seed_tables(rows: int = 50) -> dict:
+    """Build deterministic rows for every table the backend reads."""
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    stamp = lambda i: (base + timedelta(hours=i)).isoformat()
+    difficulties = ('Beginner', 'Intermediate', 'Advanced')
+    tags = ('react', 'python', 'flask', 'supabase', 'ml', 'iot')
+    return {
+        'project_templates': [{
+            'id': str(uuid.UUID(int=i + 1)),
+            'title': f'Template {i}',
+            'description': 'A starter project with a realistic description length. ' * 4,
+            'image_url': f'https://example.com/templates/{i}/640.webp',
+            'difficulty': difficulties[i % 3],
+            'tags': [tags[i % 6], tags[(i + 1) % 6]],
+            'live_preview_url': None,
+            'is_featured': i % 5 == 0,
+            'display_order': i,
+            'created_at': stamp(i),
+            'updated_at': stamp(i),
+            'version': 1,
+        } for i in range(rows)],
+        'portfolio_projects': [{
+            'id': str(uuid.UUID(int=10_000 + i)),
+            'title': f'Project {i}',
+            'description': 'Shipped for a client. ' * 8,
+            'image_url': f'https://example.com/portfolio/{i}/640.webp',
+            'tags': [tags[i % 6]],
+            'live_link': 'https://example.com',
+            'is_featured': i % 4 == 0,
+            'display_order': i,
+            'created_at': stamp(i),
+            'updated_at': stamp(i),
+            'version': 1,
+        } for i in range(max(1, rows // 5))],
+        'team_members': [{
+            'id': str(uuid.UUID(int=20_000 + i)),
+            'name': f'Member {i}',
+            'role': 'Engineer',
+            'bio': 'Builds things. ' * 6,
+            'skills': ['python', 'react'],
+            'avatar_url': None,
+            'github_url': None,
+            'linkedin_url': None,
+            'color_theme': 'primary',
+            'display_order': i,
+            'created_at': stamp(i),
+            'updated_at': stamp(i),
+            'version': 1,
+        } for i in range(6)],
+        'contact_submissions': [{
+            'id': str(uuid.UUID(int=30_000 + i)),
+            'name': f'Visitor {i}',
+            'email': f'visitor{i}@example.com',
+            'phone': '',
+            'project_type': 'Web App',
+            'message': 'Hello, I would like a quote. ' * 5,
+            'is_read': i % 3 == 0,
+            'submitted_at': stamp(i),
+        } for i in range(rows * 4)],
+        'notification_outbox': [],
+        'rate_limit_buckets': [],
+    }
+
+
+# Tables whose rows carry a ``version`` bumped on every update (migrations/008)
+VERSIONED_TABLES = ('project_templates', 'portfolio_projects', 'team_members')
+
+
+# ==================== PostgREST query semantics ====================
+
+def _split_top(text: str) -> list:
+    """Split on commas that are outside parentheses and double quotes."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for index, char in enumerate(text):
+        if char == '"' and (index == 0 or text[index - 1] != '\\'):
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return [part for part in parts if part]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return value
+
+
+def _coerce(raw: str, like):
+    """Convert a filter value to the type of the row value it is compared with."""
+    if isinstance(like, bool):
+        return raw.lower() == 'true'
+    if isinstance(like, int):
+        return int(raw)
+    if isinstance(like, float):
+        return float(raw)
+    return raw
+
+
+def _compare(operator: str, value, raw: str) -> bool:
+    if operator == 'is':
+        return value is None if raw == 'null' else str(value).lower() == raw
+    if operator == 'in':
+        options = [_unquote(item) for item in _split_top(raw.strip('()'))]
+        return value is not None and str(value) in options
+    if operator == 'cs':
+        wanted = json.loads(raw) if raw.startswith('[') else [_unquote(v) for v in _split_top(raw.strip('{}'))]
+        return isinstance(value, list) and all(item in value for item in wanted)
+    if value is None:
+        return False
+    target = _coerce(_unquote(raw), value)
+    return {
+        'eq': value == target, 'neq': value != target,
+        'lt': value < target, 'lte': value <= target,
+        'gt': value > target, 'gte': value >= target,
+    }[operator]
+
+
+def _condition(expression: str):
+    """Compile ``col.op.value`` or ``and(...)``/``or(...)`` into a row predicate."""
+    for logic, combine in (('and(', all), ('or(', any)):
+        if expression.startswith(logic):
+            children = [_condition(part) for part in _split_top(expression[len(logic):-1])]
+            return lambda row, children=children, combine=combine: combine(child(row) for child in children)
+    column, operator, raw = expression.split('.', 2)
+    negate = operator == 'not'
+    if negate:
+        operator, raw = raw.split('.', 1)
+    return lambda row: _compare(operator, row.get(column), raw) != negate
+
+
+def _sort(rows: list, order: str) -> list:
+    """Apply ``order=a,b.desc`` with PostgreSQL's NULLS LAST / NULLS FIRST defaults."""
+    for term in reversed(order.split(',')):
+        column, _, direction = term.partition('.')
+        desc = direction.startswith('desc')
+        present = sorted((r for r in rows if r.get(column) is not None), key=lambda r: r[column], reverse=desc)
+        missing = [r for r in rows if r.get(column) is None]
+        rows = missing + present if desc else present + missing
+    return rows
+
+
+def _project(row: dict, select: str) -> dict:
+    if not select or select == '*':
+        return dict(row)
+    return {column.strip(): row.get(column.strip()) for column in select.split(',')}
+
+
+# ==================== HTTP server ====================
+
+class FakeSupabase:
+    """In-memory tables plus the latency every request waits before answering."""
+
+    def __init__(self, rows: int = 50, latency: float = 0.0):
+        self.tables = seed_tables(rows)
+        self.latency = latency
+        self.objects = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.fault = {}
+        # RPC names answered as if their migration hadn't been applied
+        self.missing_functions = set()
+
+    def select(self, table: str, params: list) -> list:
+        rows = list(self.tables.get(table, []))
+        for key, value in params:
+            if key in ('select', 'order', 'limit', 'offset'):
+                continue
+            predicate = _condition(f'{key}{value}' if key in ('or', 'and') else f'{key}.{value}')
+            rows = [row for row in rows if predicate(row)]
+        return rows
+
+    def window(self, rows: list, params: dict) -> list:
+        if 'order' in params:
+            rows = _sort(rows, params['order'])
+        offset = int(params.get('offset', 0))
+        limit = params.get('limit')
+        return rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+
+    def insert(self, table: str, payload) -> list:
+        """Insert rows; returns None without inserting any if an ``id`` is already taken."""
+        now = datetime.now(timezone.utc).isoformat()
+        items = payload if isinstance(payload, list) else [payload]
+        ids = [row['id'] for row in self.tables.get(table, [])] + [item['id'] for item in items if 'id' in item]
+        if len(ids) != len(set(ids)):
+            return None
+        created = []
+        for item in items:
+            row = {'id': str(uuid.uuid4()), 'created_at': now, 'updated_at': now, **item}
+            if table in VERSIONED_TABLES:
+                row.setdefault('version', 1)
+            if table == 'contact_submissions':
+                row.setdefault('is_read', False)
+                row.setdefault('submitted_at', now)
+                self.tables['notification_outbox'].append({
+                    'id': str(uuid.uuid4()), 'kind': 'contact_notification', 'payload': dict(row),
+                    'status': 'pending', 'attempts': 0, 'created_at': now, 'claimed_at': None,
+                })
+            self.tables.setdefault(table, []).append(row)
+            created.append(row)
+        return created
+
+    def list_objects(self, bucket: str, options: dict) -> list:
+        """Mimic Storage's folder listing: direct children of ``prefix`` matching ``search``."""
+        folder = (options.get('prefix') or '').strip('/')
+        search = options.get('search') or ''
+        entries = []
+        for key, stored in sorted(self.objects.items()):
+            owner, _, name = key.partition('/')
+            directory, _, filename = name.rpartition('/')
+            if owner == bucket and directory == folder and filename.startswith(search):
+                entries.append({'name': filename, 'id': key, 'metadata': {'size': len(stored['data'])}})
+        offset = int(options.get('offset') or 0)
+        return entries[offset:offset + int(options.get('limit') or 100)]
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'objects': len(self.objects),
+            'rows': {table: len(rows) for table, rows in self.tables.items()},
+        }
+
+    def update(self, table: str, row: dict, changes: dict) -> None:
+        row.update(changes)
+        if table in VERSIONED_TABLES:
+            row['version'] = row.get('version', 1) + 1
+            row['updated_at'] = datetime.now(timezone.utc).isoformat()
+
+    def reorder(self, body: dict) -> None:
+        table = body['target_table']
+        positions = dict(zip(body['ordered_ids'], body['positions']))
+        for row in self.tables.get(table, []):
+            if row['id'] in positions and row.get('display_order') != positions[row['id']]:
+                self.update(table, row, {'display_order': positions[row['id']]})
+
+    def apply_patches(self, body: dict) -> dict:
+        """Mimic ``apply_row_patches``: all or nothing, writing only changed columns."""
+        table = body['target_table']
+        rows = {row['id']: row for row in self.tables.get(table, [])}
+        conflicts, missing, plan = [], [], []
+        for patch in body['patches']:
+            row = rows.get(patch['id'])
+            if row is None:
+                missing.append(patch['id'])
+            elif patch.get('version') is not None and row.get('version') != patch['version']:
+                conflicts.append(dict(row))
+            else:
+                plan.append((row, {key: value for key, value in patch['changes'].items() if row.get(key) != value}))
+        if conflicts or missing:
+            return {'rows': [], 'changed': 0, 'conflicts': conflicts, 'missing': missing}
+        for row, changes in plan:
+            if changes:
+                self.update(table, row, changes)
+        return {
+            'rows': [dict(row) for row, _ in plan],
+            'changed': sum(1 for _, changes in plan if changes),
+            'conflicts': [],
+            'missing': [],
+        }
+
+    def take_token(self, body: dict) -> float:
+        """Mimic ``take_rate_limit_token``: refill, spend one token if available, else return the wait."""
+        now = datetime.now(timezone.utc)
+        rows = self.tables['rate_limit_buckets']
+        row = next((row for row in rows if row['bucket_key'] == body['key_name']), None)
+        if row is None:
+            row = {'bucket_key': body['key_name'], 'tokens': body['burst'], 'updated_at': now.isoformat()}
+            rows.append(row)
+        elapsed = (now - datetime.fromisoformat(row['updated_at'])).total_seconds()
+        tokens = min(body['burst'], row['tokens'] + elapsed * body['refill_per_second'])
+        row['updated_at'] = now.isoformat()
+        if tokens >= 1:
+            row['tokens'] = tokens - 1
+            return 0
+        row['tokens'] = tokens
+        return (1 - tokens) / body['refill_per_second']
+
+    def search_templates(self, body: dict) -> dict:
+        """Mimic the ``search_templates`` function: every word must appear, title matches rank higher."""
+        words = (body.get('search_text') or '').lower().split()
+        wanted = body.get('tag_filter') or []
+        matched = []
+        for row in _sort(self.tables['project_templates'], 'display_order,created_at.desc,id'):
+            tags = row.get('tags') or []
+            fields = ((row.get('title') or '').lower(), (row.get('description') or '').lower(), ' '.join(tags).lower())
+            if not all(any(word in field for field in fields) for word in words):
+                continue
+            if not all(tag in tags for tag in wanted):
+                continue
+            rank = sum(weight for word in words for weight, field in zip((1.0, 0.4, 0.2), fields) if word in field)
+            matched.append({**row, 'rank': rank})
+        difficulty = body.get('difficulty_filter')
+        filtered = [row for row in matched if difficulty is None or row.get('difficulty') == difficulty]
+        filtered.sort(key=lambda row: -row['rank'])
+        offset = body.get('result_offset') or 0
+        limit = body.get('result_limit')
+        tag_counts, difficulty_counts = {}, {}
+        for row in filtered:
+            for tag in row.get('tags') or []:
+                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+        for row in matched:
+            if row.get('difficulty'):
+                difficulty_counts[row['difficulty']] = difficulty_counts.get(row['difficulty'], 0) + 1
+        top_tags = sorted(tag_counts.items(), key=lambda item: (-item[1], item[0]))[:body.get('tag_facet_limit', 20)]
+        return {
+            'results': filtered[offset:offset + limit] if limit is not None else filtered[offset:],
+            'total': len(filtered),
+            'facets': {
+                'difficulty': difficulty_counts,
+                'tags': [{'tag': tag, 'count': count} for tag, count in top_tags],
+            },
+        }
+
+
+def make_handler(fake: FakeSupabase):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately; without this, delayed ACKs add ~40 ms
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body=None, headers: dict = None, content_type='application/json') -> None:
+            if isinstance(body, bytes):
+                payload = body
+            else:
+                payload = b'' if body is None else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(payload)
+
+        def _body(self):
+            return json.loads(self.payload) if self.payload else None
+
+        def _handle(self):
+            # postgrest-py sends a body even with GET; always drain it for keep-alive
+            self.payload = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            url = urlsplit(self.path)
+            if url.path == '/__stats':
+                with fake.lock:
+                    return self._reply(200, fake.stats())
+            if url.path == '/__fault':
+                fake.fault = self._body() or {}
+                return self._reply(200, fake.fault)
+            fault = fake.fault
+            delay = fake.latency + fault.get('latency_ms', 0) / 1000
+            if delay:
+                time.sleep(delay)
+            with fake.lock:
+                fake.requests += 1
+                if fault.get('status'):
+                    return self._reply(fault['status'], b'upstream unavailable', content_type='text/plain')
+                if url.path.startswith('/rest/v1/'):
+                    return self._rest(url.path[len('/rest/v1/'):], parse_qsl(url.query, keep_blank_values=True))
+                if url.path.startswith('/storage/v1/object/'):
+                    return self._storage(unquote(url.path[len('/storage/v1/object/'):]))
+                return self._reply(404, {'message': 'not found'})
+
+        def _rest(self, table: str, params: list):
+            options = dict(params)
+            if table.startswith('rpc/'):
+                body = self._body() or {}
+                function = table[len('rpc/'):]
+                if function in fake.missing_functions:
+                    return self._reply(404, {'code': 'PGRST202', 'details': None, 'hint': None,
+                                             'message': f'Could not find the function public.{function} in the schema cache'})
+                if table == 'rpc/reorder_display_order':
+                    fake.reorder(body)
+                if table == 'rpc/search_templates':
+                    return self._reply(200, fake.search_templates(body))
+                if table == 'rpc/take_rate_limit_token':
+                    return self._reply(200, fake.take_token(body))
+                if table == 'rpc/apply_row_patches':
+                    return self._reply(200, fake.apply_patches(body))
+                return self._reply(200, None)
+            if table not in fake.tables:
+                return self._reply(404, {'message': f'relation "{table}" does not exist'})
+
+            prefer = self.headers.get('Prefer', '')
+            if self.command == 'POST':
+                rows = fake.insert(table, self._body())
+                if rows is None:
+                    return self._reply(409, {'code': '23505', 'details': None, 'hint': None,
+                                             'message': f'duplicate key value violates unique constraint "{table}_pkey"'})
+            elif self.command == 'PATCH':
+                changes = self._body() or {}
+                rows = fake.select(table, params)
+                for row in rows:
+                    fake.update(table, row, changes)
+            elif self.command == 'DELETE':
+                rows = fake.select(table, params)
+                fake.tables[table] = [row for row in fake.tables[table] if row not in rows]
+            else:
+                matched = fake.select(table, params)
+                rows = fake.window(matched, options)
+                headers = {}
+                if 'count=exact' in prefer:
+                    end = f'{len(rows) - 1}' if rows else '*'
+                    headers['Content-Range'] = f"0-{end}/{len(matched)}" if rows else f'*/{len(matched)}'
+                body = [_project(row, options.get('select', '*')) for row in rows]
+                if 'vnd.pgrst.object' in (self.headers.get('Accept') or ''):
+                    if len(body) != 1:
+                        return self._reply(406, {'message': 'JSON object requested, multiple (or no) rows returned'})
+                    body = body[0]
+                return self._reply(200, body, headers)
+
+            body = [_project(row, options.get('select', '*')) for row in rows]
+            status = 201 if self.command == 'POST' else 200
+            return self._reply(status, body if 'return=representation' in prefer else None)
+
+        def _storage(self, path: str):
+            if path.startswith('list/') and self.command == 'POST':
+                return self._reply(200, fake.list_objects(path[len('list/'):], self._body() or {}))
+            if path.startswith('public/') and self.command in ('GET', 'HEAD'):
+                stored = fake.objects.get(path[len('public/'):])
+                if stored is None:
+                    return self._reply(404, {'statusCode': '404', 'error': 'not_found', 'message': 'Object not found'})
+                return self._reply(200, stored['data'], content_type=stored['content_type'])
+            if self.command in ('POST', 'PUT'):
+                if path in fake.objects and self.headers.get('x-upsert') != 'true':
+                    return self._reply(400, {'statusCode': '409', 'error': 'Duplicate',
+                                             'message': 'The resource already exists'})
+                fake.objects[path] = {'data': self.payload,
+                                      'content_type': self.headers.get('Content-Type', 'application/octet-stream')}
+                return self._reply(200, {'Key': path})
+            if self.command == 'DELETE':
+                removed = [prefix for prefix in (self._body() or {}).get('prefixes', [])
+                           if fake.objects.pop(f'{path}/{prefix}', None) is not None]
+                return self._reply(200, [{'name': name} for name in removed])
+            return self._reply(404, {'message': 'not found'})
+
+        do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+    return Handler
+
+
+class FakeSupabaseServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_server(port: int = 0, latency: float = 0.0, rows: int = 50):
+    """
+    Start the fake in a background thread.
+
+    Returns:
+        (server, fake) where ``server.server_address[1]`` is the bound port
+    """
+    fake = FakeSupabase(rows=rows, latency=latency)
+    server = FakeSupabaseServer(('127.0.0.1', port), make_handler(fake))
+    threading.Thread(target=server.serve_forever, name='fake-supabase', daemon=True).start()
+    return server, fake
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve an offline stand-in for Supabase PostgREST and Storage.')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--latency-ms', type=float, default=20, help='delay added to every request')
+    parser.add_argument('--rows', type=int, default=50, help='templates seeded (other tables scale from it)')
+    args = parser.parse_args()
+    server, _ = start_server(args.port, args.latency_ms / 1000, args.rows)
+    print(f'Fake Supabase listening on http://127.0.0.1:{server.server_address[1]}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+"""
+Offline load test for the public and admin endpoints.
+
+Starts ``fake_supabase.py`` (PostgREST and Storage with injected latency) and
+``smtp_sink.py``, boots the backend against them under gunicorn or uvicorn,
+then drives each endpoint in turn at a fixed concurrency. Reports throughput,
+p50/p95/p99 latency and Supabase calls per request for every endpoint as
+JSON, so a caching, pooling or batching change can be measured before and
+after on a machine with no network.
+
+Usage (from the backend directory):
+
+    python benchmarks/loadtest.py [--server wsgi|asgi] [--concurrency 32]
+        [--duration 5] [--latency-ms 20] [--threads 16] [--no-cache] [--rate-limit]
+        [--brownout-status 503] [--brownout-latency-ms 3000]
+        [--endpoints templates bundle ...] [--output run.json] [--baseline before.json]
+"""
+import argparse
+import asyncio
+import base64
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WARMUP_REQUESTS = 2
+ADMIN_USERNAME = 'bench'
+ADMIN_PASSWORD = 'bench'
+ADMIN_BASIC = 'Basic ' + base64.b64encode(f'{ADMIN_USERNAME}:{ADMIN_PASSWORD}'.encode()).decode()
+# Switched to a session token once the backend is up, as the admin UI does
+ADMIN_HEADERS = {'Authorization': ADMIN_BASIC}
+
+# Template ids seeded by fake_supabase.seed_tables()
+TEMPLATE_IDS = [str(uuid.UUID(int=i + 1)) for i in range(10)]
+
+
+def _contact_body(turn: int) -> dict:
+    return {'json': {'name': f'Load test {turn}', 'email': f'load{turn}@example.com',
+                     'message': 'Benchmark contact submission.', 'project_type': 'Web App'}}
+
+
+def _upload_images(count: int = 16) -> list:
+    """Small distinct PNGs, so some uploads are new and the rest hit deduplication."""
+    from PIL import Image
+
+    images = []
+    for index in range(count):
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), (index * 13 % 256, 90, 160)).save(buffer, 'PNG')
+        images.append(buffer.getvalue())
+    return images
+
+
+def _upload_body(images: list):
+    def build(turn: int) -> dict:
+        return {'files': {'file': ('bench.png', images[turn % len(images)], 'image/png')},
+                'headers': ADMIN_HEADERS}
+    return build
+
+
+def endpoints() -> dict:
+    """
+    Scenarios by name: ``(method, path for turn n, request kwargs for turn n)``.
+
+    Paths and bodies are functions of the request's turn so workers rotate
+    through ids and payloads instead of hammering a single row.
+    """
+    admin = lambda turn: {'headers': ADMIN_HEADERS}
+    scenarios = {
+        'templates': ('GET', lambda turn: '/api/templates', None),
+        'templates_page': ('GET', lambda turn: '/api/templates?limit=12&difficulty=Beginner', None),
+        'template_search': ('GET', lambda turn: f"/api/templates/search?q={('starter', 'template', 'project')[turn % 3]}&tags=python", None),
+        'template_detail': ('GET', lambda turn: f'/api/templates/{TEMPLATE_IDS[turn % len(TEMPLATE_IDS)]}', None),
+        'portfolio': ('GET', lambda turn: '/api/portfolio', None),
+        'team': ('GET', lambda turn: '/api/team', None),
+        'bundle': ('GET', lambda turn: '/api/bundle', None),
+        'contact': ('POST', lambda turn: '/api/contact', _contact_body),
+        'admin_stats': ('GET', lambda turn: '/admin/stats', admin),
+        'admin_contacts': ('GET', lambda turn: '/admin/contacts', admin),
+        'admin_templates': ('GET', lambda turn: '/admin/templates', admin),
+        'admin_export': ('GET', lambda turn: '/admin/export/contacts?format=csv', admin),
+    }
+    try:
+        scenarios['admin_upload'] = ('POST', lambda turn: '/admin/upload?folder=bench', _upload_body(_upload_images()))
+    except ImportError:
+        print('Pillow is not installed; skipping admin_upload', file=sys.stderr)
+    return scenarios
+
+
+# ==================== Processes ====================
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port: int, proc: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'server exited with code {proc.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def server_command(mode: str, port: int, threads: int) -> list:
+    """Command that serves ``create_app()`` with gunicorn (wsgi) or ``asgi:app`` with uvicorn."""
+    if mode == 'wsgi':
+        return [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', '1',
+                '--worker-class', 'gthread', '--threads', str(threads), 'app:create_app()']
+    return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+            '--log-level', 'warning', '--no-access-log']
+
+
+def start_fake_supabase(latency_ms: float, rows: int = 50):
+    """Run fake_supabase.py in its own process; returns ``(process, base_url)``."""
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, 'benchmarks', 'fake_supabase.py'),
+         '--port', str(port), '--latency-ms', str(latency_ms), '--rows', str(rows)],
+        stdout=subprocess.DEVNULL,
+    )
+    wait_until_up(port, proc)
+    return proc, f'http://127.0.0.1:{port}'
+
+
+def start_backend(mode: str, threads: int, env: dict):
+    """Boot the backend in its own process; returns ``(process, base_url)``."""
+    port = free_port()
+    proc = subprocess.Popen(server_command(mode, port, threads), cwd=BACKEND_DIR,
+                            env=dict(os.environ, **env), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_until_up(port, proc)
+    return proc, f'http://127.0.0.1:{port}'
+
+
+def stop(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# ==================== Load driver ====================
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+async def drive(base_url: str, scenario: tuple, concurrency: int, duration: float, warmup: int = WARMUP_REQUESTS,
+                after_warmup=None) -> dict:
+    """
+    Keep ``concurrency`` requests of one scenario in flight for ``duration`` seconds.
+
+    Responses with a status of 400 or more count as errors and are left out
+    of the latency percentiles. ``after_warmup`` (if given) is called once
+    the warm-up requests are done, e.g. to start a simulated brownout.
+    """
+    import httpx
+
+    method, path_for, kwargs_for = scenario
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        for turn in range(warmup):  # open a connection and load lazy imports
+            await client.request(method, path_for(turn), **(kwargs_for(turn) if kwargs_for else {}))
+        if after_warmup is not None:
+            after_warmup()
+        stop_at = time.perf_counter() + duration
+        turns = iter(range(warmup, 1 << 62))
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                turn = next(turns)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path_for(turn), **(kwargs_for(turn) if kwargs_for else {}))
+                    ok = response.status_code < 400
+                except Exception:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+
+def start_admin_session(base_url: str) -> None:
+    """Authorise admin scenarios with a Bearer session token instead of the password."""
+    import httpx
+    response = httpx.post(f'{base_url}/admin/session', headers={'Authorization': ADMIN_BASIC})
+    response.raise_for_status()
+    ADMIN_HEADERS['Authorization'] = f"Bearer {response.json()['token']}"
+
+
+def set_fault(supabase_url: str, status: int = 0, latency_ms: float = 0) -> None:
+    """Make the fake Supabase fail with ``status`` and/or answer ``latency_ms`` slower (zeros clear it)."""
+    import httpx
+    httpx.post(f'{supabase_url}/__fault', json={'status': status, 'latency_ms': latency_ms}).raise_for_status()
+
+
+def fake_requests(supabase_url: str) -> int:
+    import httpx
+    return httpx.get(f'{supabase_url}/__stats').json()['requests']
+
+
+def with_changes(results: dict, baseline: dict) -> dict:
+    """Add the percentage change against a previous run to each endpoint."""
+    for name, current in results.items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            continue
+        current['change_pct'] = {
+            key: round((current[key] - before[key]) / before[key] * 100, 1)
+            for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms') if before.get(key)
+        }
+    return results
+
+
+def main():
+    from smtp_sink import start_sink
+
+    scenarios = endpoints()
+    parser = argparse.ArgumentParser(description='Load-test the backend against offline Supabase and SMTP stand-ins.')
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--concurrency', type=int, default=32, help='requests kept in flight')
+    parser.add_argument('--duration', type=float, default=5, help='seconds per endpoint')
+    parser.add_argument('--latency-ms', type=float, default=20, help='fake Supabase latency per call')
+    parser.add_argument('--smtp-latency-ms', type=float, default=0, help='SMTP sink delay per message')
+    parser.add_argument('--threads', type=int, default=16, help='gunicorn threads / ASGI_THREADS')
+    parser.add_argument('--rows', type=int, default=50, help='templates seeded in the fake')
+    parser.add_argument('--no-cache', action='store_true', help='disable the in-process catalog cache')
+    parser.add_argument('--rate-limit', action='store_true',
+                        help='keep contact form rate limiting on (all load comes from one IP, so most contacts get 429)')
+    parser.add_argument('--brownout-status', type=int, default=0,
+                        help='after each warm-up, make fake Supabase fail with this HTTP status (e.g. 503)')
+    parser.add_argument('--brownout-latency-ms', type=float, default=0,
+                        help='after each warm-up, add this much latency to fake Supabase')
+    parser.add_argument('--endpoints', nargs='+', choices=sorted(scenarios), default=list(scenarios))
+    parser.add_argument('--output', help='also write the report to this file')
+    parser.add_argument('--baseline', help='earlier report to compare against')
+    args = parser.parse_args()
+
+    smtp_server, sink = start_sink(latency=args.smtp_latency_ms / 1000)
+    fake, supabase_url = start_fake_supabase(args.latency_ms, args.rows)
+    env = {
+        'FLASK_ENV': 'production',
+        'SUPABASE_URL': supabase_url, 'SUPABASE_KEY': 'a.b.c', 'SUPABASE_SERVICE_KEY': 'a.b.c',
+        'ADMIN_USERNAME': ADMIN_USERNAME, 'ADMIN_PASSWORD': ADMIN_PASSWORD, 'ADMIN_SESSION_SECONDS': '86400',
+        'SMTP_HOST': '127.0.0.1', 'SMTP_PORT': str(smtp_server.server_address[1]),
+        'SMTP_USE_TLS': 'false', 'SMTP_EMAIL': 'bench@localhost', 'SMTP_PASSWORD': '',
+        'NOTIFICATION_EMAIL': 'bench@localhost', 'NOTIFICATION_OUTBOX': 'true',
+        'ASGI_THREADS': str(args.threads),
+    }
+    if args.no_cache:
+        env.update(CACHE_TTL_SECONDS='0', CACHE_STALE_SECONDS='0')
+    if not args.rate_limit:
+        env['RATE_LIMIT_ENABLED'] = 'false'
+
+    results = {}
+    try:
+        backend, base_url = start_backend(args.server, args.threads, env)
+        try:
+            start_admin_session(base_url)
+            for name in args.endpoints:
+                calls_before = fake_requests(supabase_url)
+                brownout = None
+                if args.brownout_status or args.brownout_latency_ms:
+                    brownout = lambda: set_fault(supabase_url, args.brownout_status, args.brownout_latency_ms)
+                try:
+                    result = asyncio.run(drive(base_url, scenarios[name], args.concurrency, args.duration,
+                                               after_warmup=brownout))
+                finally:
+                    if brownout is not None:
+                        set_fault(supabase_url)
+                handled = result['requests'] + result['errors'] + WARMUP_REQUESTS
+                calls = fake_requests(supabase_url) - calls_before
+                result['supabase_calls_per_request'] = round(calls / handled, 2) if handled else 0.0
+                results[name] = result
+                print(f'{name}: {result["throughput_rps"]} rps, p99 {result["p99_ms"]} ms', file=sys.stderr)
+        finally:
+            stop(backend)
+    finally:
+        stop(fake)
+        smtp_server.shutdown()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            with_changes(results, json.load(f))
+
+    report = {
+        'config': {
+            'server': args.server, 'concurrency': args.concurrency, 'duration_s': args.duration,
+            'supabase_latency_ms': args.latency_ms, 'smtp_latency_ms': args.smtp_latency_ms,
+            'threads': args.threads, 'cache': not args.no_cache, 'cpus': os.cpu_count(),
+            'brownout_status': args.brownout_status, 'brownout_latency_ms': args.brownout_latency_ms,
+        },
+        'endpoints': results,
+        'smtp': sink.stats(),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Local SMTP sink for benchmarks: accepts every message and discards it.
+
+Speaks just enough plain SMTP (no TLS, no auth) for smtplib and the
+delivery worker, and counts sessions and messages so a load test can check
+that notifications were actually delivered. Point the backend at it with
+``SMTP_HOST=127.0.0.1 SMTP_PORT=<port> SMTP_USE_TLS=false SMTP_EMAIL=bench@localhost``.
+
+Usage (from the backend directory):
+
+    python benchmarks/smtp_sink.py [--port 8025] [--latency-ms 0]
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class SMTPSink:
+    """Counters shared by every session, plus the delay applied to each message."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.sessions = 0
+        self.messages = 0
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'sessions': self.sessions, 'messages': self.messages, 'bytes': self.bytes}
+
+
+def make_handler(sink: SMTPSink):
+    class Handler(socketserver.StreamRequestHandler):
+        disable_nagle_algorithm = True
+
+        def _reply(self, line: str) -> None:
+            self.wfile.write(f'{line}\r\n'.encode())
+
+        def _read_data(self) -> int:
+            size = 0
+            while True:
+                line = self.rfile.readline()
+                if not line or line in (b'.\r\n', b'.\n'):
+                    return size
+                size += len(line)
+
+        def handle(self):
+            with sink.lock:
+                sink.sessions += 1
+            self._reply('220 localhost SMTP sink ready')
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                verb = line.split(b' ', 1)[0].strip().upper()
+                if verb == b'EHLO':
+                    self.wfile.write(b'250-localhost\r\n250-8BITMIME\r\n250 SIZE 26214400\r\n')
+                elif verb in (b'HELO', b'MAIL', b'RCPT', b'RSET', b'NOOP'):
+                    self._reply('250 OK')
+                elif verb == b'DATA':
+                    self._reply('354 End data with <CR><LF>.<CR><LF>')
+                    size = self._read_data()
+                    if sink.latency:
+                        time.sleep(sink.latency)
+                    with sink.lock:
+                        sink.messages += 1
+                        sink.bytes += size
+                    self._reply('250 OK: queued')
+                elif verb == b'QUIT':
+                    self._reply('221 Bye')
+                    return
+                else:
+                    self._reply('502 Command not implemented')
+
+    return Handler
+
+
+class SMTPSinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def start_sink(port: int = 0, latency: float = 0.0):
+    """
+    Start the sink in a background thread.
+
+    Returns:
+        (server, sink) where ``server.server_address[1]`` is the bound port
+    """
+    sink = SMTPSink(latency=latency)
+    server = SMTPSinkServer(('127.0.0.1', port), make_handler(sink))
+    threading.Thread(target=server.serve_forever, name='smtp-sink', daemon=True).start()
+    return server, sink
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Accept and discard SMTP mail locally.')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay before accepting each message')
+    args = parser.parse_args()
+    server, sink = start_sink(args.port, args.latency_ms / 1000)
+    print(f'SMTP sink listening on 127.0.0.1:{server.server_address[1]}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(sink.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+"""
+Bulk import and streaming export for admin collections.
+
+Imports read NDJSON or CSV from the request stream one record at a time and
+insert them in batches of BULK_IMPORT_BATCH_SIZE, so a large file is never
+held in memory. When PostgREST rejects a batch, its rows are retried one by
+one so every bad row is reported with its line number.
+
+Exports page through a table by keyset, EXPORT_PAGE_SIZE rows per query, and
+yield each page as soon as it arrives. Memory stays flat however large the
+table is.
+"""
+import csv
+import io
+import json
+from config import Config
+from json_provider import orjson
+from pagination import DIFFICULTIES, TABLE_COLUMNS, apply_filters, decode_cursor, fetch_page
+from supabase_client import execute
+
+FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+# Tables that accept imports, with the columns every row must have
+IMPORT_TABLES = {
+    'project_templates': ('title', 'description'),
+    'portfolio_projects': ('title', 'description'),
+    'team_members': ('name', 'role'),
+}
+
+# JSONB array columns; in CSV a cell holds a JSON array or a comma-separated list
+ARRAY_COLUMNS = {'tags', 'skills'}
+BOOLEAN_COLUMNS = {'is_featured', 'is_read'}
+INTEGER_COLUMNS = {'display_order', 'version'}
+
+# Failures listed in an import summary; the count beyond this is still reported
+MAX_REPORTED_ERRORS = 100
+
+# Contact cells are visitor input; prefix these so spreadsheets don't run them as formulas
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class ImportFormatError(ValueError):
+    """Raised when the import format can't be determined; routes answer with a 400."""
+
+
+class RowError(ValueError):
+    """Raised for a single import record that can't be inserted."""
+
+
+def detect_format(requested, content_type) -> str:
+    """
+    Pick ``ndjson`` or ``csv`` from a ``format=`` argument or the Content-Type.
+
+    Raises:
+        ImportFormatError: if neither names a supported format
+    """
+    if requested:
+        if requested not in FORMATS:
+            raise ImportFormatError(f"format must be one of: {', '.join(FORMATS)}")
+        return requested
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    for name, expected in FORMATS.items():
+        if mimetype == expected:
+            return name
+    if mimetype in ('application/jsonl', 'application/json-seq'):
+        return 'ndjson'
+    raise ImportFormatError('Send Content-Type application/x-ndjson or text/csv, or pass format=ndjson|csv')
+
+
+# ==================== Import ====================
+
+def _csv_value(column: str, raw: str):
+    """Convert a CSV cell to the column's JSON type."""
+    if column in ARRAY_COLUMNS:
+        if raw.lstrip().startswith('['):
+            return json.loads(raw)
+        return [item.strip() for item in raw.split(',') if item.strip()]
+    if column in BOOLEAN_COLUMNS:
+        lowered = raw.strip().lower()
+        if lowered in ('true', '1', 'yes'):
+            return True
+        if lowered in ('false', '0', 'no'):
+            return False
+        raise RowError(f'{column} must be true or false')
+    if column in INTEGER_COLUMNS:
+        try:
+            return int(raw)
+        except ValueError:
+            raise RowError(f'{column} must be an integer')
+    return raw
+
+
+def _iter_ndjson(text):
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, RowError(f'Invalid JSON: {str(e)}')
+
+
+def _iter_csv(text):
+    reader = csv.DictReader(text)
+    line_number = 2
+    for record in reader:
+        if None in record:
+            yield line_number, RowError('Row has more cells than the header')
+        else:
+            try:
+                yield line_number, {
+                    column: _csv_value(column, value)
+                    for column, value in record.items()
+                    if value not in (None, '')
+                }
+            except (RowError, ValueError) as e:
+                yield line_number, RowError(str(e))
+        # Quoted cells may span lines, so the next record starts after the reader's position
+        line_number = reader.line_num + 1
+
+
+def iter_records(stream, fmt: str):
+    """
+    Yield ``(line_number, record)`` for each record in an NDJSON or CSV stream.
+
+    A record that can't be parsed is yielded as a RowError instead, so the
+    caller can report it and carry on.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        return _iter_csv(text)
+    return _iter_ndjson(text)
+
+
+def validate_row(table: str, record) -> dict:
+    """
+    Check an import record against the table's columns and types.
+
+    Returns:
+        The row to insert
+
+    Raises:
+        RowError: describing the first problem found
+    """
+    if not isinstance(record, dict):
+        raise RowError('Each record must be an object')
+    columns = TABLE_COLUMNS[table]
+    unknown = [key for key in record if key not in columns]
+    if unknown:
+        raise RowError(f"Unknown columns: {', '.join(sorted(unknown))}")
+    missing = [column for column in IMPORT_TABLES[table] if not record.get(column)]
+    if missing:
+        raise RowError(f"Missing required columns: {', '.join(missing)}")
+    check_values(record)
+    return record
+
+
+def check_values(record: dict) -> None:
+    """
+    Check the types of a row's array, boolean, integer and difficulty values.
+
+    Raises:
+        RowError: describing the first bad value
+    """
+    for column, value in record.items():
+        if value is None:
+            continue
+        if column in ARRAY_COLUMNS and not (isinstance(value, list) and all(isinstance(item, str) for item in value)):
+            raise RowError(f'{column} must be a list of strings')
+        if column in BOOLEAN_COLUMNS and not isinstance(value, bool):
+            raise RowError(f'{column} must be true or false')
+        if column in INTEGER_COLUMNS and (isinstance(value, bool) or not isinstance(value, int)):
+            raise RowError(f'{column} must be an integer')
+    if 'difficulty' in record and record['difficulty'] not in DIFFICULTIES:
+        raise RowError(f"difficulty must be one of: {', '.join(DIFFICULTIES)}")
+
+
+class ImportSummary:
+    """Running totals for an import, with the first MAX_REPORTED_ERRORS failures."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line_number: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': error})
+
+    def as_dict(self) -> dict:
+        return {
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def _insert_batch(supabase, table: str, batch: list, summary: ImportSummary) -> None:
+    """Insert ``(line_number, row)`` pairs, falling back to one insert per row on failure."""
+    # PostgREST requires every object in a bulk insert to have the same keys
+    groups = {}
+    for line_number, row in batch:
+        groups.setdefault(tuple(sorted(row)), []).append((line_number, row))
+    for group in groups.values():
+        try:
+            execute(supabase.table(table).insert([row for _, row in group], returning='minimal'))
+            summary.inserted += len(group)
+            continue
+        except Exception as e:
+            if len(group) == 1:
+                summary.fail(group[0][0], str(e))
+                continue
+        # The batch was rolled back as a whole; retry its rows alone to find the bad ones
+        for line_number, row in group:
+            try:
+                execute(supabase.table(table).insert(row, returning='minimal'))
+                summary.inserted += 1
+            except Exception as e:
+                summary.fail(line_number, str(e))
+
+
+def import_rows(supabase, table: str, records, batch_size: int = None) -> dict:
+    """
+    Validate and insert records in batches.
+
+    Args:
+        supabase: Admin Supabase client
+        table: One of IMPORT_TABLES
+        records: Iterable of ``(line_number, record)`` from ``iter_records``
+        batch_size: Rows per insert (defaults to BULK_IMPORT_BATCH_SIZE)
+
+    Returns:
+        ``{'inserted', 'failed', 'errors', 'errors_truncated'}``; errors are
+        ``{'line', 'error'}`` dicts
+    """
+    batch_size = batch_size or Config.BULK_IMPORT_BATCH_SIZE
+    summary = ImportSummary()
+    batch = []
+    line_number = 0
+    try:
+        for line_number, record in records:
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                batch.append((line_number, validate_row(table, record)))
+            except RowError as e:
+                summary.fail(line_number, str(e))
+                continue
+            if len(batch) >= batch_size:
+                _insert_batch(supabase, table, batch, summary)
+                batch = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        # The rest of the stream can't be read; keep what was parsed so far
+        summary.fail(line_number + 1, f'Unreadable input, import stopped: {str(e)}')
+    if batch:
+        _insert_batch(supabase, table, batch, summary)
+    return summary.as_dict()
+
+
+# ==================== Export ====================
+
+def _ndjson_line(row: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(row) + b'\n'
+    return json.dumps(row, separators=(',', ':'), ensure_ascii=False).encode() + b'\n'
+
+
+def _csv_cell(value, escape_formulas: bool):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if escape_formulas and isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_rows(supabase, table: str, columns: tuple, filters, keyset, fmt: str, page_size: int = None):
+    """
+    Stream a table as NDJSON or CSV, one keyset page per query.
+
+    Args:
+        columns: Columns to export, in CSV header order
+        filters: Filter tuples from ``pagination.parse_filters``
+        keyset: Sort keys; every keyset column must be in ``columns``
+
+    Yields:
+        Encoded chunks, one per page; the CSV header is part of the first
+    """
+    page_size = page_size or Config.EXPORT_PAGE_SIZE
+    escape_formulas = table not in IMPORT_TABLES
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(columns)
+    cursor = None
+    while True:
+        query = apply_filters(supabase.table(table).select(','.join(columns)), filters)
+        rows, next_cursor = fetch_page(query, keyset, page_size, cursor)
+        if fmt == 'csv':
+            writer.writerows([_csv_cell(row.get(column), escape_formulas) for column in columns] for row in rows)
+            chunk = buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        else:
+            chunk = b''.join(_ndjson_line(row) for row in rows)
+        if chunk:
+            yield chunk
+        if next_cursor is None:
+            return
+        cursor = decode_cursor(next_cursor, keyset)
@@ -0,0 +1,370 @@
+"""
+In-process read-through cache for public catalog data.
+
+Entries are keyed by ``(table, query_shape)`` so admin writes can drop
+every cached query for a single table without touching the others. The
+scope may also be a tuple of tables (e.g. for ``/api/bundle``), in which case
+a write to any of them drops the entry.
+
+Caches with a stale window serve an expired entry for up to ``stale_ttl``
+more seconds while one background refresh replaces it. Invalidation after a
+write drops entries outright, so the next read loads the written rows. Loads
+are single-flight: concurrent misses or refreshes of a key share one loader
+call instead of each querying Supabase.
+
+Expired entries stay in the LRU until evicted. If a load fails because
+Supabase is down (circuit open or a transient error), the last value is
+served instead of an error.
+
+An entry built from other entries (the bundle) reads them with
+``stale_ok=False``, so its refresh never rebuilds it from expired rows.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import Config
+from resilience import SupabaseUnavailable, is_transient
+from supabase_client import run_on_io_loop
+
+FRESH, STALE, MISS = 'fresh', 'stale', 'miss'
+
+
+def _tables(scope) -> tuple:
+    """Normalise a cache scope (a table name or a tuple of them) to a tuple."""
+    return scope if isinstance(scope, tuple) else (scope,)
+
+
+class TTLCache:
+    """Thread-safe cache with per-entry expiry, an optional stale window and LRU eviction."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60, stale_ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.fallbacks = 0
+
+    def lookup(self, key) -> tuple:
+        """
+        Return ``(state, value)`` where state is FRESH, STALE or MISS.
+
+        A STALE value is past its TTL but still inside the stale window; the
+        caller should serve it and schedule a refresh.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS, None
+            value, fresh_until, stale_until = entry
+            now = time.monotonic()
+            if now >= stale_until:
+                # Kept (until evicted) for ``fallback``
+                self.misses += 1
+                return MISS, None
+            self._data.move_to_end(key)
+            if now >= fresh_until:
+                self.stale_hits += 1
+                return STALE, value
+            self.hits += 1
+            return FRESH, value
+
+    def get(self, key):
+        """Return ``(True, value)`` for a fresh entry, ``(False, None)`` otherwise."""
+        state, value = self.lookup(key)
+        return (True, value) if state == FRESH else (False, None)
+
+    def fallback(self, key) -> tuple:
+        """Return ``(True, value)`` for any entry still held, however old, else ``(False, None)``."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            self.fallbacks += 1
+            return True, entry[0]
+
+    def generation(self, scope):
+        """Return the invalidation counter for a table (a tuple of them for a multi-table scope)."""
+        with self._lock:
+            return self._generation(scope)
+
+    def _generation(self, scope):
+        if isinstance(scope, tuple):
+            return tuple(self._generations.get(table, 0) for table in scope)
+        return self._generations.get(scope, 0)
+
+    def set(self, key, value, generation: int = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        When ``generation`` is given the value is only stored if the table
+        has not been invalidated since it was read, so a slow read racing
+        an admin write cannot repopulate the cache with stale rows.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation(key[0]):
+                return
+            now = time.monotonic()
+            self._data[key] = (value, now + self.ttl, now + self.ttl + self.stale_ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, table: str) -> None:
+        """
+        Drop every cached query for a table.
+
+        Entries are removed rather than marked stale, even with a stale
+        window, so a read after an admin write never sees the old rows.
+        """
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in [k for k in self._data if table in _tables(k[0])]:
+                del self._data[key]
+
+    def record_refresh(self, ok: bool) -> None:
+        with self._lock:
+            self.refreshes += 1
+            if not ok:
+                self.refresh_failures += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+catalog_cache = TTLCache(maxsize=Config.CACHE_MAX_ENTRIES, ttl=Config.CACHE_TTL_SECONDS,
+                         stale_ttl=Config.CACHE_STALE_SECONDS)
+
+# Admin dashboard aggregates; short-lived because public contact submissions
+# on other instances can't invalidate it
+stats_cache = TTLCache(maxsize=8, ttl=Config.ADMIN_STATS_TTL_SECONDS)
+
+# Template search results; queries are free text, so they get their own LRU
+search_cache = TTLCache(maxsize=Config.SEARCH_CACHE_MAX_ENTRIES, ttl=Config.CACHE_TTL_SECONDS,
+                        stale_ttl=Config.CACHE_STALE_SECONDS)
+
+
+# ==================== Single-flight loading ====================
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+_refresh_pool: ThreadPoolExecutor = None
+
+
+def _claim(cache: TTLCache, table, key) -> tuple:
+    """
+    Join the in-flight load of ``key`` or become its leader.
+
+    A load that started before the table was last invalidated is not joined,
+    since it may return rows from before the write; a new one replaces it.
+
+    Returns:
+        ``(future, leader)``; only the leader runs the loader and must settle the future
+    """
+    flight = (id(cache), key)
+    generation = cache.generation(table)
+    with _inflight_lock:
+        current = _inflight.get(flight)
+        if current is not None and current[1] == generation:
+            return current[0], False
+        future = Future()
+        _inflight[flight] = (future, generation)
+        return future, True
+
+
+def _settle(cache: TTLCache, key, future: Future, value=None, error: BaseException = None) -> None:
+    flight = (id(cache), key)
+    with _inflight_lock:
+        if _inflight.get(flight, (None,))[0] is future:
+            del _inflight[flight]
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+
+
+def _load(cache: TTLCache, table, key, loader, future: Future):
+    """Run a sync loader as the flight leader, store the result and settle waiters."""
+    try:
+        generation = cache.generation(table)
+        value = loader()
+        cache.set(key, value, generation)
+    except BaseException as e:
+        _settle(cache, key, future, error=e)
+        raise
+    _settle(cache, key, future, value)
+    return value
+
+
+async def _load_async(cache: TTLCache, table, key, loader, future: Future):
+    """``_load`` for an async loader."""
+    try:
+        generation = cache.generation(table)
+        value = await loader()
+        cache.set(key, value, generation)
+    except BaseException as e:
+        _settle(cache, key, future, error=e)
+        raise
+    _settle(cache, key, future, value)
+    return value
+
+
+def _log_refresh(cache: TTLCache, key):
+    def done(future: Future) -> None:
+        error = future.exception()
+        cache.record_refresh(error is None)
+        if error is not None:
+            print(f"Cache refresh failed for {key}: {str(error)}")
+    return done
+
+
+def _get_refresh_pool() -> ThreadPoolExecutor:
+    global _refresh_pool
+    if _refresh_pool is None:
+        with _inflight_lock:
+            if _refresh_pool is None:
+                _refresh_pool = ThreadPoolExecutor(max_workers=Config.CACHE_REFRESH_WORKERS,
+                                                   thread_name_prefix='cache-refresh')
+    return _refresh_pool
+
+
+def _refresh_in_background(cache: TTLCache, table, key, loader) -> None:
+    future, leader = _claim(cache, table, key)
+    if leader:
+        future.add_done_callback(_log_refresh(cache, key))
+        _get_refresh_pool().submit(_load, cache, table, key, loader, future)
+
+
+def _refresh_async_in_background(cache: TTLCache, table, key, loader) -> None:
+    future, leader = _claim(cache, table, key)
+    if leader:
+        future.add_done_callback(_log_refresh(cache, key))
+        # On the Supabase I/O loop, so the refresh outlives the request that triggered it
+        run_on_io_loop(_load_async(cache, table, key, loader, future))
+
+
+# ==================== Read-through helpers ====================
+
+def _serve_fallback(cache: TTLCache, key, error: BaseException):
+    """Return the last cached value for ``key`` if Supabase is down, otherwise re-raise ``error``."""
+    if isinstance(error, SupabaseUnavailable) or is_transient(error):
+        found, value = cache.fallback(key)
+        if found:
+            print(f"Serving last cached value for {key}: {str(error)}")
+            return value
+    raise error
+
+
+def cached_query(table, shape, loader, cache: TTLCache = None):
+    """
+    Return cached rows for ``(table, shape)``, calling ``loader`` on a miss.
+
+    A stale entry is returned immediately and refreshed on a background
+    thread. Concurrent misses for the same key wait for a single load.
+
+    Args:
+        table: Table name (or tuple of names), used as the invalidation scope
+        shape: Hashable description of the query (filters, ordering, id)
+        loader: Zero-argument callable returning the rows to cache
+        cache: Cache to use (defaults to ``catalog_cache``)
+    """
+    cache = cache or catalog_cache
+    key = (table, shape)
+    state, value = cache.lookup(key)
+    if state == FRESH:
+        return value
+    if state == STALE:
+        _refresh_in_background(cache, table, key, loader)
+        return value
+    future, leader = _claim(cache, table, key)
+    try:
+        if not leader:
+            return future.result()
+        return _load(cache, table, key, loader, future)
+    except Exception as e:
+        return _serve_fallback(cache, key, e)
+
+
+async def cached_query_async(table, shape, loader, cache: TTLCache = None, stale_ok: bool = True):
+    """
+    ``cached_query`` for an async ``loader`` (a zero-argument coroutine function).
+
+    Stale entries are refreshed on the Supabase I/O loop, so ``loader`` must
+    not depend on the request context.
+
+    With ``stale_ok=False`` a stale entry is loaded again before returning
+    and a failed load raises instead of falling back to the last value; use
+    it when the result feeds another cache entry.
+    """
+    cache = cache or catalog_cache
+    key = (table, shape)
+    state, value = cache.lookup(key)
+    if state == FRESH:
+        return value
+    if state == STALE and stale_ok:
+        _refresh_async_in_background(cache, table, key, loader)
+        return value
+    future, leader = _claim(cache, table, key)
+    try:
+        if not leader:
+            return await asyncio.wrap_future(future)
+        return await _load_async(cache, table, key, loader, future)
+    except Exception as e:
+        if not stale_ok:
+            raise
+        return _serve_fallback(cache, key, e)
+
+
+def cached_query_io(table, shape, loader, cache: TTLCache = None, stale_ok: bool = True):
+    """
+    ``cached_query_async`` for synchronous callers.
+
+    Cache hits are served in the calling thread; only a load is run on the
+    Supabase I/O loop, which the caller blocks on. Sync views use this so a
+    hit costs no more under WSGI than ``cached_query``, with no event loop
+    created per request.
+    """
+    cache = cache or catalog_cache
+    key = (table, shape)
+    state, value = cache.lookup(key)
+    if state == FRESH:
+        return value
+    if state == STALE and stale_ok:
+        _refresh_async_in_background(cache, table, key, loader)
+        return value
+    future, leader = _claim(cache, table, key)
+    try:
+        if not leader:
+            return future.result()
+        return run_on_io_loop(_load_async(cache, table, key, loader, future)).result()
+    except Exception as e:
+        if not stale_ok:
+            raise
+        return _serve_fallback(cache, key, e)
+
+
+async def refresh_query_async(table, shape, loader, cache: TTLCache = None):
+    """Load ``(table, shape)`` now and store it, whatever its cache state (used to pre-warm)."""
+    cache = cache or catalog_cache
+    key = (table, shape)
+    future, leader = _claim(cache, table, key)
+    if not leader:
+        return await asyncio.wrap_future(future)
+    return await _load_async(cache, table, key, loader, future)
+
+
+def invalidate_table(table: str) -> None:
+    """Invalidate cached reads for a table after a write."""
+    catalog_cache.invalidate(table)
+    search_cache.invalidate(table)
+    stats_cache.invalidate(table)
@@ -1,8 +1,10 @@
 import os
-from dotenv import load_dotenv
 
-# Load environment variables from .env file in parent directory
-load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
+# Load environment variables from .env file in parent directory. On Vercel the
+# environment is injected directly, so skip the import and file lookup there.
+if not os.environ.get('VERCEL'):
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 class Config:
     """Base configuration."""
@@ -12,13 +14,79 @@ class Config:
     SUPABASE_URL = os.environ.get('SUPABASE_URL')
     SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
     SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')
+    SUPABASE_POOL_SIZE = int(os.environ.get('SUPABASE_POOL_SIZE', 10))
+    SUPABASE_TIMEOUT = float(os.environ.get('SUPABASE_TIMEOUT', 10))
+    SUPABASE_CONNECT_TIMEOUT = float(os.environ.get('SUPABASE_CONNECT_TIMEOUT', 5))
+    SUPABASE_KEEPALIVE_EXPIRY = float(os.environ.get('SUPABASE_KEEPALIVE_EXPIRY', 60))
+    SUPABASE_POOL_PROBE_AFTER = float(os.environ.get('SUPABASE_POOL_PROBE_AFTER', 300))
+    SUPABASE_ASYNC_POOL_SIZE = int(os.environ.get('SUPABASE_ASYNC_POOL_SIZE', 50))  # Shared by all in-flight async reads
+    
+    # Supabase call deadlines (seconds, retries included), read retries and the circuit breaker
+    SUPABASE_READ_DEADLINE = float(os.environ.get('SUPABASE_READ_DEADLINE', 5))
+    SUPABASE_WRITE_DEADLINE = float(os.environ.get('SUPABASE_WRITE_DEADLINE', 10))
+    SUPABASE_READ_RETRIES = int(os.environ.get('SUPABASE_READ_RETRIES', 2))
+    SUPABASE_RETRY_BASE_DELAY = float(os.environ.get('SUPABASE_RETRY_BASE_DELAY', 0.1))
+    SUPABASE_BREAKER_THRESHOLD = int(os.environ.get('SUPABASE_BREAKER_THRESHOLD', 5))  # Consecutive failures that open it
+    SUPABASE_BREAKER_COOLDOWN = float(os.environ.get('SUPABASE_BREAKER_COOLDOWN', 30))
+    
+    # ASGI entry point (asgi.py): threads that run Flask request handling
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 64))
+    
+    # Catalog cache (public /api reads)
+    CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', 300))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 256))
+    CACHE_STALE_SECONDS = float(os.environ.get('CACHE_STALE_SECONDS', 3600))  # Serve expired entries this long while refreshing
+    CACHE_REFRESH_WORKERS = int(os.environ.get('CACHE_REFRESH_WORKERS', 2))
+    CACHE_PREWARM = os.environ.get('CACHE_PREWARM', 'false').lower() == 'true'  # Load catalog lists at startup and on cron
+    SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES', 512))  # Separate LRU so searches don't evict catalog lists
+    ADMIN_STATS_TTL_SECONDS = float(os.environ.get('ADMIN_STATS_TTL_SECONDS', 15))
+    ADMIN_RECENT_CONTACTS = int(os.environ.get('ADMIN_RECENT_CONTACTS', 5))
+    
+    # List endpoint paging
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
+    CONTACTS_PAGE_SIZE = int(os.environ.get('CONTACTS_PAGE_SIZE', 50))
+    SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE', 20))
+    
+    # Bulk import (rows per insert) and streaming export (rows per query)
+    BULK_IMPORT_BATCH_SIZE = int(os.environ.get('BULK_IMPORT_BATCH_SIZE', 500))
+    EXPORT_PAGE_SIZE = int(os.environ.get('EXPORT_PAGE_SIZE', 1000))
+    BATCH_UPDATE_MAX_ROWS = int(os.environ.get('BATCH_UPDATE_MAX_ROWS', 500))  # Row edits per PATCH request
+    
+    # HTTP caching headers for public /api responses (seconds)
+    HTTP_MAX_AGE = int(os.environ.get('HTTP_MAX_AGE', 60))
+    HTTP_S_MAXAGE = int(os.environ.get('HTTP_S_MAXAGE', 300))
+    HTTP_STALE_WHILE_REVALIDATE = int(os.environ.get('HTTP_STALE_WHILE_REVALIDATE', 600))
+    
+    # Response encoding: JSON backend (auto uses orjson when installed) and
+    # compression. Cached catalog bodies are compressed once per payload
+    # (PRECOMPRESS_*), every other response per request at fast levels
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+    COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    COMPRESS_ZSTD_LEVEL = int(os.environ.get('COMPRESS_ZSTD_LEVEL', 3))
+    PRECOMPRESS_GZIP_LEVEL = int(os.environ.get('PRECOMPRESS_GZIP_LEVEL', 9))
+    PRECOMPRESS_BROTLI_QUALITY = int(os.environ.get('PRECOMPRESS_BROTLI_QUALITY', 9))
+    PRECOMPRESS_ZSTD_LEVEL = int(os.environ.get('PRECOMPRESS_ZSTD_LEVEL', 15))
+    
+    # Image uploads: resized variants generated by images.py
+    IMAGE_VARIANT_WIDTHS = tuple(sorted(int(w) for w in os.environ.get('IMAGE_VARIANT_WIDTHS', '320,640,1280').split(',')))
+    IMAGE_FORMATS = tuple(f.strip().lower() for f in os.environ.get('IMAGE_FORMATS', 'webp,avif').split(','))
+    IMAGE_QUALITY = int(os.environ.get('IMAGE_QUALITY', 80))
+    IMAGE_MAX_UPLOAD_BYTES = int(os.environ.get('IMAGE_MAX_UPLOAD_BYTES', 5 * 1024 * 1024))
+    IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', 40_000_000))  # Rejects decompression bombs
+    IMAGE_PROCESS_WORKERS = int(os.environ.get('IMAGE_PROCESS_WORKERS', 2))  # 0 encodes in the request thread
+    IMAGE_PROCESS_TIMEOUT = float(os.environ.get('IMAGE_PROCESS_TIMEOUT', 60))
     
     # CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5173').split(',')
     
     # Admin credentials
     ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME', 'admin')
-    ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin')
+    ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin')  # Only used when ADMIN_PASSWORD_HASH is unset
+    ADMIN_PASSWORD_HASH = os.environ.get('ADMIN_PASSWORD_HASH', '')  # From `python admin_auth.py`
+    ADMIN_SESSION_SECRET = os.environ.get('ADMIN_SESSION_SECRET', '')  # Signs session tokens (default: derived from the service key)
+    ADMIN_SESSION_SECONDS = int(os.environ.get('ADMIN_SESSION_SECONDS', 900))
     
     # Email Configuration (Gmail SMTP)
     SMTP_HOST = os.environ.get('SMTP_HOST', 'smtp.gmail.com')
@@ -26,6 +94,41 @@ class Config:
     SMTP_EMAIL = os.environ.get('SMTP_EMAIL', '')  # Your Gmail address
     SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')  # Gmail App Password
     NOTIFICATION_EMAIL = os.environ.get('NOTIFICATION_EMAIL', '')  # Where to receive notifications
+    CONTACT_AUTO_REPLY = os.environ.get('CONTACT_AUTO_REPLY', 'false').lower() == 'true'  # Confirm receipt to the submitter
+    SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'true').lower() == 'true'  # Disable only for a local SMTP stand-in
+    SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', 10))
+    SMTP_IDLE_TIMEOUT = float(os.environ.get('SMTP_IDLE_TIMEOUT', 30))  # Close idle sessions after this long
+    
+    # Notification outbox (requires migrations/005_notification_outbox.sql)
+    NOTIFICATION_OUTBOX = os.environ.get('NOTIFICATION_OUTBOX', 'false').lower() == 'true'
+    # Deliver before responding instead of on a background thread; defaults on
+    # for Vercel, which may freeze the instance right after the response
+    OUTBOX_DRAIN_INLINE = os.environ.get('OUTBOX_DRAIN_INLINE', 'true' if os.environ.get('VERCEL') else 'false').lower() == 'true'
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 50))
+    OUTBOX_DIGEST_THRESHOLD = int(os.environ.get('OUTBOX_DIGEST_THRESHOLD', 5))  # Coalesce bursts this large into one email
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 5))
+    OUTBOX_CLAIM_TIMEOUT = int(os.environ.get('OUTBOX_CLAIM_TIMEOUT', 300))  # Seconds before a stuck claim is released
+    
+    # Contact form throttling: token buckets (burst, refill per hour) and a duplicate window
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # memory or supabase (requires migrations/007)
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 10000))  # memory backend LRU bound
+    CONTACT_RATE_LIMIT_IP_BURST = float(os.environ.get('CONTACT_RATE_LIMIT_IP_BURST', 5))
+    CONTACT_RATE_LIMIT_IP_PER_HOUR = float(os.environ.get('CONTACT_RATE_LIMIT_IP_PER_HOUR', 10))
+    CONTACT_RATE_LIMIT_EMAIL_BURST = float(os.environ.get('CONTACT_RATE_LIMIT_EMAIL_BURST', 3))
+    CONTACT_RATE_LIMIT_EMAIL_PER_HOUR = float(os.environ.get('CONTACT_RATE_LIMIT_EMAIL_PER_HOUR', 5))
+    CONTACT_DEDUP_SECONDS = float(os.environ.get('CONTACT_DEDUP_SECONDS', 600))  # 0 disables the duplicate window
+    # Proxies appending X-Forwarded-For: Vercel's edge is one; elsewhere the header is ignored unless set
+    TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 1 if os.environ.get('VERCEL') else 0))
+    
+    # Shared secret Vercel cron sends as a Bearer token
+    CRON_SECRET = os.environ.get('CRON_SECRET', '')
+    
+    # Email delivery worker
+    EMAIL_QUEUE_SIZE = int(os.environ.get('EMAIL_QUEUE_SIZE', 100))
+    EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', 20))
+    EMAIL_MAX_RETRIES = int(os.environ.get('EMAIL_MAX_RETRIES', 3))
+    EMAIL_RETRY_BACKOFF = float(os.environ.get('EMAIL_RETRY_BACKOFF', 1.0))
 
 
 class DevelopmentConfig(Config):
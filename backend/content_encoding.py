@@ -0,0 +1,114 @@
+"""
+Response body compression and ``Accept-Encoding`` negotiation.
+
+gzip is always available; brotli (``br``) and zstd are used when the
+``brotli`` and ``zstandard`` packages are installed. Encodings are offered in
+order of preference, and the client's q-values (including ``q=0`` refusals)
+are respected.
+
+Two settings are used. Cached catalog bodies (see ``http_cache``) are
+compressed once per payload at high levels and prefer the smallest output.
+Everything else is compressed per response by ``init_compression``'s
+middleware at fast levels.
+"""
+import gzip
+from flask import request
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_AVAILABLE = {'br': brotli is not None, 'zstd': zstandard is not None, 'gzip': True}
+
+# Preferred first: smallest output for bodies compressed once, fastest for per-response compression
+ENCODINGS = tuple(name for name in ('br', 'zstd', 'gzip') if _AVAILABLE[name])
+DYNAMIC_ENCODINGS = tuple(name for name in ('zstd', 'br', 'gzip') if _AVAILABLE[name])
+
+PRECOMPRESS_LEVELS = {
+    'br': Config.PRECOMPRESS_BROTLI_QUALITY,
+    'zstd': Config.PRECOMPRESS_ZSTD_LEVEL,
+    'gzip': Config.PRECOMPRESS_GZIP_LEVEL,
+}
+DYNAMIC_LEVELS = {
+    'br': Config.COMPRESS_BROTLI_QUALITY,
+    'zstd': Config.COMPRESS_ZSTD_LEVEL,
+    'gzip': Config.COMPRESS_GZIP_LEVEL,
+}
+
+# Bodies already compressed (images, archives) gain nothing from another pass
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+}
+
+
+def negotiate(accept_encodings, offered=ENCODINGS):
+    """
+    Pick the encoding to send for a parsed ``Accept-Encoding`` header.
+
+    Args:
+        accept_encodings: ``request.accept_encodings``
+        offered: Encodings the server can produce, preferred first
+
+    Returns:
+        An encoding name, or None to send the body uncompressed
+    """
+    return accept_encodings.best_match(offered)
+
+
+def compress(body: bytes, encoding: str, level: int = None) -> bytes:
+    """
+    Compress ``body`` with ``encoding``.
+
+    Args:
+        level: gzip level (1-9), brotli quality (0-11) or zstd level (1-22);
+            defaults to the levels used for cached responses
+    """
+    level = PRECOMPRESS_LEVELS[encoding] if level is None else level
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def _compressible(response) -> bool:
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if 'Content-Encoding' in response.headers or 'no-transform' in response.headers.get('Cache-Control', ''):
+        return False
+    mimetype = response.mimetype or ''
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def init_compression(app) -> None:
+    """Compress responses of at least COMPRESS_MIN_BYTES that the client accepts encoded."""
+
+    @app.after_request
+    def _compress_response(response):
+        if request.method == 'HEAD' or not _compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        if len(body) < Config.COMPRESS_MIN_BYTES:
+            return response
+        encoding = negotiate(request.accept_encodings, DYNAMIC_ENCODINGS)
+        if encoding is None:
+            return response
+        response.set_data(compress(body, encoding, DYNAMIC_LEVELS[encoding]))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
@@ -1,146 +1,455 @@
 """
 Email utility for sending notifications via Gmail SMTP.
+
+Messages are handed to a single long-lived delivery worker that keeps one
+authenticated SMTP session open, sends queued messages in batches over it,
+and reconnects/retries with backoff on transient failures.
 """
-import smtplib
+import atexit
+import os
+import queue
 import threading
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import time
 from datetime import datetime
+from typing import TYPE_CHECKING
 from config import Config
 
+# smtplib (which pulls in ssl) and the email.mime packages are imported on
+# first use so they stay off the serverless cold-start path.
+if TYPE_CHECKING:
+    from email.mime.multipart import MIMEMultipart
 
-def send_contact_notification_async(contact_data: dict) -> None:
+_STOP = object()
+
+
+def email_configured() -> bool:
     """
-    Send email notification in a background thread.
-    This returns immediately and doesn't block the main request.
+    Check whether outgoing email is configured.
     
-    Args:
-        contact_data: Dictionary containing form data (name, email, phone, message)
+    Login credentials are required unless TLS is disabled, which is only
+    meant for a local SMTP stand-in during development and testing.
     """
-    thread = threading.Thread(
-        target=_send_contact_notification,
-        args=(contact_data,),
-        daemon=True  # Thread will be killed when main program exits
-    )
-    thread.start()
-    print("Email notification queued in background thread")
+    return bool(Config.SMTP_EMAIL and (Config.SMTP_PASSWORD or not Config.SMTP_USE_TLS))
 
 
-def _send_contact_notification(contact_data: dict) -> bool:
-    """
-    Internal function to send email notification.
-    Called in a background thread by send_contact_notification_async.
-    
-    Args:
-        contact_data: Dictionary containing form data (name, email, phone, message)
+def _is_transient(error: Exception) -> bool:
+    """Return True for failures worth retrying on a fresh connection."""
+    import smtplib
     
-    Returns:
-        True if email sent successfully, False otherwise
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+
+class SMTPDeliveryWorker:
     """
-    # Check if email is configured
-    if not Config.SMTP_EMAIL or not Config.SMTP_PASSWORD:
-        print("Email not configured - skipping notification")
-        return False
+    Background worker delivering queued messages over a reused SMTP session.
     
-    try:
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"🚀 New Contact: {contact_data.get('name', 'Unknown')} - DevForge"
-        msg['From'] = Config.SMTP_EMAIL
-        msg['To'] = Config.NOTIFICATION_EMAIL or Config.SMTP_EMAIL
-        
-        # Format the data
-        name = contact_data.get('name', 'N/A')
-        email = contact_data.get('email', 'N/A')
-        phone = contact_data.get('phone', 'Not provided')
-        message = contact_data.get('message', 'No message')
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Plain text version
-        text_content = f"""
-New Contact Form Submission
-===========================
+    The queue is bounded: when it is full new messages are dropped (and
+    counted) instead of piling up threads or memory under a burst.
+    """
 
-Name: {name}
-Email: {email}
-Phone: {phone}
+    def __init__(self, maxsize: int = 100, batch_size: int = 20, max_retries: int = 3,
+                 retry_backoff: float = 1.0, idle_timeout: float = 30.0):
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        # Reentrant: _deliver disconnects while holding it
+        self._send_lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'sent': 0,
+            'failed': 0,
+            'dropped': 0,
+            'retries': 0,
+            'connections': 0,
+            'batches': 0,
+            'latency_total': 0.0,
+            'latency_max': 0.0,
+        }
 
-Message:
-{message}
+    # ---------- Public API ----------
 
----
-Submitted at: {timestamp}
+    def submit(self, msg) -> bool:
         """
+        Queue a message for delivery without blocking.
         
-        # HTML version
-        html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-        .header {{ background: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%); color: white; padding: 30px; border-radius: 12px 12px 0 0; }}
-        .header h1 {{ margin: 0; font-size: 24px; }}
-        .content {{ background: #f8fafc; padding: 30px; border: 1px solid #e2e8f0; border-top: none; border-radius: 0 0 12px 12px; }}
-        .field {{ margin-bottom: 20px; }}
-        .field-label {{ font-size: 12px; font-weight: 600; color: #64748b; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 5px; }}
-        .field-value {{ font-size: 16px; color: #1e293b; }}
-        .message-box {{ background: white; padding: 20px; border-radius: 8px; border: 1px solid #e2e8f0; white-space: pre-wrap; }}
-        .footer {{ text-align: center; margin-top: 20px; font-size: 12px; color: #94a3b8; }}
-        .badge {{ display: inline-block; background: #3b82f6; color: white; padding: 4px 12px; border-radius: 20px; font-size: 12px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🚀 New Contact Form Submission</h1>
-        </div>
-        <div class="content">
-            <div class="field">
-                <div class="field-label">Name</div>
-                <div class="field-value">{name}</div>
-            </div>
-            
-            <div class="field">
-                <div class="field-label">Email</div>
-                <div class="field-value"><a href="mailto:{email}">{email}</a></div>
-            </div>
-            
-            <div class="field">
-                <div class="field-label">Phone</div>
-                <div class="field-value">{phone}</div>
-            </div>
-            
-            <div class="field">
-                <div class="field-label">Message</div>
-                <div class="message-box">{message}</div>
-            </div>
-        </div>
-        <div class="footer">
-            Submitted on {timestamp} via DevForge Contact Form
-        </div>
-    </div>
-</body>
-</html>
+        Returns:
+            True if queued, False if the queue was full and the message was dropped
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((msg, time.monotonic()))
+            return True
+        except queue.Full:
+            self._count('dropped')
+            print("Email queue full - dropping notification")
+            return False
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every queued message has been processed. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drain the queue (up to ``timeout`` seconds) and stop the worker."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self.flush(timeout)
+        try:
+            self._queue.put_nowait((_STOP, None))
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def metrics(self) -> dict:
+        """Return a snapshot of queue depth, delivery counters and latency (seconds)."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        delivered = stats['sent'] or 1
+        return {
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'sent': stats['sent'],
+            'failed': stats['failed'],
+            'dropped': stats['dropped'],
+            'retries': stats['retries'],
+            'connections': stats['connections'],
+            'batches': stats['batches'],
+            'latency_avg': stats['latency_total'] / delivered,
+            'latency_max': stats['latency_max'],
+        }
+
+    def send_batch(self, messages) -> list:
         """
+        Send messages over the shared session, reconnecting and retrying as needed.
         
-        # Attach both versions
-        part1 = MIMEText(text_content, 'plain')
-        part2 = MIMEText(html_content, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
+        Safe to call from other threads (e.g. the outbox drain); sends are
+        serialized on the one session.
+        
+        Returns:
+            One bool per message, True if it was delivered
+        """
+        self._count('batches')
+        with self._send_lock:
+            return [self._deliver(msg) for msg in messages]
+
+    # ---------- Internals ----------
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='smtp-delivery', daemon=True)
+                self._thread.start()
+
+    def _count(self, key: str, amount=1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                # Don't hold an idle session open; SMTP servers drop them anyway
+                self._disconnect()
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(msg is _STOP for msg, _ in batch)
+            items = [(msg, queued_at) for msg, queued_at in batch if msg is not _STOP]
+            try:
+                results = self.send_batch([msg for msg, _ in items])
+                now = time.monotonic()
+                for (_, queued_at), delivered in zip(items, results):
+                    if delivered:
+                        latency = now - queued_at
+                        with self._stats_lock:
+                            self._stats['latency_total'] += latency
+                            self._stats['latency_max'] = max(self._stats['latency_max'], latency)
+            except Exception as e:
+                print(f"Email delivery worker error: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._disconnect()
+                return
+
+    def _connect(self):
+        import smtplib
         
-        # Send email
-        with smtplib.SMTP(Config.SMTP_HOST, Config.SMTP_PORT) as server:
+        server = smtplib.SMTP(Config.SMTP_HOST, Config.SMTP_PORT, timeout=Config.SMTP_TIMEOUT)
+        if Config.SMTP_USE_TLS:
             server.starttls()
+        if Config.SMTP_PASSWORD:
             server.login(Config.SMTP_EMAIL, Config.SMTP_PASSWORD)
-            server.send_message(msg)
-        
-        print(f"Email notification sent successfully to {msg['To']}")
-        return True
-        
-    except Exception as e:
-        print(f"Failed to send email notification: {str(e)}")
+        self._count('connections')
+        return server
+
+    def _disconnect(self) -> None:
+        # Under the send lock, so the idle timeout can't close the session
+        # while send_batch is using it on another thread
+        with self._send_lock:
+            if self._server is None:
+                return
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def _deliver(self, msg) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self._server is None:
+                    self._server = self._connect()
+                self._server.send_message(msg)
+                self._count('sent')
+                print(f"Email notification sent successfully to {msg['To']}")
+                return True
+            except Exception as e:
+                self._disconnect()
+                if not _is_transient(e) or attempt == self.max_retries:
+                    self._count('failed')
+                    print(f"Failed to send email notification: {str(e)}")
+                    return False
+                self._count('retries')
+                time.sleep(self.retry_backoff * (2 ** attempt))
         return False
 
+
+_worker = SMTPDeliveryWorker(
+    maxsize=Config.EMAIL_QUEUE_SIZE,
+    batch_size=Config.EMAIL_BATCH_SIZE,
+    max_retries=Config.EMAIL_MAX_RETRIES,
+    retry_backoff=Config.EMAIL_RETRY_BACKOFF,
+    idle_timeout=Config.SMTP_IDLE_TIMEOUT,
+)
+atexit.register(_worker.stop)
+
+
+def get_delivery_worker() -> SMTPDeliveryWorker:
+    """Return the process-wide SMTP delivery worker."""
+    return _worker
+
+
+def email_metrics() -> dict:
+    """Return queue depth, delivery counters and latency for the delivery worker."""
+    return _worker.metrics()
+
+
+def send_contact_notification_async(contact_data: dict) -> None:
+    """
+    Queue an email notification for the background delivery worker.
+    This returns immediately and doesn't block the main request.
+    
+    Args:
+        contact_data: Dictionary containing form data (name, email, phone, message)
+    """
+    if not email_configured():
+        print("Email not configured - skipping notification")
+        return
+    if _worker.submit(build_contact_message(contact_data)):
+        print("Email notification queued for delivery worker")
+    if Config.CONTACT_AUTO_REPLY and auto_reply_address(contact_data):
+        _worker.submit(build_auto_reply_message(contact_data))
+
+
+def _format_timestamp(value=None) -> str:
+    """Format a stored ISO timestamp (or now, if missing) for display in emails."""
+    if value:
+        try:
+            return datetime.fromisoformat(value).strftime('%Y-%m-%d %H:%M:%S')
+        except (TypeError, ValueError):
+            pass
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+# ==================== Templates ====================
+
+NOTIFICATION_TYPES = ('contact_notification', 'contact_auto_reply', 'contact_digest')
+
+_templates = None
+_templates_lock = threading.Lock()
+
+
+def _get_templates() -> dict:
+    """
+    Compile every notification template once, on first use.
+    
+    Jinja turns the static markup and CSS into constants, so rendering only
+    escapes and joins the per-message values. The static text isn't kept as
+    pre-encoded bytes: encoding a whole rendered body to UTF-8 takes a few
+    microseconds, against hundreds for building and serializing the MIME
+    message (see benchmarks/bench_email_render.py).
+    """
+    global _templates
+    if _templates is None:
+        with _templates_lock:
+            if _templates is None:
+                from jinja2 import Environment, FileSystemLoader, select_autoescape
+                env = Environment(
+                    loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), 'templates')),
+                    autoescape=select_autoescape(enabled_extensions=('html',), default_for_string=False),
+                    trim_blocks=True,
+                    lstrip_blocks=True,
+                    keep_trailing_newline=True,
+                )
+                _templates = {
+                    kind: (env.get_template(f'email/{kind}.txt'), env.get_template(f'email/{kind}.html'))
+                    for kind in NOTIFICATION_TYPES
+                }
+    return _templates
+
+
+def _contact_context(contact_data: dict) -> dict:
+    """Return the template view of a contact submission."""
+    return {
+        'name': contact_data.get('name'),
+        'email': contact_data.get('email'),
+        'phone': contact_data.get('phone'),
+        'message': contact_data.get('message'),
+        'timestamp': _format_timestamp(contact_data.get('submitted_at')),
+    }
+
+
+def auto_reply_address(contact_data: dict):
+    """
+    Return the submitter's address if it is exactly one bare address, else None.
+    
+    The form's email field is visitor input, so a value like
+    ``a@x.com, b@y.com`` or ``Name <a@x.com>`` must not become the auto-reply's
+    recipient list.
+    """
+    from email.utils import getaddresses
+    
+    value = contact_data.get('email')
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if not value or ',' in value:
+        return None
+    addresses = getaddresses([value])
+    if len(addresses) != 1:
+        return None
+    name, address = addresses[0]
+    if name or address != value or address.count('@') != 1:
+        return None
+    return address
+
+
+def _header_safe(value) -> str:
+    """Strip line breaks so user input can't inject extra email headers."""
+    return ' '.join(str(value).split())
+
+
+def render_notification(kind: str, **context) -> tuple:
+    """
+    Render the plain-text and HTML bodies for a notification type.
+    
+    HTML output is auto-escaped, so user input cannot inject markup.
+    
+    Returns:
+        (text_content, html_content)
+    """
+    text_template, html_template = _get_templates()[kind]
+    return text_template.render(**context), html_template.render(**context)
+
+
+def _build_message(kind: str, subject: str, to: str, reply_to: str = None, **context) -> 'MIMEMultipart':
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    
+    text_content, html_content = render_notification(kind, **context)
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = _header_safe(subject)
+    msg['From'] = Config.SMTP_EMAIL
+    msg['To'] = _header_safe(to)
+    if reply_to:
+        msg['Reply-To'] = _header_safe(reply_to)
+    
+    # Attach both versions
+    msg.attach(MIMEText(text_content, 'plain'))
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
+
+def build_contact_message(contact_data: dict) -> 'MIMEMultipart':
+    """
+    Build the admin alert for a contact form submission.
+    
+    Args:
+        contact_data: Dictionary containing form data (name, email, phone, message)
+    
+    Returns:
+        The multipart (plain + HTML) message, ready to send
+    """
+    return _build_message(
+        'contact_notification',
+        f"🚀 New Contact: {contact_data.get('name') or 'Unknown'} - DevForge",
+        Config.NOTIFICATION_EMAIL or Config.SMTP_EMAIL,
+        reply_to=contact_data.get('email'),
+        contact=_contact_context(contact_data),
+    )
+
+
+def build_auto_reply_message(contact_data: dict) -> 'MIMEMultipart':
+    """
+    Build the confirmation email sent back to the person who submitted the form.
+    
+    Args:
+        contact_data: Dictionary containing form data (name, email, phone, message)
+    
+    Returns:
+        The multipart (plain + HTML) message, ready to send
+    
+    Raises:
+        ValueError: if the submitted email isn't a single address (check
+            ``auto_reply_address`` first)
+    """
+    to = auto_reply_address(contact_data)
+    if to is None:
+        raise ValueError('Auto-reply needs exactly one recipient address')
+    return _build_message(
+        'contact_auto_reply',
+        "Thanks for contacting DevForge",
+        to,
+        reply_to=Config.NOTIFICATION_EMAIL or None,
+        contact=_contact_context(contact_data),
+    )
+
+
+def build_digest_message(contacts: list) -> 'MIMEMultipart':
+    """
+    Build a single digest email covering several contact submissions.
+    Used by the outbox drain to coalesce bursts.
+    
+    Args:
+        contacts: List of contact form dictionaries, oldest first
+    
+    Returns:
+        The multipart (plain + HTML) message, ready to send
+    """
+    return _build_message(
+        'contact_digest',
+        f"🚀 {len(contacts)} New Contacts - DevForge",
+        Config.NOTIFICATION_EMAIL or Config.SMTP_EMAIL,
+        contacts=[_contact_context(contact) for contact in contacts],
+    )
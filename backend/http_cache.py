@@ -0,0 +1,159 @@
+"""
+HTTP caching helpers for public API responses.
+
+Adds strong ETags, Last-Modified and Cache-Control headers so browsers and
+the Vercel edge can revalidate with a cheap 304 instead of a full body.
+
+Serialized bodies are cached alongside the catalog data they were built
+from, together with their ETag and gzip/brotli encodings, so a response for
+unchanged data is a byte copy rather than a fresh JSON encode.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from flask import current_app, jsonify, request
+from config import Config
+from content_encoding import compress, negotiate
+
+
+def cache_control_header() -> str:
+    """Build the Cache-Control value shared by browsers and the edge."""
+    return (
+        f"public, max-age={Config.HTTP_MAX_AGE}, "
+        f"s-maxage={Config.HTTP_S_MAXAGE}, "
+        f"stale-while-revalidate={Config.HTTP_STALE_WHILE_REVALIDATE}"
+    )
+
+
+class RenderedBody:
+    """A serialized response body with its ETag and lazily built encodings."""
+
+    __slots__ = ('source', 'extra', 'body', 'etag', 'encoded', 'lock')
+
+    def __init__(self, source, extra: tuple, body: bytes):
+        self.source = source
+        self.extra = extra
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()
+        self.encoded = {}
+        self.lock = threading.Lock()
+
+    def encode(self, encoding: str) -> bytes:
+        """Return the body compressed with ``encoding``, compressing it only once."""
+        encoded = self.encoded.get(encoding)
+        if encoded is None:
+            with self.lock:
+                encoded = self.encoded.get(encoding)
+                if encoded is None:
+                    encoded = self.encoded[encoding] = compress(self.body, encoding)
+        return encoded
+
+
+class BodyCache:
+    """
+    LRU of rendered bodies keyed by the identity of the data they were built from.
+
+    Catalog data comes out of ``catalog_cache`` as the same object until it is
+    refreshed, so identity is a cheap and exact "unchanged" check. Each entry
+    keeps a reference to its source, so an id can't be reused while cached.
+
+    It also tracks Last-Modified per URL: the time this process first served
+    the URL's current body. Row timestamps can't be used for it, since a
+    delete changes the payload without advancing any of them. Reloading
+    unchanged data keeps the earlier time, so If-Modified-Since still gets a
+    304, and a new process starts from its own clock, which is always after
+    the data last changed.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._modified = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, data, extra: tuple):
+        with self._lock:
+            entry = self._data.get((id(data), extra))
+            if entry is None or entry.source is not data:
+                self.misses += 1
+                return None
+            self._data.move_to_end((id(data), extra))
+            self.hits += 1
+            return entry
+
+    def last_modified(self, url: str, etag: str) -> datetime:
+        """Return when ``url`` started serving the body with ``etag``, recording now if it changed."""
+        with self._lock:
+            current = self._modified.get(url)
+            if current is None or current[0] != etag:
+                stamp = datetime.now(timezone.utc).replace(microsecond=0)
+                if current is not None and stamp <= current[1]:
+                    # HTTP dates have one-second resolution: a change within
+                    # the same second must still compare as newer
+                    stamp = current[1] + timedelta(seconds=1)
+                current = self._modified[url] = (etag, stamp)
+                while len(self._modified) > self.maxsize:
+                    self._modified.popitem(last=False)
+            self._modified.move_to_end(url)
+            return current[1]
+
+    def put(self, entry: RenderedBody) -> None:
+        with self._lock:
+            key = (id(entry.source), entry.extra)
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._modified.clear()
+
+
+body_cache = BodyCache(maxsize=Config.CACHE_MAX_ENTRIES)
+
+
+def render_body(data, **extra) -> RenderedBody:
+    """Serialize ``{'success': True, 'data': data, **extra}``, reusing the cached bytes if present."""
+    key = tuple(sorted(extra.items()))
+    entry = body_cache.get(data, key)
+    if entry is None:
+        body = jsonify({'success': True, 'data': data, **extra}).get_data()
+        entry = RenderedBody(data, key, body)
+        body_cache.put(entry)
+    return entry
+
+
+def conditional_json(data, **extra):
+    """
+    Build a cacheable ``{'success': True, 'data': ...}`` response.
+
+    Extra keyword arguments (e.g. ``next_cursor``) are added to the body.
+    ``data`` must not be mutated afterwards, since its rendered body is cached.
+
+    The ETag is a SHA-256 of the serialized body, so it changes exactly when
+    the payload does. Bodies of at least COMPRESS_MIN_BYTES are sent gzip or
+    brotli encoded when the client accepts it, with the encoding appended to
+    the ETag. Returns a 304 with no body when the request's If-None-Match
+    (or, without one, If-Modified-Since) still matches. Last-Modified is
+    when this process first produced the body (see ``BodyCache``), so it
+    advances on deletes as well as on inserts and updates.
+    """
+    rendered = render_body(data, **extra)
+    body, etag = rendered.body, rendered.etag
+    encoding = negotiate(request.accept_encodings) if len(body) >= Config.COMPRESS_MIN_BYTES else None
+    if encoding is not None:
+        body, etag = rendered.encode(encoding), f"{etag}-{encoding}"
+
+    response = current_app.response_class(body, mimetype='application/json')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.last_modified = body_cache.last_modified(request.full_path, rendered.etag)
+    response.headers['Cache-Control'] = cache_control_header()
+    return response.make_conditional(request)
@@ -0,0 +1,324 @@
+"""
+Image upload pipeline.
+
+Uploads are streamed to a temporary file in chunks while being hashed, so a
+request never holds the whole file in memory, and the SHA-256 digest becomes
+the storage key. Images are validated by their magic bytes, stripped of
+metadata and re-encoded into a fixed set of widths (IMAGE_VARIANT_WIDTHS) in
+WebP and, when the installed Pillow supports it, AVIF. Encoding is CPU-bound,
+so it runs in a process pool instead of the request thread.
+
+Variants are stored as ``<prefix>/<width>.<format>`` under their real width.
+A source narrower than a configured width is not upscaled: it gets one variant
+at its own width in place of every larger one, so the largest variant's URL
+tells clients which widths exist (the configured ones below it, plus itself).
+"""
+import atexit
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+
+# Leading bytes of the formats we accept, mapped to a short type name
+_SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+CONTENT_TYPES = {'webp': 'image/webp', 'avif': 'image/avif'}
+
+# Variant paths are never overwritten, so the CDN may cache them for a year
+STORAGE_CACHE_SECONDS = '31536000'
+
+# Multipart boundaries, part headers and the filename on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+_pool = None
+_pool_unavailable = False
+_pool_lock = threading.Lock()
+
+
+class ImageValidationError(ValueError):
+    """Raised for uploads that are not a supported, sane image; routes answer with a 400."""
+
+
+class UploadTooLargeError(ImageValidationError):
+    """Raised once an upload grows past IMAGE_MAX_UPLOAD_BYTES; routes answer with a 413."""
+
+
+def detect_image_type(head: bytes):
+    """
+    Identify an image from its first bytes.
+
+    Args:
+        head: At least the first 16 bytes of the file
+
+    Returns:
+        'jpeg', 'png', 'gif', 'webp' or 'avif', or None if unrecognised
+    """
+    for signature, kind in _SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[4:8] == b'ftyp' and head[8:12] in (b'avif', b'avis'):
+        return 'avif'
+    return None
+
+
+def spool_upload(stream, max_bytes: int, chunk_size: int = 64 * 1024) -> tuple:
+    """
+    Copy an upload stream to a temporary file while hashing it.
+
+    Reading stops as soon as the size limit is exceeded, and non-images are
+    rejected after the first chunk. The caller must delete the returned file.
+
+    Args:
+        stream: Readable binary stream (e.g. ``FileStorage.stream``)
+        max_bytes: Largest accepted upload
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        (hex SHA-256 digest, temporary file path, size in bytes)
+
+    Raises:
+        ImageValidationError: If the file does not start like a supported image
+        UploadTooLargeError: If the stream is longer than ``max_bytes``
+    """
+    digest = hashlib.sha256()
+    size = 0
+    handle, path = tempfile.mkstemp(prefix='upload-')
+    try:
+        with os.fdopen(handle, 'wb') as spool:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                if size == 0 and detect_image_type(chunk[:16]) is None:
+                    raise ImageValidationError('Unsupported image type (expected JPEG, PNG, GIF, WebP or AVIF)')
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError('File is too large')
+                digest.update(chunk)
+                spool.write(chunk)
+        if size == 0:
+            raise ImageValidationError('File is empty')
+    except BaseException:
+        os.unlink(path)
+        raise
+    return digest.hexdigest(), path, size
+
+
+def output_formats() -> tuple:
+    """Return the configured output formats the installed Pillow can encode."""
+    from PIL import features
+    return tuple(fmt for fmt in Config.IMAGE_FORMATS if features.check(fmt))
+
+
+def _flatten(image):
+    """Convert to RGB/RGBA, keeping transparency only when the source has it."""
+    if image.mode in ('RGB', 'RGBA'):
+        return image
+    has_alpha = image.mode in ('LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def _variant_size(width: int, height: int, target: int) -> tuple:
+    """Size of a variant ``target`` px wide, never larger than the source."""
+    scaled = min(target, width)
+    return scaled, max(1, round(height * scaled / width))
+
+
+def variant_widths(width: int, targets: tuple) -> tuple:
+    """Distinct widths to encode for a source ``width`` px wide: each target, capped at the source."""
+    return tuple(sorted({min(target, width) for target in targets}))
+
+
+def _open_oriented(source: str, max_pixels: int):
+    """Open an image, rejecting oversized ones, and return it upright."""
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(source) as image:
+            if image.width * image.height > max_pixels:
+                raise ImageValidationError('Image dimensions are too large')
+            image.seek(0)
+            icc_profile = image.info.get('icc_profile')
+            upright = _flatten(ImageOps.exif_transpose(image))
+            upright.load()
+    except ImageValidationError:
+        raise
+    except Exception as e:
+        raise ImageValidationError(f'Could not decode image: {str(e)}')
+    return upright, icc_profile
+
+
+def probe_image(source: str) -> dict:
+    """
+    Read an image's upright dimensions without decoding the pixels.
+
+    Returns:
+        The ``{'width', 'height', 'variants'}`` shape of ``process_image``,
+        with variant sizes but no data
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(source) as image:
+            width, height = image.size
+            if image.getexif().get(0x0112) in (5, 6, 7, 8):  # EXIF orientations that rotate 90 degrees
+                width, height = height, width
+    except Exception as e:
+        raise ImageValidationError(f'Could not decode image: {str(e)}')
+    variants = [
+        {'width': target, 'height': _variant_size(width, height, target)[1], 'format': fmt}
+        for target in variant_widths(width, Config.IMAGE_VARIANT_WIDTHS) for fmt in output_formats()
+    ]
+    return {'width': width, 'height': height, 'variants': variants}
+
+
+def process_image(source: str, widths: tuple, formats: tuple, quality: int, max_pixels: int) -> dict:
+    """
+    Decode an image file and encode its resized variants.
+
+    Runs inside the process pool, so it only takes and returns plain data.
+    EXIF orientation is applied to the pixels, then all metadata (EXIF, XMP,
+    comments) is dropped; only the ICC colour profile is kept. Animated
+    images keep their first frame.
+
+    Returns:
+        ``{'width', 'height', 'variants': [{'width', 'height', 'format', 'data'}]}``,
+        with each variant's encoded size
+    """
+    from PIL import Image
+
+    image, icc_profile = _open_oriented(source, max_pixels)
+    variants = []
+    for width in variant_widths(image.width, widths):
+        size = _variant_size(image.width, image.height, width)
+        resized = image if width == image.width else image.resize(size, Image.LANCZOS)
+        for fmt in formats:
+            buffer = io.BytesIO()
+            options = {'quality': quality}
+            if icc_profile:
+                options['icc_profile'] = icc_profile
+            if fmt == 'webp':
+                options['method'] = 4
+            resized.save(buffer, fmt.upper(), **options)
+            variants.append({'width': resized.width, 'height': resized.height, 'format': fmt,
+                             'data': buffer.getvalue()})
+    return {'width': image.width, 'height': image.height, 'variants': variants}
+
+
+def _get_pool():
+    """Create the shared process pool on first use, or None when disabled/unavailable."""
+    global _pool, _pool_unavailable
+    if Config.IMAGE_PROCESS_WORKERS < 1 or _pool_unavailable:
+        return None
+    with _pool_lock:
+        if _pool is None and not _pool_unavailable:
+            try:
+                # spawn, not fork: the parent holds locks owned by other threads
+                _pool = ProcessPoolExecutor(
+                    max_workers=Config.IMAGE_PROCESS_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            except (OSError, NotImplementedError) as e:
+                # Some serverless sandboxes lack the semaphores multiprocessing needs
+                print(f"Image process pool unavailable, encoding in-thread: {str(e)}")
+                _pool_unavailable = True
+                return None
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def transcode(path: str, formats: tuple = None) -> dict:
+    """
+    Produce the resized WebP/AVIF variants of a spooled upload.
+
+    Only the file path crosses into the process pool; the pixels are decoded
+    by the worker.
+
+    Args:
+        path: Image file written by ``spool_upload``
+        formats: Output formats (defaults to ``output_formats()``)
+
+    Returns:
+        The result of ``process_image``
+
+    Raises:
+        ImageValidationError: If the file is not a decodable, sane image
+    """
+    formats = formats or output_formats()
+    if not formats:
+        raise RuntimeError('Pillow cannot encode any of IMAGE_FORMATS')
+    args = (path, Config.IMAGE_VARIANT_WIDTHS, formats, Config.IMAGE_QUALITY, Config.IMAGE_MAX_PIXELS)
+    pool = _get_pool()
+    if pool is None:
+        return process_image(*args)
+    return pool.submit(process_image, *args).result(timeout=Config.IMAGE_PROCESS_TIMEOUT)
+
+
+def build_manifest(prefix: str, result: dict, public_url) -> dict:
+    """
+    Describe stored variants in a srcset-ready form.
+
+    Args:
+        prefix: Storage path shared by the variants
+        result: Output of ``transcode``
+        public_url: Callable mapping a storage path to its public URL
+
+    Returns:
+        ``{'src', 'width', 'height', 'srcset': {format: str}, 'variants': [...]}``
+    """
+    variants = []
+    srcset = {}
+    for variant in result['variants']:
+        path = variant_path(prefix, variant['width'], variant['format'])
+        url = public_url(path)
+        variants.append({
+            'url': url,
+            'path': path,
+            'width': variant['width'],
+            'height': variant['height'],
+            'format': variant['format'],
+        })
+        srcset.setdefault(variant['format'], []).append(f"{url} {variant['width']}w")
+    fallback = [v for v in variants if v['format'] == 'webp'] or variants
+    return {
+        'src': fallback[-1]['url'],
+        'width': result['width'],
+        'height': result['height'],
+        'srcset': {fmt: ', '.join(entries) for fmt, entries in srcset.items()},
+        'variants': variants,
+    }
+
+
+def variant_path(prefix: str, width: int, fmt: str) -> str:
+    """Storage path of one variant."""
+    return f'{prefix}/{width}.{fmt}'
+
+
+def missing_variants(storage, prefix: str, variants: list) -> set:
+    """
+    List which ``(width, format)`` variants are not yet stored under ``prefix``.
+
+    Since prefixes are content hashes, anything already there is the same image.
+
+    Args:
+        storage: Supabase Storage bucket
+        prefix: Storage path shared by the variants
+        variants: The expected variants, from ``probe_image``
+    """
+    names = {item.get('name') for item in storage.list(prefix) or []}
+    return {
+        (variant['width'], variant['format']) for variant in variants
+        if f"{variant['width']}.{variant['format']}" not in names
+    }
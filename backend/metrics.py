@@ -0,0 +1,261 @@
+"""
+Request timing and hot-path instrumentation.
+
+Collects per-route latency histograms, the share of each request spent in
+Supabase round-trips and in JSON serialization, and cache/email counters.
+Everything is exposed in Prometheus text format by ``/admin/metrics`` and
+summarised per response in a ``Server-Timing`` header.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from json_provider import FastJSONProvider
+
+# Seconds; tuned for a web API where most requests land between 1 ms and 1 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Thread-safe Prometheus-style histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = {labels: dict(series, counts=list(series['counts'])) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            base = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['counts']):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_with_le(base, bound)} {cumulative}')
+            lines.append(f'{self.name}_bucket{_with_le(base, "+Inf")} {series["count"]}')
+            lines.append(f'{self.name}_sum{{{base}}} {series["sum"]:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {series["count"]}')
+        return lines
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    return ','.join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values))
+
+
+def _with_le(base: str, bound) -> str:
+    le = f'le="{bound}"'
+    return f'{{{base},{le}}}' if base else f'{{{le}}}'
+
+
+request_latency = Histogram(
+    'http_request_duration_seconds', 'Request latency by route.', ('method', 'route', 'status'))
+supabase_latency = Histogram(
+    'supabase_call_duration_seconds', 'Latency of each Supabase round-trip.', ('table', 'operation'))
+json_latency = Histogram(
+    'json_serialization_duration_seconds', 'Time spent serializing JSON response bodies.', ('route',))
+
+
+# ==================== Recording ====================
+
+# False inside supabase_fanout(), whose wall time is charged to the request once
+_charge_request = contextvars.ContextVar('metrics_charge_request', default=True)
+
+
+def _add_request_time(key: str, seconds: float) -> None:
+    if has_request_context():
+        setattr(g, key, getattr(g, key, 0.0) + seconds)
+
+
+@contextmanager
+def supabase_timer(table: str, operation: str):
+    """Time one Supabase round-trip and charge it to the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        supabase_latency.observe((table, operation), elapsed)
+        if _charge_request.get():
+            _add_request_time('_metrics_supabase', elapsed)
+
+
+@contextmanager
+def supabase_fanout(name: str):
+    """
+    Time a group of concurrent Supabase calls as one span.
+
+    Each call is still recorded per table, but only the group's wall time is
+    charged to the request, so Server-Timing never exceeds the real duration.
+    """
+    with supabase_timer(name, 'fanout'):
+        token = _charge_request.set(False)
+        try:
+            yield
+        finally:
+            _charge_request.reset(token)
+
+
+class TimedJSONProvider(FastJSONProvider):
+    """
+    JSON provider (orjson when available) that records how long ``jsonify`` takes.
+
+    Only ``response`` is timed; ``dumps`` is also used internally (e.g. by
+    the session serializer) and would muddy the numbers.
+    """
+
+    def response(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _add_request_time('_metrics_json', elapsed)
+            if has_request_context():
+                json_latency.observe((_route_label(),), elapsed)
+
+
+def _route_label() -> str:
+    """Use the URL rule, not the raw path, so IDs don't explode label cardinality."""
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+# ==================== Flask integration ====================
+
+def init_metrics(app) -> None:
+    """Install timing hooks, the timed JSON provider and Server-Timing headers."""
+    app.json_provider_class = TimedJSONProvider
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+        g._metrics_supabase = 0.0
+        g._metrics_json = 0.0
+
+    @app.after_request
+    def _record_request(response):
+        start = getattr(g, '_metrics_start', None)
+        if start is None:
+            return response
+        total = time.perf_counter() - start
+        request_latency.observe((request.method, _route_label(), str(response.status_code)), total)
+        response.headers['Server-Timing'] = ', '.join([
+            f'supabase;dur={g._metrics_supabase * 1000:.1f}',
+            f'json;dur={g._metrics_json * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        return response
+
+
+def render_prometheus() -> str:
+    """Render every metric in Prometheus text exposition format."""
+    from cache import catalog_cache, search_cache
+    from email_utils import email_metrics
+    from http_cache import body_cache
+    from ratelimit import rate_limit_metrics
+    from resilience import CLOSED, FAILURE_REASONS, HALF_OPEN, OPEN, resilience_metrics
+
+    lines = []
+    for histogram in (request_latency, supabase_latency, json_latency):
+        lines.extend(histogram.render())
+
+    lines += [
+        '# HELP catalog_cache_hits_total Catalog cache hits.',
+        '# TYPE catalog_cache_hits_total counter',
+        f'catalog_cache_hits_total {catalog_cache.hits}',
+        '# HELP catalog_cache_misses_total Catalog cache misses.',
+        '# TYPE catalog_cache_misses_total counter',
+        f'catalog_cache_misses_total {catalog_cache.misses}',
+        '# HELP catalog_cache_stale_hits_total Stale catalog entries served while a refresh ran.',
+        '# TYPE catalog_cache_stale_hits_total counter',
+        f'catalog_cache_stale_hits_total {catalog_cache.stale_hits}',
+        '# HELP catalog_cache_refreshes_total Background catalog refreshes, by outcome.',
+        '# TYPE catalog_cache_refreshes_total counter',
+        f'catalog_cache_refreshes_total{{outcome="ok"}} {catalog_cache.refreshes - catalog_cache.refresh_failures}',
+        f'catalog_cache_refreshes_total{{outcome="error"}} {catalog_cache.refresh_failures}',
+        '# HELP catalog_cache_fallbacks_total Catalog reads served from old entries because Supabase was down.',
+        '# TYPE catalog_cache_fallbacks_total counter',
+        f'catalog_cache_fallbacks_total {catalog_cache.fallbacks + search_cache.fallbacks}',
+        '# HELP search_cache_hits_total Template search cache hits (fresh or stale).',
+        '# TYPE search_cache_hits_total counter',
+        f'search_cache_hits_total {search_cache.hits + search_cache.stale_hits}',
+        '# HELP search_cache_misses_total Template searches sent to Supabase.',
+        '# TYPE search_cache_misses_total counter',
+        f'search_cache_misses_total {search_cache.misses}',
+        '# HELP response_body_cache_hits_total Responses served from a cached serialized body.',
+        '# TYPE response_body_cache_hits_total counter',
+        f'response_body_cache_hits_total {body_cache.hits}',
+        '# HELP response_body_cache_misses_total Responses that had to be serialized.',
+        '# TYPE response_body_cache_misses_total counter',
+        f'response_body_cache_misses_total {body_cache.misses}',
+    ]
+
+    limits = rate_limit_metrics()
+    lines += [
+        '# HELP contact_rejected_total Contact submissions rejected before reaching Supabase, by reason.',
+        '# TYPE contact_rejected_total counter',
+    ]
+    lines += [f'contact_rejected_total{{reason="{reason}"}} {limits[reason]}' for reason in ('ip', 'email', 'duplicate')]
+    lines += [
+        '# HELP rate_limit_backend_errors_total Failed shared rate limit calls (requests were allowed).',
+        '# TYPE rate_limit_backend_errors_total counter',
+        f'rate_limit_backend_errors_total {limits["backend_errors"]}',
+    ]
+
+    supabase = resilience_metrics()
+    lines += [
+        '# HELP supabase_circuit_state Supabase circuit breaker state (1 for the current state).',
+        '# TYPE supabase_circuit_state gauge',
+    ]
+    lines += [f'supabase_circuit_state{{state="{state}"}} {int(supabase["state"] == state)}' for state in (CLOSED, OPEN, HALF_OPEN)]
+    lines += [
+        '# HELP supabase_circuit_opened_total Times the Supabase circuit breaker opened.',
+        '# TYPE supabase_circuit_opened_total counter',
+        f'supabase_circuit_opened_total {supabase["opened"]}',
+        '# HELP supabase_calls_rejected_total Supabase calls refused by the open circuit.',
+        '# TYPE supabase_calls_rejected_total counter',
+        f'supabase_calls_rejected_total {supabase["rejected"]}',
+        '# HELP supabase_retries_total Supabase reads retried after a transient failure.',
+        '# TYPE supabase_retries_total counter',
+        f'supabase_retries_total {supabase["retries"]}',
+        '# HELP supabase_transient_failures_total Supabase call attempts that failed transiently, by reason.',
+        '# TYPE supabase_transient_failures_total counter',
+    ]
+    lines += [f'supabase_transient_failures_total{{reason="{reason}"}} {supabase[reason]}' for reason in FAILURE_REASONS]
+
+    email = email_metrics()
+    lines += [
+        '# HELP email_queue_depth Messages waiting for the SMTP delivery worker.',
+        '# TYPE email_queue_depth gauge',
+        f'email_queue_depth {email["queue_depth"]}',
+    ]
+    for key in ('sent', 'failed', 'dropped', 'retries', 'connections'):
+        lines += [
+            f'# HELP email_{key}_total SMTP delivery worker {key} count.',
+            f'# TYPE email_{key}_total counter',
+            f'email_{key}_total {email[key]}',
+        ]
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,42 @@
+-- =====================================================
+-- Migration Script: Bulk Reorder Function
+-- Run this in your Supabase SQL Editor
+-- =====================================================
+
+-- Applies a whole reorder in a single atomic statement.
+-- ordered_ids[i] gets display_order = positions[i]; rows whose
+-- display_order already matches are left untouched.
+CREATE OR REPLACE FUNCTION reorder_display_order(
+    target_table TEXT,
+    ordered_ids UUID[],
+    positions INTEGER[]
+)
+RETURNS INTEGER AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    IF target_table NOT IN ('project_templates', 'portfolio_projects') THEN
+        RAISE EXCEPTION 'reorder not supported for table %', target_table;
+    END IF;
+
+    IF array_length(ordered_ids, 1) IS DISTINCT FROM array_length(positions, 1) THEN
+        RAISE EXCEPTION 'ordered_ids and positions must have the same length';
+    END IF;
+
+    EXECUTE format(
+        'UPDATE %I AS t
+            SET display_order = o.position
+           FROM unnest($1, $2) AS o(id, position)
+          WHERE t.id = o.id
+            AND t.display_order IS DISTINCT FROM o.position',
+        target_table
+    ) USING ordered_ids, positions;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the service role (admin API) may reorder
+REVOKE EXECUTE ON FUNCTION reorder_display_order(TEXT, UUID[], INTEGER[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reorder_display_order(TEXT, UUID[], INTEGER[]) TO service_role;
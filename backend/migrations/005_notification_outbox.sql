@@ -0,0 +1,53 @@
+-- =====================================================
+-- Migration Script: Notification Outbox
+-- Run this in your Supabase SQL Editor
+-- =====================================================
+
+-- =====================================================
+-- Table: notification_outbox
+-- Pending email notifications, written in the same transaction as the
+-- contact submission and delivered later by the outbox drain
+-- =====================================================
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    contact_id UUID REFERENCES contact_submissions(id) ON DELETE CASCADE,
+    kind VARCHAR(50) NOT NULL DEFAULT 'contact_notification',
+    payload JSONB NOT NULL,
+    status VARCHAR(20) CHECK (status IN ('pending', 'sending', 'sent', 'failed')) DEFAULT 'pending',
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    claimed_at TIMESTAMP WITH TIME ZONE,
+    sent_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_pending ON notification_outbox(created_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_outbox_sending ON notification_outbox(claimed_at) WHERE status = 'sending';
+
+-- =====================================================
+-- Trigger: enqueue a notification for every contact submission
+-- SECURITY DEFINER so the public insert policy on contact_submissions
+-- is enough; the outbox itself stays private to the service role.
+-- =====================================================
+CREATE OR REPLACE FUNCTION enqueue_contact_notification()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO notification_outbox (contact_id, kind, payload)
+    VALUES (NEW.id, 'contact_notification', to_jsonb(NEW));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS enqueue_contact_notification ON contact_submissions;
+CREATE TRIGGER enqueue_contact_notification
+    AFTER INSERT ON contact_submissions
+    FOR EACH ROW
+    EXECUTE FUNCTION enqueue_contact_notification();
+
+-- =====================================================
+-- Row Level Security (RLS) Policies
+-- =====================================================
+ALTER TABLE notification_outbox ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role full access outbox" ON notification_outbox
+    FOR ALL USING (auth.role() = 'service_role');
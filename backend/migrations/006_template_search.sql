@@ -0,0 +1,97 @@
+-- =====================================================
+-- Migration Script: Template Search
+-- Run this in your Supabase SQL Editor
+-- =====================================================
+
+-- =====================================================
+-- Search document for a template: title (weight A), description (B) and
+-- tags (C). Indexed as an expression rather than stored in a column, so
+-- select('*') on project_templates keeps returning the same fields.
+-- =====================================================
+CREATE OR REPLACE FUNCTION project_template_search_vector(
+    title TEXT,
+    description TEXT,
+    tags JSONB
+)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')
+        || setweight(jsonb_to_tsvector('english'::regconfig, coalesce(tags, '[]'::jsonb), '["string"]'), 'C')
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE INDEX IF NOT EXISTS idx_templates_search ON project_templates
+    USING GIN (project_template_search_vector(title, description, tags));
+
+-- Tag containment (tags @> '["React","Flask"]'), also used by /api/templates?tags=
+CREATE INDEX IF NOT EXISTS idx_templates_tags ON project_templates USING GIN (tags jsonb_path_ops);
+
+-- =====================================================
+-- Ranked search with tag intersection and difficulty facets.
+--
+-- Returns {"results": [...], "total": n, "facets": {"difficulty": {...},
+-- "tags": [{"tag": ..., "count": n}, ...]}}. Difficulty counts ignore the
+-- difficulty filter so every option shows what it would return; tag counts
+-- are over the filtered matches. Without search_text every template
+-- matches, in catalog order.
+-- =====================================================
+CREATE OR REPLACE FUNCTION search_templates(
+    search_text TEXT DEFAULT NULL,
+    tag_filter JSONB DEFAULT '[]'::jsonb,
+    difficulty_filter TEXT DEFAULT NULL,
+    result_limit INTEGER DEFAULT 20,
+    result_offset INTEGER DEFAULT 0,
+    tag_facet_limit INTEGER DEFAULT 20
+)
+RETURNS JSONB AS $$
+    WITH query AS (
+        SELECT CASE
+            WHEN coalesce(btrim(search_text), '') = '' THEN NULL
+            ELSE websearch_to_tsquery('english'::regconfig, search_text)
+        END AS q
+    ),
+    matched AS (
+        SELECT t.*,
+               CASE WHEN query.q IS NULL THEN 0
+                    ELSE ts_rank_cd(project_template_search_vector(t.title, t.description, t.tags), query.q)
+               END AS rank
+          FROM project_templates t, query
+         WHERE (query.q IS NULL OR project_template_search_vector(t.title, t.description, t.tags) @@ query.q)
+           AND (jsonb_array_length(coalesce(tag_filter, '[]'::jsonb)) = 0 OR t.tags @> tag_filter)
+    ),
+    filtered AS (
+        SELECT * FROM matched
+         WHERE difficulty_filter IS NULL OR difficulty = difficulty_filter
+    ),
+    page AS (
+        SELECT * FROM filtered
+         ORDER BY rank DESC, display_order, created_at DESC, id
+         LIMIT result_limit OFFSET result_offset
+    )
+    SELECT jsonb_build_object(
+        'results', coalesce(
+            (SELECT jsonb_agg(to_jsonb(page) ORDER BY rank DESC, display_order, created_at DESC, id) FROM page),
+            '[]'::jsonb),
+        'total', (SELECT count(*) FROM filtered),
+        'facets', jsonb_build_object(
+            'difficulty', coalesce(
+                (SELECT jsonb_object_agg(difficulty, n)
+                   FROM (SELECT difficulty, count(*) AS n FROM matched
+                          WHERE difficulty IS NOT NULL GROUP BY difficulty) d),
+                '{}'::jsonb),
+            'tags', coalesce(
+                (SELECT jsonb_agg(jsonb_build_object('tag', tag, 'count', n) ORDER BY n DESC, tag)
+                   FROM (SELECT tag, count(*) AS n
+                           FROM filtered,
+                                jsonb_array_elements_text(
+                                    CASE WHEN jsonb_typeof(filtered.tags) = 'array' THEN filtered.tags ELSE '[]'::jsonb END
+                                ) AS tag
+                          GROUP BY tag
+                          ORDER BY n DESC, tag
+                          LIMIT tag_facet_limit) s),
+                '[]'::jsonb)
+        )
+    )
+$$ LANGUAGE sql STABLE;
+
+-- Read-only over public data, so the anon key (public API) may call it
+GRANT EXECUTE ON FUNCTION search_templates(TEXT, JSONB, TEXT, INTEGER, INTEGER, INTEGER) TO anon, authenticated, service_role;
@@ -0,0 +1,61 @@
+-- =====================================================
+-- Migration Script: Shared Rate Limit Buckets
+-- Run this in your Supabase SQL Editor
+-- Only needed with RATE_LIMIT_BACKEND=supabase
+-- =====================================================
+
+-- =====================================================
+-- Table: rate_limit_buckets
+-- Token buckets for the contact form, keyed by a hash of the client IP,
+-- email address or message content
+-- =====================================================
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    bucket_key TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Used by the cron prune of idle buckets
+CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_updated_at ON rate_limit_buckets(updated_at);
+
+-- No policies: only the service role (admin client) can read or write
+ALTER TABLE rate_limit_buckets ENABLE ROW LEVEL SECURITY;
+
+-- Refills the bucket for the time since its last use, then spends one token
+-- if available. Returns 0 when a token was spent, otherwise the seconds until
+-- one will be. The row lock serialises concurrent calls for the same key.
+CREATE OR REPLACE FUNCTION take_rate_limit_token(
+    key_name TEXT,
+    refill_per_second DOUBLE PRECISION,
+    burst DOUBLE PRECISION
+)
+RETURNS DOUBLE PRECISION AS $$
+DECLARE
+    current_tokens DOUBLE PRECISION;
+    last_update TIMESTAMP WITH TIME ZONE;
+    now_ts TIMESTAMP WITH TIME ZONE := clock_timestamp();
+BEGIN
+    INSERT INTO rate_limit_buckets (bucket_key, tokens, updated_at)
+    VALUES (key_name, burst, now_ts)
+    ON CONFLICT (bucket_key) DO NOTHING;
+
+    SELECT tokens, updated_at INTO current_tokens, last_update
+      FROM rate_limit_buckets
+     WHERE bucket_key = key_name
+       FOR UPDATE;
+
+    current_tokens := LEAST(burst, current_tokens + EXTRACT(EPOCH FROM (now_ts - last_update)) * refill_per_second);
+
+    IF current_tokens >= 1 THEN
+        UPDATE rate_limit_buckets SET tokens = current_tokens - 1, updated_at = now_ts WHERE bucket_key = key_name;
+        RETURN 0;
+    END IF;
+
+    UPDATE rate_limit_buckets SET tokens = current_tokens, updated_at = now_ts WHERE bucket_key = key_name;
+    RETURN (1 - current_tokens) / refill_per_second;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the service role (contact route via the admin client) may take tokens
+REVOKE EXECUTE ON FUNCTION take_rate_limit_token(TEXT, DOUBLE PRECISION, DOUBLE PRECISION) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION take_rate_limit_token(TEXT, DOUBLE PRECISION, DOUBLE PRECISION) TO service_role;
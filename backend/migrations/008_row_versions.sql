@@ -0,0 +1,126 @@
+-- =====================================================
+-- Migration Script: Row Versions and Batched Admin Updates
+-- Run this in your Supabase SQL Editor
+-- =====================================================
+
+-- Every update bumps a row's version, so an admin edit made against an
+-- older copy of the row can be detected and refused
+ALTER TABLE project_templates ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE portfolio_projects ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE team_members ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION bump_row_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.version = OLD.version + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bump_project_templates_version ON project_templates;
+CREATE TRIGGER bump_project_templates_version
+    BEFORE UPDATE ON project_templates
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_row_version();
+
+DROP TRIGGER IF EXISTS bump_portfolio_projects_version ON portfolio_projects;
+CREATE TRIGGER bump_portfolio_projects_version
+    BEFORE UPDATE ON portfolio_projects
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_row_version();
+
+DROP TRIGGER IF EXISTS bump_team_members_version ON team_members;
+CREATE TRIGGER bump_team_members_version
+    BEFORE UPDATE ON team_members
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_row_version();
+
+-- Applies a batch of row edits in one atomic call.
+-- patches is a JSON array of {"id", "version", "changes"}; a null version
+-- skips the check. Each row is locked, checked against its expected version
+-- and updated with only the columns whose value actually differs, so a
+-- no-op edit writes nothing and keeps its version.
+-- If any row is missing or has moved on, nothing is applied and the
+-- current copies of the conflicting rows are returned instead.
+-- Returns {"rows": [...], "changed": n, "conflicts": [...], "missing": [...]}.
+CREATE OR REPLACE FUNCTION apply_row_patches(
+    target_table TEXT,
+    patches JSONB
+)
+RETURNS JSONB AS $$
+DECLARE
+    patch JSONB;
+    row_id UUID;
+    expected_version INTEGER;
+    current_row JSONB;
+    wanted_row JSONB;
+    set_list TEXT;
+    result_rows JSONB := '[]'::jsonb;
+    changed_count INTEGER := 0;
+    conflicts JSONB := '[]'::jsonb;
+    missing JSONB := '[]'::jsonb;
+BEGIN
+    IF target_table NOT IN ('project_templates', 'portfolio_projects', 'team_members') THEN
+        RAISE EXCEPTION 'batch update not supported for table %', target_table;
+    END IF;
+
+    BEGIN
+        FOR patch IN SELECT value FROM jsonb_array_elements(patches) LOOP
+            row_id := (patch->>'id')::uuid;
+            expected_version := (patch->>'version')::integer;
+
+            EXECUTE format('SELECT to_jsonb(t) FROM %I AS t WHERE t.id = $1 FOR UPDATE', target_table)
+               INTO current_row USING row_id;
+
+            IF current_row IS NULL THEN
+                missing := missing || to_jsonb(row_id);
+                CONTINUE;
+            END IF;
+            IF expected_version IS NOT NULL AND (current_row->>'version')::integer <> expected_version THEN
+                conflicts := conflicts || current_row;
+                CONTINUE;
+            END IF;
+
+            -- Compare in the columns' own types, so e.g. equal timestamps in
+            -- different notation don't count as a change
+            EXECUTE format('SELECT to_jsonb(jsonb_populate_record(NULL::%I, $1))', target_table)
+               INTO wanted_row USING patch->'changes';
+
+            SELECT string_agg(format('%I = r.%I', key, key), ', ')
+              INTO set_list
+              FROM jsonb_object_keys(patch->'changes') AS key
+             WHERE wanted_row->key IS DISTINCT FROM current_row->key;
+
+            IF set_list IS NULL THEN
+                result_rows := result_rows || current_row;
+                CONTINUE;
+            END IF;
+
+            EXECUTE format(
+                'UPDATE %1$I AS t
+                    SET %2$s
+                   FROM jsonb_populate_record(NULL::%1$I, $2) AS r
+                  WHERE t.id = $1
+              RETURNING to_jsonb(t)',
+                target_table, set_list
+            ) INTO current_row USING row_id, patch->'changes';
+
+            result_rows := result_rows || current_row;
+            changed_count := changed_count + 1;
+        END LOOP;
+
+        IF jsonb_array_length(conflicts) > 0 OR jsonb_array_length(missing) > 0 THEN
+            RAISE EXCEPTION USING ERRCODE = 'P0409', MESSAGE = 'row version conflict';
+        END IF;
+    EXCEPTION WHEN SQLSTATE 'P0409' THEN
+        -- Rolls back every update made above; the collected conflicts survive
+        RETURN jsonb_build_object('rows', '[]'::jsonb, 'changed', 0, 'conflicts', conflicts, 'missing', missing);
+    END;
+
+    RETURN jsonb_build_object('rows', result_rows, 'changed', changed_count, 'conflicts', conflicts, 'missing', missing);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the service role (admin API) may apply batches
+REVOKE EXECUTE ON FUNCTION apply_row_patches(TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION apply_row_patches(TEXT, JSONB) TO service_role;
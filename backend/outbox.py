@@ -0,0 +1,174 @@
+"""
+Durable outbox for contact notification emails.
+
+A database trigger (migrations/005_notification_outbox.sql) records a pending
+outbox row in the same transaction as every contact submission. This module
+drains pending rows in batches and delivers them, so a serverless freeze
+after the response never loses a notification.
+
+Run a drain from the command line with:
+
+    python outbox.py [--batch-size N]
+"""
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from config import Config
+from supabase_client import execute, get_supabase_admin_client
+from email_utils import (
+    auto_reply_address, build_auto_reply_message, build_contact_message, build_digest_message,
+    email_configured, get_delivery_worker
+)
+
+OUTBOX_TABLE = 'notification_outbox'
+
+_drain_lock = threading.Lock()
+_drain_thread = None
+_drain_again = False
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _claim_batch(supabase, batch_size: int, skip=()) -> list:
+    """
+    Claim up to ``batch_size`` pending rows for this drain.
+
+    Rows stuck in 'sending' longer than OUTBOX_CLAIM_TIMEOUT (a drain that was
+    frozen or killed mid-way) are released first. Claiming is a conditional
+    update, so concurrent drains never receive the same row. Rows in ``skip``
+    (those this drain already failed to deliver) are left for the next one.
+    """
+    cutoff = (_now() - timedelta(seconds=Config.OUTBOX_CLAIM_TIMEOUT)).isoformat()
+    execute(supabase.table(OUTBOX_TABLE).update({'status': 'pending'}).eq('status', 'sending').lt('claimed_at', cutoff))
+
+    query = supabase.table(OUTBOX_TABLE).select('id').eq('status', 'pending')
+    if skip:
+        query = query.not_.in_('id', sorted(skip))
+    pending = execute(query.order('created_at').limit(batch_size)).data
+    if not pending:
+        return []
+    ids = [row['id'] for row in pending]
+    claimed = execute(supabase.table(OUTBOX_TABLE).update({
+        'status': 'sending',
+        'claimed_at': _now().isoformat(),
+    }).in_('id', ids).eq('status', 'pending')).data
+    return sorted(claimed, key=lambda row: row.get('created_at') or '')
+
+
+def _record_failure(supabase, row: dict, error: str) -> None:
+    """Return a row to the queue, or mark it failed after OUTBOX_MAX_ATTEMPTS."""
+    attempts = (row.get('attempts') or 0) + 1
+    status = 'failed' if attempts >= Config.OUTBOX_MAX_ATTEMPTS else 'pending'
+    execute(supabase.table(OUTBOX_TABLE).update({
+        'status': status,
+        'attempts': attempts,
+        'last_error': error,
+    }).eq('id', row['id']))
+
+
+def drain_outbox(batch_size: int = None) -> dict:
+    """
+    Deliver pending notifications until the outbox is empty.
+
+    Each claimed batch is sent over one SMTP session. Batches of at least
+    OUTBOX_DIGEST_THRESHOLD notifications are coalesced into a single digest.
+    A notification that fails counts one attempt and waits for the next drain.
+
+    Args:
+        batch_size: Rows claimed per round (defaults to OUTBOX_BATCH_SIZE)
+
+    Returns:
+        Counts of sent and failed notifications and emails used
+    """
+    result = {'sent': 0, 'failed': 0, 'emails': 0}
+    if not email_configured():
+        print("Email not configured - leaving outbox pending")
+        return result
+
+    batch_size = batch_size or Config.OUTBOX_BATCH_SIZE
+    supabase = get_supabase_admin_client()
+    worker = get_delivery_worker()
+
+    failed_ids = set()
+    while True:
+        rows = _claim_batch(supabase, batch_size, failed_ids)
+        if not rows:
+            return result
+
+        payloads = [row['payload'] for row in rows]
+        if len(rows) >= Config.OUTBOX_DIGEST_THRESHOLD:
+            groups = [rows]
+            messages = [build_digest_message(payloads)]
+        else:
+            groups = [[row] for row in rows]
+            messages = [build_contact_message(payload) for payload in payloads]
+
+        delivered = worker.send_batch(messages)
+        sent_ids = []
+        for group, ok in zip(groups, delivered):
+            if ok:
+                sent_ids.extend(row['id'] for row in group)
+                result['emails'] += 1
+            else:
+                for row in group:
+                    _record_failure(supabase, row, 'SMTP delivery failed')
+                    failed_ids.add(row['id'])
+                result['failed'] += len(group)
+
+        if Config.CONTACT_AUTO_REPLY:
+            # Best-effort: auto-replies are not retried, only the admin alert is durable
+            replies = [build_auto_reply_message(row['payload']) for group, ok in zip(groups, delivered) if ok
+                       for row in group if auto_reply_address(row['payload'])]
+            if replies:
+                worker.send_batch(replies)
+
+        if sent_ids:
+            execute(supabase.table(OUTBOX_TABLE).update({
+                'status': 'sent',
+                'sent_at': _now().isoformat(),
+            }).in_('id', sent_ids))
+            result['sent'] += len(sent_ids)
+
+        if not any(delivered):
+            # SMTP is down; stop instead of cycling through the whole outbox
+            return result
+
+
+def _drain_loop() -> None:
+    global _drain_thread, _drain_again
+    while True:
+        try:
+            drain_outbox()
+        except Exception as e:
+            print(f"Outbox drain failed: {str(e)}")
+        with _drain_lock:
+            if not _drain_again:
+                _drain_thread = None
+                return
+            _drain_again = False
+
+
+def drain_outbox_async() -> None:
+    """
+    Start a best-effort background drain, e.g. right after a submission.
+
+    At most one drain thread runs at a time; a request made while one is
+    running schedules exactly one more pass. Anything this misses (say the
+    serverless instance is frozen) is picked up by the next cron or CLI drain.
+    """
+    global _drain_thread, _drain_again
+    with _drain_lock:
+        if _drain_thread is not None:
+            _drain_again = True
+            return
+        _drain_thread = threading.Thread(target=_drain_loop, name='outbox-drain', daemon=True)
+        _drain_thread.start()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Deliver pending contact notification emails.')
+    parser.add_argument('--batch-size', type=int, default=None, help='rows claimed per round')
+    args = parser.parse_args()
+    print(drain_outbox(args.batch_size))
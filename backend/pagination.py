@@ -0,0 +1,288 @@
+"""
+Query-string helpers for list endpoints.
+
+Supports keyset (cursor) pagination, ``fields=`` projection and simple
+server-side filters. Everything parsed here is returned as hashable tuples
+so the public routes can use it directly in cache keys.
+"""
+import base64
+import json
+from flask import request
+from config import Config
+from supabase_client import execute, execute_async
+
+# Sort keys as (column, descending). The trailing id makes every key unique.
+CATALOG_KEYSET = (('display_order', False), ('created_at', True), ('id', False))
+CONTACTS_KEYSET = (('submitted_at', True), ('id', False))
+
+TABLE_COLUMNS = {
+    'project_templates': (
+        'id', 'title', 'description', 'image_url', 'difficulty', 'tags',
+        'live_preview_url', 'is_featured', 'display_order', 'created_at', 'updated_at', 'version',
+    ),
+    'portfolio_projects': (
+        'id', 'title', 'description', 'image_url', 'tags', 'live_link',
+        'is_featured', 'display_order', 'created_at', 'updated_at', 'version',
+    ),
+    'team_members': (
+        'id', 'name', 'role', 'bio', 'skills', 'avatar_url', 'github_url',
+        'linkedin_url', 'color_theme', 'display_order', 'created_at', 'updated_at', 'version',
+    ),
+    'contact_submissions': (
+        'id', 'name', 'email', 'phone', 'project_type', 'message', 'is_read', 'submitted_at',
+    ),
+}
+
+DIFFICULTIES = ('Beginner', 'Intermediate', 'Advanced')
+
+MAX_SEARCH_LENGTH = 200
+
+
+class QueryParamError(ValueError):
+    """Raised for malformed list query parameters; routes answer with a 400."""
+
+
+# ==================== Parsing ====================
+
+def parse_fields(table, keyset):
+    """
+    Parse ``fields=a,b`` into a PostgREST select string.
+
+    Keyset columns are always included so a next cursor can be built.
+    Returns ``'*'`` when no projection is requested.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return '*'
+    allowed = TABLE_COLUMNS[table]
+    fields = []
+    for name in raw.split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in allowed:
+            raise QueryParamError(f'Unknown field: {name}')
+        if name not in fields:
+            fields.append(name)
+    for column, _ in keyset:
+        if column not in fields:
+            fields.append(column)
+    return ','.join(fields)
+
+
+def parse_limit(default=None):
+    """Parse ``limit=``, capped at MAX_PAGE_SIZE. Returns ``default`` when absent."""
+    raw = request.args.get('limit')
+    if raw is None:
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise QueryParamError('limit must be an integer')
+    if limit < 1:
+        raise QueryParamError('limit must be positive')
+    return min(limit, Config.MAX_PAGE_SIZE)
+
+
+def parse_cursor(keyset):
+    """Decode an opaque ``cursor=`` token into a tuple of keyset values."""
+    raw = request.args.get('cursor')
+    if not raw:
+        return None
+    return decode_cursor(raw, keyset)
+
+
+def decode_cursor(raw, keyset):
+    """Decode a ``next_cursor`` token; raises QueryParamError if it is malformed."""
+    try:
+        padded = raw + '=' * (-len(raw) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise QueryParamError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(keyset):
+        raise QueryParamError('Invalid cursor')
+    # Keyset values are scalars; anything else would be unhashable as a cache key
+    if not all(value is None or isinstance(value, (str, int, float, bool)) for value in values):
+        raise QueryParamError('Invalid cursor')
+    return tuple(values)
+
+
+def parse_bool_arg(name):
+    """Parse an optional ``true``/``false`` query parameter."""
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    lowered = raw.lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise QueryParamError(f'{name} must be true or false')
+
+
+def parse_choice_arg(name, choices):
+    """Parse an optional query parameter restricted to ``choices``."""
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    if raw not in choices:
+        raise QueryParamError(f"{name} must be one of: {', '.join(choices)}")
+    return raw
+
+
+def parse_list_arg(name):
+    """Parse an optional comma-separated query parameter into a sorted tuple."""
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    values = tuple(sorted({item.strip() for item in raw.split(',') if item.strip()}))
+    return values or None
+
+
+def parse_offset():
+    """Parse ``offset=`` (default 0) for endpoints paged by position rather than cursor."""
+    raw = request.args.get('offset')
+    if raw is None:
+        return 0
+    try:
+        offset = int(raw)
+    except ValueError:
+        raise QueryParamError('offset must be an integer')
+    if offset < 0:
+        raise QueryParamError('offset must not be negative')
+    return offset
+
+
+def parse_search_text(name='q'):
+    """
+    Parse a free-text search parameter, normalised for use in a cache key.
+
+    Whitespace is collapsed and case folded (the search is case-insensitive
+    anyway). Returns None when absent or blank.
+    """
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    text = ' '.join(raw.split()).casefold()
+    if len(text) > MAX_SEARCH_LENGTH:
+        raise QueryParamError(f'{name} must be at most {MAX_SEARCH_LENGTH} characters')
+    return text or None
+
+
+def parse_page_args(table, keyset, default_limit=None):
+    """Parse ``fields``, ``limit`` and ``cursor`` for a list endpoint."""
+    return parse_fields(table, keyset), parse_limit(default_limit), parse_cursor(keyset)
+
+
+def parse_filters(table):
+    """
+    Parse the server-side filters supported by a table into filter tuples.
+    
+    - project_templates: ``difficulty``, ``tags`` (all must match), ``featured``
+    - portfolio_projects: ``featured``
+    - contact_submissions: ``is_read``
+    """
+    filters = []
+    if table == 'project_templates':
+        difficulty = parse_choice_arg('difficulty', DIFFICULTIES)
+        if difficulty:
+            filters.append(('eq', 'difficulty', difficulty))
+        tags = parse_list_arg('tags')
+        if tags:
+            filters.append(('contains', 'tags', tags))
+    if table in ('project_templates', 'portfolio_projects'):
+        featured = parse_bool_arg('featured')
+        if featured is not None:
+            filters.append(('eq', 'is_featured', 'true' if featured else 'false'))
+    if table == 'contact_submissions':
+        is_read = parse_bool_arg('is_read')
+        if is_read is not None:
+            filters.append(('eq', 'is_read', 'true' if is_read else 'false'))
+    return tuple(filters)
+
+
+# ==================== Query building ====================
+
+def _quote(value):
+    """Quote a value for use inside a PostgREST logic tree."""
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _after(keyset, values):
+    """
+    Build the PostgREST ``or`` expression for rows sorting after ``values``.
+
+    PostgreSQL sorts NULLs last ascending and first descending, so on an
+    ascending column a non-null value is followed by every NULL row, and on
+    a descending one a NULL is followed by every non-null row. The final key
+    (``id``) is never NULL.
+    """
+    (column, desc), rest = keyset[0], keyset[1:]
+    value = values[0]
+    parts = []
+    if value is None:
+        equal = f'{column}.is.null'
+        if desc:
+            parts.append(f'{column}.not.is.null')
+    else:
+        equal = f'{column}.eq.{_quote(value)}'
+        parts.append(f"{column}.{'lt' if desc else 'gt'}.{_quote(value)}")
+        if not desc and rest:
+            parts.append(f'{column}.is.null')
+    if rest:
+        parts.append(f'and({equal},or({_after(rest, values[1:])}))')
+    return ','.join(parts)
+
+
+def apply_filters(query, filters):
+    """Apply ``(operator, column, value)`` filter tuples to a query."""
+    for operator, column, value in filters:
+        if operator == 'eq':
+            query = query.eq(column, value)
+        elif operator == 'contains':
+            # JSONB array containment: tags @> '["a","b"]'
+            query = query.filter(column, 'cs', json.dumps(list(value)))
+    return query
+
+
+def _prepare_page(query, keyset, limit, cursor):
+    """Add ordering, the cursor position and the look-ahead limit to a query."""
+    # PostgREST expects one comma-separated order param, and postgrest-py 0.13
+    # has no or_() helper, so both params are added directly
+    order = ','.join(f"{column}{'.desc' if desc else ''}" for column, desc in keyset)
+    query.params = query.params.add('order', order)
+    if cursor is not None:
+        query.params = query.params.add('or', f'({_after(keyset, cursor)})')
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
+
+
+def _page_result(rows, keyset, limit):
+    """Trim the look-ahead row and build the next cursor token."""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    token = json.dumps([last.get(column) for column, _ in keyset], separators=(',', ':'))
+    return rows, base64.urlsafe_b64encode(token.encode()).decode().rstrip('=')
+
+
+def fetch_page(query, keyset, limit=None, cursor=None):
+    """
+    Order, position and execute a select query.
+
+    Fetches one extra row to detect whether another page exists.
+
+    Returns:
+        (rows, next_cursor) where next_cursor is None on the last page
+    """
+    rows = execute(_prepare_page(query, keyset, limit, cursor)).data
+    return _page_result(rows, keyset, limit)
+
+
+async def fetch_page_async(query, keyset, limit=None, cursor=None):
+    """``fetch_page`` for queries built on the async PostgREST client."""
+    rows = (await execute_async(_prepare_page(query, keyset, limit, cursor))).data
+    return _page_result(rows, keyset, limit)
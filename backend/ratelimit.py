@@ -0,0 +1,220 @@
+"""
+Rate limiting and duplicate suppression for the public contact form.
+
+Submissions are metered by token buckets keyed by client IP and by email
+address: each bucket holds up to ``burst`` tokens and refills at a steady
+hourly rate, and a submission spends one token from each. Identical
+resubmissions (same email and message) are rejected for
+CONTACT_DEDUP_SECONDS (0 turns this off), implemented as a one-token bucket
+per content hash.
+All checks run before anything touches Supabase or SMTP.
+
+Buckets live in process memory by default. With ``RATE_LIMIT_BACKEND=supabase``
+they are kept in the ``rate_limit_buckets`` table (migrations/007) so every
+instance shares them; if that call fails the check lets the submission
+through rather than blocking real visitors.
+
+Keys are hashed, so neither backend stores raw IPs or email addresses.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from flask import request
+from config import Config
+from supabase_client import execute, get_supabase_admin_client
+
+BUCKETS_TABLE = 'rate_limit_buckets'
+
+_counts = {'ip': 0, 'email': 0, 'duplicate': 0, 'backend_errors': 0}
+_counts_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _counts_lock:
+        _counts[name] += 1
+
+
+def rate_limit_metrics() -> dict:
+    """Rejections by reason, plus shared-backend failures, since startup."""
+    with _counts_lock:
+        return dict(_counts)
+
+
+class ContactRejected(Exception):
+    """Raised for a throttled or duplicate submission; routes answer with ``status``."""
+
+    def __init__(self, message: str, status: int, retry_after: float):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+# ==================== Backends ====================
+
+class MemoryBackend:
+    """Token buckets in a bounded LRU; per instance, lost on restart."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        """
+        Spend one token from ``key``'s bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (a new bucket starts full)
+
+        Returns:
+            0 if a token was spent, otherwise seconds until one is available
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1 if wait == 0 else tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self, key: str) -> None:
+        """Forget a bucket, returning it to full."""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def prune(self) -> None:
+        """Nothing to do; the LRU bound keeps memory flat."""
+
+
+class SupabaseBackend:
+    """Token buckets in Postgres, shared by every instance (see migrations/007)."""
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        try:
+            supabase = get_supabase_admin_client()
+            result = execute(supabase.rpc('take_rate_limit_token', {
+                'key_name': key, 'refill_per_second': rate, 'burst': burst,
+            }))
+            return float(result.data or 0)
+        except Exception as e:
+            _count('backend_errors')
+            print(f"Rate limit check failed, allowing request: {str(e)}")
+            return 0.0
+
+    def reset(self, key: str) -> None:
+        try:
+            supabase = get_supabase_admin_client()
+            execute(supabase.table(BUCKETS_TABLE).delete().eq('bucket_key', key))
+        except Exception as e:
+            _count('backend_errors')
+            print(f"Rate limit reset failed: {str(e)}")
+
+    def prune(self, max_age: timedelta = timedelta(days=1)) -> None:
+        """Delete buckets untouched for ``max_age``; by then they have refilled anyway."""
+        cutoff = (datetime.now(timezone.utc) - max_age).isoformat()
+        try:
+            supabase = get_supabase_admin_client()
+            execute(supabase.table(BUCKETS_TABLE).delete().lt('updated_at', cutoff))
+        except Exception as e:
+            _count('backend_errors')
+            print(f"Rate limit prune failed: {str(e)}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the configured bucket backend (created on first use)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if Config.RATE_LIMIT_BACKEND == 'supabase':
+                    _backend = SupabaseBackend()
+                else:
+                    _backend = MemoryBackend(Config.RATE_LIMIT_MAX_KEYS)
+    return _backend
+
+
+# ==================== Contact form checks ====================
+
+def _key(scope: str, value: str) -> str:
+    digest = hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+    return f'contact:{scope}:{digest}'
+
+
+def client_ip() -> str:
+    """
+    The client's address, read from X-Forwarded-For behind TRUSTED_PROXY_HOPS proxies.
+
+    Each trusted proxy appends the address it received the request from, so
+    the client is the entry that many places from the end. Entries before it
+    are client-supplied and ignored.
+    """
+    hops = Config.TRUSTED_PROXY_HOPS
+    forwarded = request.headers.get('X-Forwarded-For')
+    if hops > 0 and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',') if address.strip()]
+        if addresses:
+            return addresses[-min(hops, len(addresses))]
+    return request.remote_addr or 'unknown'
+
+
+def _content_key(email: str, message: str) -> str:
+    return _key('dedup', f"{email}\0{' '.join(message.split())}")
+
+
+def throttle_contact(ip: str, email: str, message: str):
+    """
+    Apply the contact form's rate limits and duplicate window.
+
+    Returns:
+        The duplicate-window key to pass to ``forget_contact`` if the
+        submission then fails, or None when limiting or the window is disabled
+
+    Raises:
+        ContactRejected: 429 when a bucket is empty, 409 for a duplicate
+    """
+    if not Config.RATE_LIMIT_ENABLED:
+        return None
+    backend = get_backend()
+    email = email.strip().lower()
+
+    # Duplicates first, so a double submit doesn't spend rate limit tokens
+    dedup_key = None
+    if Config.CONTACT_DEDUP_SECONDS > 0:
+        dedup_key = _content_key(email, message)
+        wait = backend.take(dedup_key, 1 / Config.CONTACT_DEDUP_SECONDS, 1)
+        if wait > 0:
+            _count('duplicate')
+            raise ContactRejected('This message has already been submitted', 409, wait)
+
+    for scope, value, burst, per_hour in (
+        ('ip', ip, Config.CONTACT_RATE_LIMIT_IP_BURST, Config.CONTACT_RATE_LIMIT_IP_PER_HOUR),
+        ('email', email, Config.CONTACT_RATE_LIMIT_EMAIL_BURST, Config.CONTACT_RATE_LIMIT_EMAIL_PER_HOUR),
+    ):
+        wait = backend.take(_key(scope, value), per_hour / 3600, burst)
+        if wait > 0:
+            _count(scope)
+            # The message was not accepted, so it may be sent again once allowed
+            forget_contact(dedup_key)
+            raise ContactRejected('Too many submissions, please try again later', 429, wait)
+    return dedup_key
+
+
+def forget_contact(dedup_key) -> None:
+    """Reopen the duplicate window for a submission that failed, so it can be retried."""
+    if dedup_key is not None:
+        get_backend().reset(dedup_key)
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
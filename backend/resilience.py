@@ -0,0 +1,271 @@
+"""
+Deadlines, retries and a circuit breaker for Supabase calls.
+
+``supabase_client.execute`` and ``execute_async`` run every PostgREST call
+through here:
+
+- Each call has a deadline (SUPABASE_READ_DEADLINE for reads,
+  SUPABASE_WRITE_DEADLINE for writes) that bounds every attempt's timeout,
+  so a slow region costs a worker seconds, not minutes.
+- Reads and read-only RPCs that fail transiently (timeouts, dropped
+  connections, 5xx, Postgres connection errors) are retried up to
+  SUPABASE_READ_RETRIES times with full-jitter backoff, within the same
+  deadline. Writes are never retried.
+- SUPABASE_BREAKER_THRESHOLD transient failures in a row open the circuit:
+  calls then fail at once with SupabaseUnavailable for
+  SUPABASE_BREAKER_COOLDOWN seconds, after which a single trial call decides
+  whether it closes again. Cached catalog reads fall back to the last data
+  they held (see ``cache.cached_query``).
+
+Errors that show Supabase is up (a constraint violation, a missing row) don't
+count against the breaker.
+"""
+import asyncio
+import math
+import random
+import threading
+import time
+from flask import jsonify
+from config import Config
+
+# Longest single backoff between retries, seconds
+MAX_RETRY_DELAY = 1.0
+
+# Read-only RPCs, safe to retry like a select
+IDEMPOTENT_RPCS = {'search_templates'}
+
+# Postgres SQLSTATE classes for connection trouble, resource exhaustion and
+# operator intervention (e.g. statement timeout), plus PostgREST's own
+# "can't reach the database" codes
+_TRANSIENT_SQLSTATE_CLASSES = ('08', '53', '57')
+_TRANSIENT_CODES = {'40001', '40P01', 'PGRST000', 'PGRST001', 'PGRST002'}
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+FAILURE_REASONS = ('timeout', 'connection', 'server')
+
+_counts = {'retries': 0, 'rejected': 0, 'opened': 0, **{reason: 0 for reason in FAILURE_REASONS}}
+_counts_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _counts_lock:
+        _counts[name] += 1
+
+
+class SupabaseUnavailable(Exception):
+    """Raised without calling Supabase while the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__('Supabase is unavailable, please try again shortly')
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial call."""
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        """Seconds until the next trial call is allowed (0 unless open)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def before_call(self) -> None:
+        """
+        Admit a call or refuse it.
+
+        Raises:
+            SupabaseUnavailable: while open, or while a half-open trial is running
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN:
+                wait = self._opened_at + self.cooldown - time.monotonic()
+                if wait > 0:
+                    _count('rejected')
+                    raise SupabaseUnavailable(wait)
+                self.state = HALF_OPEN
+            if self._trial_running:
+                _count('rejected')
+                raise SupabaseUnavailable(1.0)
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                print("Supabase circuit closed")
+            self.state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.threshold):
+                if self.state == CLOSED:
+                    print(f"Supabase circuit opened after {self._failures} failures")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                _count('opened')
+
+    def release(self) -> None:
+        """End a call that proved nothing either way (e.g. it was cancelled)."""
+        with self._lock:
+            self._trial_running = False
+
+
+breaker = CircuitBreaker(Config.SUPABASE_BREAKER_THRESHOLD, Config.SUPABASE_BREAKER_COOLDOWN)
+
+
+def resilience_metrics() -> dict:
+    """Retries, transient failures by reason and breaker counters since startup, plus the breaker state."""
+    with _counts_lock:
+        counts = dict(_counts)
+    counts['state'] = breaker.state
+    return counts
+
+
+# ==================== Classifying calls and errors ====================
+
+def is_idempotent(table: str, operation: str) -> bool:
+    """True for calls that can safely be sent twice."""
+    return operation in ('select', 'count') or (operation == 'rpc' and table in IDEMPOTENT_RPCS)
+
+
+def failure_reason(error: BaseException):
+    """
+    Classify a failed call.
+
+    Returns:
+        ``timeout``, ``connection`` or ``server`` when the failure says
+        Supabase is slow or down, None when the request itself was at fault
+    """
+    import httpx
+    from postgrest.exceptions import APIError
+
+    if isinstance(error, (httpx.TimeoutException, TimeoutError)):
+        return 'timeout'
+    if isinstance(error, httpx.TransportError):
+        return 'connection'
+    if isinstance(error, APIError):
+        code = error.code
+        # Non-JSON error bodies (e.g. a gateway 502) carry the HTTP status instead
+        if isinstance(code, int):
+            return 'server' if code >= 500 else None
+        code = str(code or '')
+        if code in _TRANSIENT_CODES or code[:2] in _TRANSIENT_SQLSTATE_CLASSES:
+            return 'server'
+    return None
+
+
+def is_transient(error: BaseException) -> bool:
+    """True for failures that are worth retrying and count against the breaker."""
+    return failure_reason(error) is not None
+
+
+def _responded(error: BaseException) -> bool:
+    from postgrest.exceptions import APIError
+    return isinstance(error, APIError)
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter delay before retry number ``attempt`` (1-based)."""
+    return random.uniform(0, min(MAX_RETRY_DELAY, Config.SUPABASE_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+
+def _budget(table: str, operation: str, deadline: float = None) -> tuple:
+    """Return ``(deadline as a monotonic time, retries allowed)`` for a call."""
+    idempotent = is_idempotent(table, operation)
+    if deadline is None:
+        deadline = Config.SUPABASE_READ_DEADLINE if idempotent else Config.SUPABASE_WRITE_DEADLINE
+    return time.monotonic() + deadline, Config.SUPABASE_READ_RETRIES if idempotent else 0
+
+
+def _settle_attempt(error: BaseException) -> bool:
+    """Record a failed attempt with the breaker; return True if it may be retried."""
+    reason = failure_reason(error)
+    if reason is not None:
+        _count(reason)
+        breaker.record_failure()
+        return True
+    if _responded(error):
+        breaker.record_success()
+    else:
+        breaker.release()
+    return False
+
+
+def call(attempt, table: str, operation: str, deadline: float = None):
+    """
+    Run ``attempt(timeout)`` under the breaker, retrying transient failures of idempotent calls.
+
+    Args:
+        attempt: Callable taking the seconds left before the deadline
+        table: Table or RPC name, for classifying the call
+        operation: ``select``, ``count``, ``insert``, ``update``, ``delete`` or ``rpc``
+        deadline: Seconds for the whole call, retries included (defaults by operation)
+
+    Raises:
+        SupabaseUnavailable: if the circuit is open
+    """
+    until, retries = _budget(table, operation, deadline)
+    tries = 0
+    while True:
+        breaker.before_call()
+        tries += 1
+        try:
+            result = attempt(max(0.001, until - time.monotonic()))
+        except BaseException as e:
+            retry = _settle_attempt(e) and tries <= retries
+            if not retry:
+                raise
+            delay = _backoff(tries)
+            if time.monotonic() + delay >= until:
+                raise
+            _count('retries')
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+async def call_async(attempt, table: str, operation: str, deadline: float = None):
+    """``call`` for an ``attempt(timeout)`` coroutine function; backoff doesn't block the loop."""
+    until, retries = _budget(table, operation, deadline)
+    tries = 0
+    while True:
+        breaker.before_call()
+        tries += 1
+        try:
+            result = await attempt(max(0.001, until - time.monotonic()))
+        except BaseException as e:
+            retry = _settle_attempt(e) and tries <= retries
+            if not retry:
+                raise
+            delay = _backoff(tries)
+            if time.monotonic() + delay >= until:
+                raise
+            _count('retries')
+            await asyncio.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+def unavailable_response(error: SupabaseUnavailable):
+    """A 503 telling the client when to try again."""
+    response = jsonify({'success': False, 'error': str(error)})
+    response.headers['Retry-After'] = str(max(1, math.ceil(error.retry_after)))
+    return response, 503
@@ -1,15 +1,53 @@
 from functools import wraps
 from flask import Blueprint, jsonify, request, Response
-from supabase_client import get_supabase_admin_client
+from supabase_client import execute, execute_async, get_async_supabase_admin_client, get_supabase_admin_client
 from config import Config
-import base64
+from admin_auth import check_credentials, check_session_token, issue_session_token
+from cache import cached_query_io, invalidate_table, stats_cache
+from metrics import render_prometheus, supabase_fanout, supabase_timer
+from images import (
+    CONTENT_TYPES, MULTIPART_OVERHEAD, STORAGE_CACHE_SECONDS, ImageValidationError, UploadTooLargeError,
+    build_manifest, missing_variants, probe_image, spool_upload, transcode, variant_path
+)
+from pagination import (
+    CATALOG_KEYSET, CONTACTS_KEYSET, TABLE_COLUMNS, QueryParamError, apply_filters, fetch_page, parse_fields,
+    parse_filters, parse_page_args
+)
+from bulk import FORMATS, IMPORT_TABLES, ImportFormatError, detect_format, export_rows, import_rows, iter_records
+from row_patches import PatchError, apply_patches, parse_batch, parse_patch
+from resilience import SupabaseUnavailable, unavailable_response
+import asyncio
+import inspect
+import itertools
+import os
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
-
-def check_auth(username, password):
-    """Check if a username/password combination is valid."""
-    return username == Config.ADMIN_USERNAME and password == Config.ADMIN_PASSWORD
+STATS_TABLES = ('project_templates', 'portfolio_projects', 'team_members', 'contact_submissions')
+RECENT_CONTACT_FIELDS = 'id, name, email, project_type, message, is_read, submitted_at'
+RECENT_MESSAGE_LENGTH = 200
+
+# Collections for /admin/import and /admin/export, by URL name
+BULK_COLLECTIONS = {
+    'templates': 'project_templates',
+    'portfolio': 'portfolio_projects',
+    'team': 'team_members',
+    'contacts': 'contact_submissions',
+}
+
+
+def check_auth(auth):
+    """
+    Check a parsed Authorization header.
+    
+    A Bearer session token costs one HMAC; Basic credentials go through the
+    (deliberately slow) password hash.
+    """
+    if auth is None:
+        return False
+    if auth.type == 'bearer':
+        return check_session_token(auth.token or '')
+    return auth.type == 'basic' and check_credentials(auth.username, auth.password)
 
 
 def authenticate():
@@ -21,16 +59,153 @@ def authenticate():
 
 
 def requires_auth(f):
-    """Decorator for routes that require authentication."""
+    """Decorator for routes that require authentication (sync or async views)."""
+    def authorized():
+        return check_auth(request.authorization)
+    
+    if inspect.iscoroutinefunction(f):
+        @wraps(f)
+        async def decorated_async(*args, **kwargs):
+            if not authorized():
+                return authenticate()
+            return await f(*args, **kwargs)
+        return decorated_async
+    
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth = request.authorization
-        if not auth or not check_auth(auth.username, auth.password):
+        if not authorized():
             return authenticate()
         return f(*args, **kwargs)
     return decorated
 
 
+# ==================== Session ====================
+
+@admin_bp.route('/session', methods=['POST'])
+def create_session():
+    """
+    Exchange Basic credentials for a session token.
+    
+    Send the token as ``Authorization: Bearer <token>`` on later admin calls
+    until it expires after ``expires_in`` seconds. Renewal needs the password
+    again, so a leaked token can't be extended.
+    """
+    try:
+        auth = request.authorization
+        if auth is None or auth.type != 'basic' or not check_credentials(auth.username, auth.password):
+            return authenticate()
+        return jsonify({
+            'success': True,
+            'token': issue_session_token(),
+            'expires_in': Config.ADMIN_SESSION_SECONDS,
+        }), 201
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def _list_rows(table, keyset, default_limit=None):
+    """
+    List rows with the same ``fields``/``limit``/``cursor``/filter params as
+    the public API. ``next_cursor`` is included whenever a limit applies.
+    """
+    try:
+        fields, limit, cursor = parse_page_args(table, keyset, default_limit)
+        filters = parse_filters(table)
+    except QueryParamError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    supabase = get_supabase_admin_client()
+    query = apply_filters(supabase.table(table).select(fields), filters)
+    rows, next_cursor = fetch_page(query, keyset, limit, cursor)
+    body = {'success': True, 'data': rows}
+    if limit is not None:
+        body['next_cursor'] = next_cursor
+    return jsonify(body), 200
+
+
+def _bulk_reorder(table, order):
+    """
+    Apply a new display order in a constant number of round-trips.
+    
+    Validates the ID list against the table, then sends only the rows whose
+    position changed to the reorder_display_order RPC, which updates them in
+    one atomic statement.
+    
+    Returns:
+        (error message or None, number of rows whose position changed)
+    """
+    if not isinstance(order, list) or not all(isinstance(item_id, str) for item_id in order):
+        return 'order must be a list of IDs', 0
+    if len(set(order)) != len(order):
+        return 'order contains duplicate IDs', 0
+    if not order:
+        return None, 0
+    
+    supabase = get_supabase_admin_client()
+    rows = execute(supabase.table(table).select('id, display_order').in_('id', order)).data
+    current = {row['id']: row.get('display_order') for row in rows}
+    unknown = [item_id for item_id in order if item_id not in current]
+    if unknown:
+        return f"Unknown IDs: {', '.join(unknown)}", 0
+    
+    changed = [(item_id, index) for index, item_id in enumerate(order) if current[item_id] != index]
+    if changed:
+        execute(supabase.rpc('reorder_display_order', {
+            'target_table': table,
+            'ordered_ids': [item_id for item_id, _ in changed],
+            'positions': [index for _, index in changed],
+        }))
+        invalidate_table(table)
+    return None, len(changed)
+
+
+def _apply_updates(table, patches):
+    """
+    Apply parsed patches and build the response.
+    
+    200 with the updated rows (unchanged rows are returned as they are and
+    keep their version), 409 with the current rows when any edit was made
+    against an older version, 404 when any row doesn't exist. Nothing is
+    written unless every edit applies.
+    """
+    supabase = get_supabase_admin_client()
+    result = apply_patches(supabase, table, patches)
+    if result['conflicts']:
+        return jsonify({
+            'success': False,
+            'error': 'Changed by another edit since it was loaded; reload and try again',
+            'conflicts': result['conflicts'],
+        }), 409
+    if result['missing']:
+        return jsonify({'success': False, 'error': 'Not found', 'missing': result['missing']}), 404
+    if result['changed']:
+        invalidate_table(table)
+    return jsonify({'success': True, 'data': result['rows'], 'changed': result['changed']}), 200
+
+
+def _update_row(table, row_id):
+    """
+    Update one row from a JSON body of the fields to change.
+    
+    Include the ``version`` the edit was made against to have it refused
+    (409) if the row changed in the meantime.
+    """
+    try:
+        patch = parse_patch(table, request.get_json(), row_id)
+    except PatchError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return _apply_updates(table, [patch])
+
+
+def _update_rows(table):
+    """Apply a JSON array of row edits (each with ``id`` and ``version``) in one round-trip."""
+    try:
+        patches = parse_batch(table, request.get_json())
+    except PatchError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return _apply_updates(table, patches)
+
+
 # ==================== Project Templates CRUD ====================
 
 @admin_bp.route('/templates', methods=['GET'])
@@ -38,9 +213,9 @@ def requires_auth(f):
 def list_templates():
     """List all project templates."""
     try:
-        supabase = get_supabase_admin_client()
-        response = supabase.table('project_templates').select('*').order('display_order', nullsfirst=False).order('created_at', desc=True).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _list_rows('project_templates', CATALOG_KEYSET)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -52,8 +227,11 @@ def create_template():
     try:
         data = request.get_json()
         supabase = get_supabase_admin_client()
-        response = supabase.table('project_templates').insert(data).execute()
+        response = execute(supabase.table('project_templates').insert(data))
+        invalidate_table('project_templates')
         return jsonify({'success': True, 'data': response.data}), 201
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -63,10 +241,21 @@ def create_template():
 def update_template(template_id):
     """Update a project template."""
     try:
-        data = request.get_json()
-        supabase = get_supabase_admin_client()
-        response = supabase.table('project_templates').update(data).eq('id', template_id).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _update_row('project_templates', template_id)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@admin_bp.route('/templates', methods=['PATCH'])
+@requires_auth
+def update_templates():
+    """Update several project templates in one request."""
+    try:
+        return _update_rows('project_templates')
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -77,8 +266,11 @@ def delete_template(template_id):
     """Delete a project template."""
     try:
         supabase = get_supabase_admin_client()
-        supabase.table('project_templates').delete().eq('id', template_id).execute()
+        execute(supabase.table('project_templates').delete().eq('id', template_id))
+        invalidate_table('project_templates')
         return jsonify({'success': True, 'message': 'Template deleted'}), 200
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -91,12 +283,13 @@ def reorder_templates():
         data = request.get_json()
         order = data.get('order', [])  # List of IDs in new order
         
-        supabase = get_supabase_admin_client()
+        error, updated = _bulk_reorder('project_templates', order)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
         
-        for index, template_id in enumerate(order):
-            supabase.table('project_templates').update({'display_order': index}).eq('id', template_id).execute()
-        
-        return jsonify({'success': True, 'message': 'Order updated'}), 200
+        return jsonify({'success': True, 'message': 'Order updated', 'updated': updated}), 200
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -108,9 +301,9 @@ def reorder_templates():
 def list_portfolio():
     """List all portfolio projects."""
     try:
-        supabase = get_supabase_admin_client()
-        response = supabase.table('portfolio_projects').select('*').order('display_order', nullsfirst=False).order('created_at', desc=True).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _list_rows('portfolio_projects', CATALOG_KEYSET)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -122,8 +315,11 @@ def create_portfolio():
     try:
         data = request.get_json()
         supabase = get_supabase_admin_client()
-        response = supabase.table('portfolio_projects').insert(data).execute()
+        response = execute(supabase.table('portfolio_projects').insert(data))
+        invalidate_table('portfolio_projects')
         return jsonify({'success': True, 'data': response.data}), 201
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -133,10 +329,21 @@ def create_portfolio():
 def update_portfolio(project_id):
     """Update a portfolio project."""
     try:
-        data = request.get_json()
-        supabase = get_supabase_admin_client()
-        response = supabase.table('portfolio_projects').update(data).eq('id', project_id).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _update_row('portfolio_projects', project_id)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@admin_bp.route('/portfolio', methods=['PATCH'])
+@requires_auth
+def update_portfolio_projects():
+    """Update several portfolio projects in one request."""
+    try:
+        return _update_rows('portfolio_projects')
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -147,8 +354,11 @@ def delete_portfolio(project_id):
     """Delete a portfolio project."""
     try:
         supabase = get_supabase_admin_client()
-        supabase.table('portfolio_projects').delete().eq('id', project_id).execute()
+        execute(supabase.table('portfolio_projects').delete().eq('id', project_id))
+        invalidate_table('portfolio_projects')
         return jsonify({'success': True, 'message': 'Project deleted'}), 200
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -161,12 +371,13 @@ def reorder_portfolio():
         data = request.get_json()
         order = data.get('order', [])  # List of IDs in new order
         
-        supabase = get_supabase_admin_client()
-        
-        for index, project_id in enumerate(order):
-            supabase.table('portfolio_projects').update({'display_order': index}).eq('id', project_id).execute()
+        error, updated = _bulk_reorder('portfolio_projects', order)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
         
-        return jsonify({'success': True, 'message': 'Order updated'}), 200
+        return jsonify({'success': True, 'message': 'Order updated', 'updated': updated}), 200
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -178,9 +389,9 @@ def reorder_portfolio():
 def list_team():
     """List all team members."""
     try:
-        supabase = get_supabase_admin_client()
-        response = supabase.table('team_members').select('*').order('display_order').execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _list_rows('team_members', CATALOG_KEYSET)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -192,8 +403,11 @@ def create_team_member():
     try:
         data = request.get_json()
         supabase = get_supabase_admin_client()
-        response = supabase.table('team_members').insert(data).execute()
+        response = execute(supabase.table('team_members').insert(data))
+        invalidate_table('team_members')
         return jsonify({'success': True, 'data': response.data}), 201
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -203,10 +417,21 @@ def create_team_member():
 def update_team_member(member_id):
     """Update a team member."""
     try:
-        data = request.get_json()
-        supabase = get_supabase_admin_client()
-        response = supabase.table('team_members').update(data).eq('id', member_id).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _update_row('team_members', member_id)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@admin_bp.route('/team', methods=['PATCH'])
+@requires_auth
+def update_team_members():
+    """Update several team members in one request."""
+    try:
+        return _update_rows('team_members')
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -217,8 +442,11 @@ def delete_team_member(member_id):
     """Delete a team member."""
     try:
         supabase = get_supabase_admin_client()
-        supabase.table('team_members').delete().eq('id', member_id).execute()
+        execute(supabase.table('team_members').delete().eq('id', member_id))
+        invalidate_table('team_members')
         return jsonify({'success': True, 'message': 'Team member deleted'}), 200
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -228,11 +456,11 @@ def delete_team_member(member_id):
 @admin_bp.route('/contacts', methods=['GET'])
 @requires_auth
 def list_contacts():
-    """List all contact submissions."""
+    """List contact submissions, newest first, one page at a time."""
     try:
-        supabase = get_supabase_admin_client()
-        response = supabase.table('contact_submissions').select('*').order('submitted_at', desc=True).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _list_rows('contact_submissions', CONTACTS_KEYSET, Config.CONTACTS_PAGE_SIZE)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -243,8 +471,11 @@ def delete_contact(contact_id):
     """Delete a contact submission."""
     try:
         supabase = get_supabase_admin_client()
-        supabase.table('contact_submissions').delete().eq('id', contact_id).execute()
+        execute(supabase.table('contact_submissions').delete().eq('id', contact_id))
+        invalidate_table('contact_submissions')
         return jsonify({'success': True, 'message': 'Contact deleted'}), 200
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -255,8 +486,158 @@ def mark_contact_read(contact_id):
     """Mark a contact submission as read."""
     try:
         supabase = get_supabase_admin_client()
-        response = supabase.table('contact_submissions').update({'is_read': True}).eq('id', contact_id).execute()
+        response = execute(supabase.table('contact_submissions').update({'is_read': True}).eq('id', contact_id))
+        invalidate_table('contact_submissions')
         return jsonify({'success': True, 'data': response.data}), 200
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# ==================== Bulk Import / Export ====================
+
+@admin_bp.route('/import/<collection>', methods=['POST'])
+@requires_auth
+def import_collection(collection):
+    """
+    Insert rows from an NDJSON or CSV request body (templates, portfolio or team).
+
+    The body is read as a stream and inserted in batches. Rows that fail
+    validation or the insert are skipped and reported by line number; the
+    response is 207 when any row failed.
+    """
+    try:
+        table = BULK_COLLECTIONS.get(collection)
+        if table not in IMPORT_TABLES:
+            return jsonify({'success': False, 'error': f"Import supports: {', '.join(name for name, t in BULK_COLLECTIONS.items() if t in IMPORT_TABLES)}"}), 404
+        try:
+            fmt = detect_format(request.args.get('format'), request.content_type)
+        except ImportFormatError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        supabase = get_supabase_admin_client()
+        summary = import_rows(supabase, table, iter_records(request.stream, fmt))
+        if summary['inserted']:
+            invalidate_table(table)
+        return jsonify({'success': summary['failed'] == 0, 'data': summary}), 200 if summary['failed'] == 0 else 207
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@admin_bp.route('/export/<collection>', methods=['GET'])
+@requires_auth
+def export_collection(collection):
+    """
+    Stream a whole collection as NDJSON (default) or CSV (``format=csv``).
+
+    Accepts the list endpoints' ``fields`` and filters. Rows are fetched a
+    keyset page at a time and written as they arrive, so memory use doesn't
+    grow with the table.
+    """
+    try:
+        table = BULK_COLLECTIONS.get(collection)
+        if table is None:
+            return jsonify({'success': False, 'error': f"Export supports: {', '.join(BULK_COLLECTIONS)}"}), 404
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in FORMATS:
+            return jsonify({'success': False, 'error': f"format must be one of: {', '.join(FORMATS)}"}), 400
+        keyset = CONTACTS_KEYSET if table == 'contact_submissions' else CATALOG_KEYSET
+        try:
+            fields = parse_fields(table, keyset)
+            filters = parse_filters(table)
+        except QueryParamError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        columns = TABLE_COLUMNS[table] if fields == '*' else tuple(fields.split(','))
+        supabase = get_supabase_admin_client()
+        chunks = export_rows(supabase, table, columns, filters, keyset, fmt)
+        # Run the first query now, so a Supabase error is a 500 rather than a truncated file
+        first = next(chunks, b'')
+        return Response(
+            itertools.chain([first], chunks),
+            mimetype=FORMATS[fmt],
+            headers={'Content-Disposition': f'attachment; filename="{collection}.{fmt}"'}
+        )
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# ==================== Dashboard ====================
+
+async def _count(supabase, table, filters=()):
+    """
+    Count rows with an exact-count query that returns at most one row.
+
+    postgrest-py 0.13 reports a count of 0 for the bodyless HEAD request a
+    column-less select() sends, so a one-row GET is used instead.
+    """
+    query = apply_filters(supabase.table(table).select('id', count='exact'), filters).limit(1)
+    return (await execute_async(query)).count or 0
+
+
+async def _recent_contacts(supabase):
+    """Return the newest contacts with a bounded projection, plus the total count."""
+    query = supabase.table('contact_submissions').select(RECENT_CONTACT_FIELDS, count='exact')
+    response = await execute_async(query.order('submitted_at', desc=True).limit(Config.ADMIN_RECENT_CONTACTS))
+    rows = response.data
+    for row in rows:
+        message = row.get('message') or ''
+        if len(message) > RECENT_MESSAGE_LENGTH:
+            row['message'] = message[:RECENT_MESSAGE_LENGTH].rstrip() + '…'
+    return rows, response.count or 0
+
+
+async def _load_stats():
+    """Run the dashboard's count and recent-contacts queries concurrently."""
+    supabase = get_async_supabase_admin_client()
+    with supabase_fanout('stats'):
+        templates, portfolio, team, unread, (recent_rows, contacts_total) = await asyncio.gather(
+            _count(supabase, 'project_templates'),
+            _count(supabase, 'portfolio_projects'),
+            _count(supabase, 'team_members'),
+            _count(supabase, 'contact_submissions', (('eq', 'is_read', 'false'),)),
+            _recent_contacts(supabase),
+        )
+    return {
+        'templates': templates,
+        'portfolio': portfolio,
+        'team': team,
+        'contacts': {'total': contacts_total, 'unread': unread},
+        'recent_contacts': recent_rows,
+    }
+
+
+@admin_bp.route('/stats', methods=['GET'])
+@requires_auth
+def get_stats():
+    """
+    Dashboard totals, unread contact count and the most recent contacts.
+
+    Uses count queries only, so the cost doesn't grow with the tables. Cached
+    for ADMIN_STATS_TTL_SECONDS and dropped on any admin write.
+    """
+    try:
+        data = cached_query_io(STATS_TABLES, 'dashboard', _load_stats, cache=stats_cache)
+        return jsonify({'success': True, 'data': data}), 200
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# ==================== Metrics ====================
+
+@admin_bp.route('/metrics', methods=['GET'])
+@requires_auth
+def get_metrics():
+    """Expose request, Supabase, cache and email metrics in Prometheus text format."""
+    try:
+        return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -266,8 +647,24 @@ def mark_contact_read(contact_id):
 @admin_bp.route('/upload', methods=['POST'])
 @requires_auth
 def upload_image():
-    """Upload an image to Supabase Storage."""
+    """
+    Upload an image to Supabase Storage as resized WebP/AVIF variants.
+
+    The upload is streamed to disk while hashed, and stored under its SHA-256
+    digest. Re-uploading an image whose variants already exist skips
+    encoding and storage entirely.
+
+    Returns the largest WebP variant as ``url`` plus an ``image`` manifest
+    with per-format srcset strings.
+    """
     try:
+        # Werkzeug parses (and spools) the whole form on first access to
+        # request.files, so refuse an oversized body before touching it
+        if request.content_length is None:
+            return jsonify({'success': False, 'error': 'Content-Length required'}), 411
+        if request.content_length > Config.IMAGE_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD:
+            return jsonify({'success': False, 'error': 'File is too large'}), 413
+        
         if 'file' not in request.files:
             return jsonify({'success': False, 'error': 'No file provided'}), 400
         
@@ -279,30 +676,59 @@ def upload_image():
         bucket = request.args.get('bucket', 'images')
         folder = request.args.get('folder', '')  # e.g., 'portfolio', 'templates', 'team'
         
-        supabase = get_supabase_admin_client()
-        
-        # Generate unique filename with folder path
-        import uuid
-        ext = file.filename.rsplit('.', 1)[-1] if '.' in file.filename else 'png'
-        filename = f"{uuid.uuid4()}.{ext}"
-        
-        # Create full path with folder if provided
-        if folder:
-            filepath = f"{folder}/{filename}"
-        else:
-            filepath = filename
+        try:
+            digest, path, _ = spool_upload(file.stream, Config.IMAGE_MAX_UPLOAD_BYTES)
+        except UploadTooLargeError as e:
+            return jsonify({'success': False, 'error': str(e)}), 413
+        except ImageValidationError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        # Upload to Supabase Storage
-        response = supabase.storage.from_(bucket).upload(
-            filepath,
-            file.read(),
-            {'content-type': file.content_type}
-        )
-        
-        # Get public URL
-        public_url = supabase.storage.from_(bucket).get_public_url(filepath)
+        try:
+            try:
+                probe = probe_image(path)
+            except ImageValidationError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            
+            supabase = get_supabase_admin_client()
+            storage = supabase.storage.from_(bucket)
+            
+            # Content-addressed: the same bytes always map to the same URLs
+            prefix = f"{folder}/{digest}" if folder else digest
+            with supabase_timer(f'storage:{bucket}', 'list'):
+                missing = missing_variants(storage, prefix, probe['variants'])
+            
+            if missing:
+                try:
+                    result = transcode(path)
+                except ImageValidationError as e:
+                    return jsonify({'success': False, 'error': str(e)}), 400
+                
+                # Upload to Supabase Storage; upsert so a concurrent identical upload can't conflict
+                for variant in result['variants']:
+                    if (variant['width'], variant['format']) not in missing:
+                        continue
+                    with supabase_timer(f'storage:{bucket}', 'upload'):
+                        storage.upload(
+                            variant_path(prefix, variant['width'], variant['format']),
+                            variant['data'],
+                            {
+                                'content-type': CONTENT_TYPES[variant['format']],
+                                'cache-control': STORAGE_CACHE_SECONDS,
+                                'x-upsert': 'true',
+                            }
+                        )
+            else:
+                result = probe
+        finally:
+            os.remove(path)
         
-        return jsonify({'success': True, 'url': public_url, 'filename': filepath}), 201
+        manifest = build_manifest(prefix, result, storage.get_public_url)
+        return jsonify({
+            'success': True,
+            'url': manifest['src'],
+            'filename': prefix,
+            'image': manifest,
+            'deduplicated': not missing,
+        }), 201 if missing else 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-
@@ -1,33 +1,142 @@
 from flask import Blueprint, jsonify, request
-from supabase_client import get_supabase_client
+from supabase_client import execute, execute_async, get_async_supabase_client, get_supabase_client, run_on_io_loop
 from email_utils import send_contact_notification_async
+from outbox import drain_outbox, drain_outbox_async
+from config import Config
+from cache import cached_query_async, cached_query_io, invalidate_table, refresh_query_async, search_cache
+from http_cache import conditional_json
+from pagination import (
+    CATALOG_KEYSET, DIFFICULTIES, QueryParamError, apply_filters, fetch_page_async, parse_choice_arg,
+    parse_filters, parse_limit, parse_list_arg, parse_offset, parse_page_args, parse_search_text
+)
+from metrics import supabase_fanout
+from ratelimit import ContactRejected, client_ip, forget_contact, get_backend, retry_after_header, throttle_contact
+from resilience import SupabaseUnavailable, unavailable_response
+import asyncio
+import hmac
 import traceback
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Collections /api/bundle can return, by the name clients ask for
+BUNDLE_COLLECTIONS = {
+    'portfolio': 'portfolio_projects',
+    'team': 'team_members',
+    'templates': 'project_templates',
+}
+
+
+def _catalog_query(table, fields='*', filters=(), limit=None, cursor=None):
+    """Return the ``(scope, shape, loader)`` cache arguments for a catalog query."""
+    supabase = get_async_supabase_client()
+    return (
+        table,
+        (fields, filters, limit, cursor),
+        lambda: fetch_page_async(apply_filters(supabase.table(table).select(fields), filters), CATALOG_KEYSET, limit, cursor)
+    )
+
+
+def _load_catalog(table, fields='*', filters=(), limit=None, cursor=None):
+    """Return cached ``(rows, next_cursor)`` for a catalog query."""
+    return cached_query_io(*_catalog_query(table, fields, filters, limit, cursor))
+
+
+def _list_catalog(table):
+    """
+    Serve a cached catalog list.
+    
+    Supports ``fields``, ``limit`` and ``cursor`` plus the table's filters
+    (see ``pagination.parse_filters``). ``next_cursor`` is only included in
+    the body when a ``limit`` was requested.
+    """
+    try:
+        fields, limit, cursor = parse_page_args(table, CATALOG_KEYSET)
+        filters = parse_filters(table)
+    except QueryParamError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    rows, next_cursor = _load_catalog(table, fields, filters, limit, cursor)
+    if limit is None:
+        return conditional_json(rows)
+    return conditional_json(rows, next_cursor=next_cursor)
+
 
 # ==================== Project Templates ====================
 
 @api_bp.route('/templates', methods=['GET'])
 def get_templates():
-    """Get all project templates."""
+    """Get project templates, optionally filtered, projected and paginated."""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('project_templates').select('*').order('display_order', nullsfirst=False).order('created_at', desc=True).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _list_catalog('project_templates')
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         print(f"ERROR in /api/templates: {str(e)}")
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _search_query(text, tags, difficulty, limit, offset):
+    """Return the ``(scope, shape, loader)`` cache arguments for a template search."""
+    supabase = get_async_supabase_client()
+    params = {
+        'search_text': text,
+        'tag_filter': list(tags or ()),
+        'difficulty_filter': difficulty,
+        'result_limit': limit,
+        'result_offset': offset,
+    }
+    
+    async def load():
+        return (await execute_async(supabase.rpc('search_templates', params))).data
+    
+    return 'project_templates', ('search', text, tags, difficulty, limit, offset), load
+
+
+@api_bp.route('/templates/search', methods=['GET'])
+def search_templates():
+    """
+    Ranked full-text search over project templates.
+    
+    ``q`` is matched against title, description and tags (web-search syntax:
+    quoted phrases, ``or``, ``-exclude``); ``tags`` (all must match) and
+    ``difficulty`` narrow the results. Paged with ``limit`` and ``offset``.
+    Returns ``{"results": [...], "total": n, "facets": {"difficulty": {...},
+    "tags": [...]}}``, served by the ``search_templates`` database function.
+    """
+    try:
+        try:
+            text = parse_search_text()
+            tags = parse_list_arg('tags')
+            difficulty = parse_choice_arg('difficulty', DIFFICULTIES)
+            limit = parse_limit(Config.SEARCH_PAGE_SIZE)
+            offset = parse_offset()
+        except QueryParamError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        data = cached_query_io(*_search_query(text, tags, difficulty, limit, offset), cache=search_cache)
+        return conditional_json(data)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
+    except Exception as e:
+        print(f"ERROR in /api/templates/search: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @api_bp.route('/templates/<template_id>', methods=['GET'])
 def get_template(template_id):
     """Get a single project template by ID."""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('project_templates').select('*').eq('id', template_id).single().execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        supabase = get_async_supabase_client()
+        
+        async def load():
+            return (await execute_async(supabase.table('project_templates').select('*').eq('id', template_id).single())).data
+        
+        data = cached_query_io('project_templates', ('id', template_id), load)
+        return conditional_json(data)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         print(f"ERROR in /api/templates/{template_id}: {str(e)}")
         traceback.print_exc()
@@ -38,11 +147,11 @@ def get_template(template_id):
 
 @api_bp.route('/portfolio', methods=['GET'])
 def get_portfolio():
-    """Get all portfolio projects."""
+    """Get portfolio projects, optionally filtered, projected and paginated."""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('portfolio_projects').select('*').order('display_order', nullsfirst=False).order('created_at', desc=True).execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _list_catalog('portfolio_projects')
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         print(f"ERROR in /api/portfolio: {str(e)}")
         traceback.print_exc()
@@ -53,17 +162,88 @@ def get_portfolio():
 
 @api_bp.route('/team', methods=['GET'])
 def get_team():
-    """Get all team members."""
+    """Get team members, optionally projected and paginated."""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table('team_members').select('*').order('display_order').execute()
-        return jsonify({'success': True, 'data': response.data}), 200
+        return _list_catalog('team_members')
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         print(f"ERROR in /api/team: {str(e)}")
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# ==================== Bundle ====================
+
+async def _load_bundle(names):
+    """
+    Fetch several full collections concurrently.
+    
+    Each reuses its own list cache entry while it is fresh; an expired one is
+    loaded again first, so refreshing the bundle never rebuilds it from
+    stale rows.
+    """
+    with supabase_fanout('bundle'):
+        pages = await asyncio.gather(*(cached_query_async(*_catalog_query(BUNDLE_COLLECTIONS[name]), stale_ok=False)
+                                       for name in names))
+    return {name: rows for name, (rows, _) in zip(names, pages)}
+
+
+def _bundle_query(names):
+    """Return the ``(scope, shape, loader)`` cache arguments for a bundle."""
+    tables = tuple(BUNDLE_COLLECTIONS[name] for name in names)
+    return tables, ('bundle', names), lambda: _load_bundle(names)
+
+
+@api_bp.route('/bundle', methods=['GET'])
+def get_bundle():
+    """
+    Get several public collections in one response.
+    
+    ``include=portfolio,team,templates`` picks the collections (default: all).
+    The response has its own cache entry, invalidated by a write to any of
+    the included tables, and its own ETag.
+    """
+    try:
+        raw = request.args.get('include')
+        names = tuple(sorted({name.strip() for name in raw.split(',') if name.strip()})) if raw else tuple(sorted(BUNDLE_COLLECTIONS))
+        unknown = [name for name in names if name not in BUNDLE_COLLECTIONS]
+        if unknown or not names:
+            return jsonify({'success': False, 'error': f"include must be a subset of: {', '.join(sorted(BUNDLE_COLLECTIONS))}"}), 400
+        
+        data = cached_query_io(*_bundle_query(names))
+        return conditional_json(data)
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
+    except Exception as e:
+        print(f"ERROR in /api/bundle: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# ==================== Pre-warming ====================
+
+async def warm_catalog():
+    """
+    Reload the unfiltered catalog lists and the full bundle into the cache.
+    
+    Returns:
+        Number of cache entries refreshed
+    """
+    await asyncio.gather(*(refresh_query_async(*_catalog_query(table)) for table in BUNDLE_COLLECTIONS.values()))
+    await refresh_query_async(*_bundle_query(tuple(sorted(BUNDLE_COLLECTIONS))))
+    return len(BUNDLE_COLLECTIONS) + 1
+
+
+def prewarm_catalog():
+    """Start ``warm_catalog`` in the background (e.g. at startup) without waiting for it."""
+    def report(future):
+        if future.exception() is not None:
+            print(f"Catalog pre-warm failed: {str(future.exception())}")
+    
+    run_on_io_loop(warm_catalog()).add_done_callback(report)
+
+
 # ==================== Contact Form ====================
 
 @api_bp.route('/contact', methods=['POST'])
@@ -79,6 +259,14 @@ def submit_contact():
             if not data.get(field):
                 return jsonify({'success': False, 'error': f'{field} is required'}), 400
         
+        # Throttle before any Supabase or SMTP work
+        try:
+            dedup_key = throttle_contact(client_ip(), str(data['email']), str(data['message']))
+        except ContactRejected as e:
+            response = jsonify({'success': False, 'error': str(e)})
+            response.headers['Retry-After'] = retry_after_header(e.retry_after)
+            return response, e.status
+        
         supabase = get_supabase_client()
         contact_data = {
             'name': data['name'],
@@ -87,15 +275,61 @@ def submit_contact():
             'project_type': data.get('project_type', ''),
             'phone': data.get('phone', '')
         }
-        response = supabase.table('contact_submissions').insert(contact_data).execute()
+        try:
+            response = execute(supabase.table('contact_submissions').insert(contact_data))
+        except Exception:
+            forget_contact(dedup_key)
+            raise
+        invalidate_table('contact_submissions')
         
         print(f"Supabase response: {response}")
         
-        # Send email notification in background (non-blocking)
-        send_contact_notification_async(contact_data)
+        # The outbox trigger has already recorded the notification; try to
+        # deliver it now, the cron drain catches anything this misses
+        if Config.NOTIFICATION_OUTBOX and Config.OUTBOX_DRAIN_INLINE:
+            try:
+                drain_outbox()
+            except Exception as e:
+                # The notification stays pending for the next drain
+                print(f"Outbox drain failed: {str(e)}")
+        elif Config.NOTIFICATION_OUTBOX:
+            drain_outbox_async()
+        else:
+            send_contact_notification_async(contact_data)
         
         return jsonify({'success': True, 'message': 'Contact form submitted successfully'}), 201
+    except SupabaseUnavailable as e:
+        return unavailable_response(e)
     except Exception as e:
         print(f"ERROR in /api/contact: {str(e)}")
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# ==================== Scheduled Tasks ====================
+
+@api_bp.route('/cron', methods=['GET'])
+def run_cron():
+    """
+    Periodic maintenance tick, called by the Vercel cron job.
+    
+    Drains the notification outbox, prunes idle rate limit buckets and, with
+    CACHE_PREWARM, reloads the catalog cache. Vercel sends ``Authorization: Bearer <CRON_SECRET>``; the endpoint is
+    disabled until CRON_SECRET is configured.
+    """
+    expected = f"Bearer {Config.CRON_SECRET}"
+    if not Config.CRON_SECRET or not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    try:
+        result = {}
+        if Config.NOTIFICATION_OUTBOX:
+            result['outbox'] = drain_outbox()
+        if Config.RATE_LIMIT_ENABLED:
+            get_backend().prune()
+        if Config.CACHE_PREWARM:
+            result['cache_warmed'] = run_on_io_loop(warm_catalog()).result()
+        return jsonify({'success': True, 'data': result}), 200
+    except Exception as e:
+        print(f"ERROR in /api/cron: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,169 @@
+"""
+Versioned, diffed updates for admin collections.
+
+Every catalog row carries a ``version`` that the database bumps on each
+update (migrations/008). An edit names the version it was made against; if
+the row has moved on since, the edit is refused with the row's current copy
+instead of silently overwriting someone else's change.
+
+Edits go to the ``apply_row_patches`` database function, which locks each
+row, checks its version and writes only the columns whose value differs, all
+in one round-trip however many rows are edited. Several edits to the same
+row in one batch are merged into a single write first. Until migration 008
+is applied, edits fall back to plain per-row updates (see ``apply_patches``).
+"""
+import uuid
+from config import Config
+from bulk import RowError, check_values
+from pagination import TABLE_COLUMNS
+from supabase_client import execute
+
+# Maintained by the database; ignored when a client echoes them back
+READ_ONLY_COLUMNS = ('id', 'version', 'created_at', 'updated_at')
+
+
+class PatchError(ValueError):
+    """Raised for a malformed update; routes answer with a 400."""
+
+
+# Set once PostgREST reports that apply_row_patches doesn't exist
+_rpc_missing = False
+
+
+def parse_patch(table: str, record, row_id=None) -> dict:
+    """
+    Turn a row edit from a request body into a patch.
+
+    Args:
+        table: Table the row belongs to
+        record: Row fields to set, optionally with ``id`` and ``version``
+        row_id: Row ID from the URL; overrides ``record['id']``
+
+    Returns:
+        ``{'id', 'version', 'changes'}``; ``version`` is None when the edit
+        should not be checked
+
+    Raises:
+        PatchError: for a missing or malformed ID, unknown columns or bad values
+    """
+    if not isinstance(record, dict):
+        raise PatchError('Each update must be an object')
+    row_id = row_id or record.get('id')
+    if not isinstance(row_id, str) or not row_id:
+        raise PatchError('Each update needs an id')
+    try:
+        uuid.UUID(row_id)
+    except ValueError:
+        raise PatchError(f'id must be a UUID: {row_id}')
+    version = record.get('version')
+    if version is not None and (isinstance(version, bool) or not isinstance(version, int)):
+        raise PatchError('version must be an integer')
+    changes = {key: value for key, value in record.items() if key not in READ_ONLY_COLUMNS}
+    unknown = [key for key in changes if key not in TABLE_COLUMNS[table]]
+    if unknown:
+        raise PatchError(f"Unknown columns: {', '.join(sorted(unknown))}")
+    try:
+        check_values(changes)
+    except RowError as e:
+        raise PatchError(str(e))
+    return {'id': row_id, 'version': version, 'changes': changes}
+
+
+def coalesce_patches(patches: list) -> list:
+    """
+    Merge patches for the same row, in order, so each row is written once.
+
+    Later values win; the expected version is the earliest one given, since
+    that is the copy the first edit was made against.
+    """
+    merged = {}
+    for patch in patches:
+        current = merged.get(patch['id'])
+        if current is None:
+            merged[patch['id']] = {'id': patch['id'], 'version': patch['version'], 'changes': dict(patch['changes'])}
+            continue
+        current['changes'].update(patch['changes'])
+        if current['version'] is None:
+            current['version'] = patch['version']
+    return list(merged.values())
+
+
+def parse_batch(table: str, body) -> list:
+    """
+    Parse a batch update body: a list of row edits, each with its ``id``.
+
+    Raises:
+        PatchError: if the body isn't a list, is too long, or any edit is invalid
+    """
+    if not isinstance(body, list) or not body:
+        raise PatchError('Send a non-empty JSON array of updates')
+    if len(body) > Config.BATCH_UPDATE_MAX_ROWS:
+        raise PatchError(f'At most {Config.BATCH_UPDATE_MAX_ROWS} updates per request')
+    patches = []
+    for index, record in enumerate(body):
+        try:
+            patches.append(parse_patch(table, record))
+        except PatchError as e:
+            raise PatchError(f'Update {index}: {str(e)}')
+    return coalesce_patches(patches)
+
+
+def apply_patches(supabase, table: str, patches: list) -> dict:
+    """
+    Apply patches atomically with the ``apply_row_patches`` database function.
+
+    Falls back to ``_apply_patches_directly`` when the function doesn't
+    exist (migration 008 not applied), remembering that for later calls.
+
+    Returns:
+        ``{'rows', 'changed', 'conflicts', 'missing'}``. When ``conflicts``
+        (current copies of rows whose version moved on) or ``missing`` (IDs)
+        is non-empty, nothing was written.
+    """
+    global _rpc_missing
+    if not _rpc_missing:
+        try:
+            return execute(supabase.rpc('apply_row_patches', {'target_table': table, 'patches': patches})).data
+        except Exception as e:
+            if not _is_missing_function(e):
+                raise
+            print("apply_row_patches is missing (apply migrations/008); updating rows one by one")
+            _rpc_missing = True
+    return _apply_patches_directly(supabase, table, patches)
+
+
+def _is_missing_function(error: BaseException) -> bool:
+    """True if PostgREST couldn't find the called database function."""
+    from postgrest.exceptions import APIError
+
+    # PGRST202: not in PostgREST's schema cache; 42883: undefined_function
+    return isinstance(error, APIError) and str(error.code) in ('PGRST202', '42883')
+
+
+def _apply_patches_directly(supabase, table: str, patches: list) -> dict:
+    """
+    ``apply_row_patches`` done with a read and per-row updates.
+
+    Same checks and result, but not atomic: a row changed between the read
+    and its update is overwritten. Versions are only checked on rows that
+    have a ``version`` column.
+    """
+    ids = [patch['id'] for patch in patches]
+    current = {row['id']: row for row in execute(supabase.table(table).select('*').in_('id', ids)).data}
+    missing = [row_id for row_id in ids if row_id not in current]
+    conflicts = [
+        current[patch['id']] for patch in patches
+        if patch['id'] in current and patch['version'] is not None
+        and 'version' in current[patch['id']] and current[patch['id']]['version'] != patch['version']
+    ]
+    if conflicts or missing:
+        return {'rows': [], 'changed': 0, 'conflicts': conflicts, 'missing': missing}
+    rows, changed = [], 0
+    for patch in patches:
+        row = current[patch['id']]
+        changes = {key: value for key, value in patch['changes'].items() if row.get(key) != value}
+        if changes:
+            row = execute(supabase.table(table).update(changes).eq('id', patch['id'])).data[0]
+            changed += 1
+        rows.append(row)
+    return {'rows': rows, 'changed': changed, 'conflicts': [], 'missing': []}
@@ -1,20 +1,286 @@
-from supabase import create_client, Client
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+import time
+from typing import TYPE_CHECKING
 from config import Config
+from metrics import supabase_timer
+from resilience import call, call_async
 
-_supabase_client: Client = None
+# supabase and httpx take a few hundred ms to import, so they are only loaded
+# when the first client is built; cold starts that never query Supabase
+# (e.g. /health) skip them entirely.
+if TYPE_CHECKING:
+    from postgrest import AsyncPostgrestClient
+    from supabase import Client
 
-def get_supabase_client() -> Client:
+_supabase_client: 'Client' = None
+_supabase_admin_client: 'Client' = None
+_admin_last_used = 0.0
+_client_lock = threading.Lock()
+
+_async_clients = {}
+_io_loop: asyncio.AbstractEventLoop = None
+_io_lock = threading.Lock()
+
+# Seconds left before the current sync call's deadline, read by _apply_deadline
+_attempt_timeout = contextvars.ContextVar('supabase_attempt_timeout', default=None)
+
+
+def _apply_deadline(request) -> None:
+    """httpx request hook: cap this request's timeouts at the time left before the call's deadline."""
+    remaining = _attempt_timeout.get()
+    if remaining is None:
+        return
+    timeout = request.extensions.get('timeout', {})
+    request.extensions['timeout'] = {
+        phase: remaining if limit is None else min(limit, remaining) for phase, limit in timeout.items()
+    } or {'connect': remaining, 'read': remaining, 'write': remaining, 'pool': remaining}
+
+
+def _create_pooled_client(url: str, key: str) -> 'Client':
+    """
+    Create a Supabase client whose PostgREST session uses a shared keep-alive pool.
+
+    supabase-py builds a default httpx session per client; we swap in one with
+    our pool limits so every table call reuses warm TLS connections.
+    """
+    import httpx
+    from supabase import create_client
+    from supabase.lib.client_options import ClientOptions
+    
+    timeout = httpx.Timeout(Config.SUPABASE_TIMEOUT, connect=Config.SUPABASE_CONNECT_TIMEOUT)
+    options = ClientOptions(postgrest_client_timeout=timeout, storage_client_timeout=Config.SUPABASE_TIMEOUT)
+    client = create_client(url, key, options)
+    postgrest = client.postgrest
+    default_session = postgrest.session
+    postgrest.session = type(default_session)(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        timeout=timeout,
+        event_hooks={'request': [_apply_deadline]},
+        limits=httpx.Limits(
+            max_connections=Config.SUPABASE_POOL_SIZE,
+            max_keepalive_connections=Config.SUPABASE_POOL_SIZE,
+            keepalive_expiry=Config.SUPABASE_KEEPALIVE_EXPIRY,
+        ),
+    )
+    default_session.close()
+    return client
+
+
+def _close_client(client: 'Client') -> None:
+    """Close the pooled connections held by a client, ignoring errors."""
+    try:
+        client.postgrest.aclose()
+    except Exception as e:
+        print(f"Failed to close Supabase client: {str(e)}")
+
+
+def check_supabase_client_health(client: 'Client') -> bool:
+    """Run a cheap probe query to check that the client's pool still works."""
+    try:
+        client.table('team_members').select('id').limit(1).execute()
+        return True
+    except Exception as e:
+        print(f"Supabase health probe failed: {str(e)}")
+        return False
+
+
+def get_supabase_client() -> 'Client':
     """Get or create Supabase client instance."""
     global _supabase_client
     if _supabase_client is None:
         if not Config.SUPABASE_URL or not Config.SUPABASE_KEY:
             raise ValueError("Supabase URL and Key must be set in environment variables")
-        _supabase_client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+        with _client_lock:
+            if _supabase_client is None:
+                _supabase_client = _create_pooled_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
     return _supabase_client
 
 
-def get_supabase_admin_client() -> Client:
-    """Get Supabase client with service role key for admin operations."""
+def get_supabase_admin_client() -> 'Client':
+    """
+    Get the shared Supabase client with service role key for admin operations.
+
+    The client is created once and reused. If it has been idle for longer than
+    SUPABASE_POOL_PROBE_AFTER seconds it is probed first and rebuilt when the
+    probe fails, so a stale pool never serves a real request.
+    """
+    global _supabase_admin_client, _admin_last_used
     if not Config.SUPABASE_URL or not Config.SUPABASE_SERVICE_KEY:
         raise ValueError("Supabase URL and Service Key must be set for admin operations")
-    return create_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+    with _client_lock:
+        now = time.monotonic()
+        client = _supabase_admin_client
+        if client is not None and now - _admin_last_used > Config.SUPABASE_POOL_PROBE_AFTER:
+            if not check_supabase_client_health(client):
+                _close_client(client)
+                client = None
+        if client is None:
+            client = _create_pooled_client(Config.SUPABASE_URL, Config.SUPABASE_SERVICE_KEY)
+            _supabase_admin_client = client
+        _admin_last_used = now
+        return client
+
+
+def reset_supabase_admin_client() -> None:
+    """Close and drop the shared admin client; the next call builds a fresh one."""
+    global _supabase_admin_client
+    with _client_lock:
+        if _supabase_admin_client is not None:
+            _close_client(_supabase_admin_client)
+            _supabase_admin_client = None
+
+
+_OPERATIONS = {'GET': 'select', 'HEAD': 'count', 'POST': 'insert', 'PATCH': 'update', 'DELETE': 'delete'}
+
+
+def _describe_query(query) -> tuple:
+    """Return ``(table, operation)`` labels for a PostgREST request builder."""
+    path = getattr(query, 'path', '') or ''
+    method = getattr(query, 'http_method', '') or ''
+    method = getattr(method, 'value', method)
+    if path.startswith('/rpc/'):
+        return path[len('/rpc/'):], 'rpc'
+    return path.lstrip('/') or 'unknown', _OPERATIONS.get(str(method).upper(), 'unknown')
+
+
+def execute(query, deadline: float = None):
+    """
+    Execute a PostgREST query and record its latency.
+
+    Every table and RPC call goes through here so request timing can tell
+    Supabase round-trips apart from the rest of the handler. The call is
+    bounded by a deadline, reads are retried on transient failures and the
+    circuit breaker can refuse it outright (see ``resilience``).
+
+    Args:
+        deadline: Seconds for the call, retries included (default by operation)
+
+    Raises:
+        SupabaseUnavailable: if the circuit breaker is open
+    """
+    table, operation = _describe_query(query)
+
+    def attempt(timeout):
+        token = _attempt_timeout.set(timeout)
+        try:
+            return query.execute()
+        finally:
+            _attempt_timeout.reset(token)
+
+    with supabase_timer(table, operation):
+        return call(attempt, table, operation, deadline)
+
+
+# ==================== Async client ====================
+#
+# Async PostgREST clients are bound to the event loop their connections were
+# opened on, and request threads have no loop of their own, so all async
+# Supabase I/O is sent to one long-lived loop in a background thread.
+# That keeps a single warm connection pool whether the app is served by
+# gunicorn or by an ASGI server, where many requests share the loop at once.
+
+def _get_io_loop() -> asyncio.AbstractEventLoop:
+    """Start (once) and return the background event loop that owns async clients."""
+    global _io_loop
+    if _io_loop is None:
+        with _io_lock:
+            if _io_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='supabase-io', daemon=True).start()
+                _io_loop = loop
+    return _io_loop
+
+
+def run_on_io_loop(coro) -> 'concurrent.futures.Future':
+    """Schedule a coroutine on the Supabase I/O loop from any thread; returns its future."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_io_loop())
+
+
+def _create_async_client(url: str, key: str) -> 'AsyncPostgrestClient':
+    """Create an async PostgREST client with the same pool limits as the sync one."""
+    import httpx
+    from postgrest import AsyncPostgrestClient
+    from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+    timeout = httpx.Timeout(Config.SUPABASE_TIMEOUT, connect=Config.SUPABASE_CONNECT_TIMEOUT)
+    headers = {**DEFAULT_POSTGREST_CLIENT_HEADERS, 'apikey': key, 'Authorization': f'Bearer {key}'}
+    client = AsyncPostgrestClient(f'{url}/rest/v1', headers=headers, timeout=timeout)
+    # The default session has not opened any connections yet, so it can simply be replaced
+    client.session = httpx.AsyncClient(
+        base_url=client.session.base_url,
+        headers=client.session.headers,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=Config.SUPABASE_ASYNC_POOL_SIZE,
+            max_keepalive_connections=Config.SUPABASE_ASYNC_POOL_SIZE,
+            keepalive_expiry=Config.SUPABASE_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return client
+
+
+def _get_async_client(name: str, key: str) -> 'AsyncPostgrestClient':
+    if not Config.SUPABASE_URL or not key:
+        raise ValueError("Supabase URL and Key must be set in environment variables")
+    client = _async_clients.get(name)
+    if client is None:
+        with _client_lock:
+            client = _async_clients.get(name)
+            if client is None:
+                client = _async_clients[name] = _create_async_client(Config.SUPABASE_URL, key)
+    return client
+
+
+def get_async_supabase_client() -> 'AsyncPostgrestClient':
+    """Get the shared async PostgREST client (anon key) for public reads."""
+    return _get_async_client('anon', Config.SUPABASE_KEY)
+
+
+def get_async_supabase_admin_client() -> 'AsyncPostgrestClient':
+    """Get the shared async PostgREST client with the service role key."""
+    return _get_async_client('admin', Config.SUPABASE_SERVICE_KEY)
+
+
+async def execute_async(query, deadline: float = None):
+    """
+    Await an async PostgREST query on the I/O loop and record its latency.
+
+    ``query`` must come from ``get_async_supabase_client()`` or
+    ``get_async_supabase_admin_client()``. The caller's loop is never blocked,
+    so an ASGI server can keep serving other requests meanwhile. Deadlines,
+    retries and the circuit breaker apply as for ``execute``.
+    """
+    table, operation = _describe_query(query)
+    loop = _get_io_loop()
+
+    async def attempt(timeout):
+        # A fresh coroutine per attempt; a builder's execute() can be awaited again
+        try:
+            if asyncio.get_running_loop() is loop:
+                return await asyncio.wait_for(query.execute(), timeout)
+            return await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(asyncio.wait_for(query.execute(), timeout), loop)
+            )
+        except TimeoutError:
+            raise TimeoutError(f"Supabase {operation} on {table} timed out after {timeout:.1f}s") from None
+
+    with supabase_timer(table, operation):
+        return await call_async(attempt, table, operation, deadline)
+
+
+def close_async_clients(timeout: float = 5) -> None:
+    """Close the async clients' connection pools (e.g. on ASGI shutdown)."""
+    with _client_lock:
+        clients = list(_async_clients.values())
+        _async_clients.clear()
+    if _io_loop is None:
+        return
+    for client in clients:
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), _io_loop).result(timeout)
+        except Exception as e:
+            print(f"Failed to close async Supabase client: {str(e)}")
@@ -0,0 +1,45 @@
+"""
+Shared fixtures: the app runs against the offline Supabase stand-in from
+``benchmarks/fake_supabase.py``, so the tests need no network or credentials.
+"""
+import os
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+from fake_supabase import start_server
+
+ADMIN_AUTH = ('admin', 'test-password')
+
+# Config reads the environment when first imported, so this has to run first
+_server, _fake = start_server(rows=10)
+os.environ.update(
+    SUPABASE_URL=f'http://127.0.0.1:{_server.server_address[1]}',
+    SUPABASE_KEY='a.b.c',
+    SUPABASE_SERVICE_KEY='a.b.c',
+    ADMIN_USERNAME=ADMIN_AUTH[0],
+    ADMIN_PASSWORD=ADMIN_AUTH[1],
+)
+
+
+@pytest.fixture
+def fake_supabase():
+    """The in-memory tables behind the fake, for seeding and inspecting rows."""
+    return _fake
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    return create_app('production')
+
+
+@pytest.fixture
+def client(app):
+    from cache import catalog_cache, search_cache
+    catalog_cache.clear()
+    search_cache.clear()
+    return app.test_client()
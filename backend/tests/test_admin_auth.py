@@ -0,0 +1,89 @@
+import pytest
+from itsdangerous import TimestampSigner
+from werkzeug.security import generate_password_hash
+import admin_auth
+from admin_auth import check_credentials, check_session_token, issue_session_token
+from config import Config
+from conftest import ADMIN_AUTH
+
+
+@pytest.fixture(autouse=True)
+def fresh_keys(monkeypatch):
+    """Forget the cached hash and signing key, so each test derives its own."""
+    monkeypatch.setattr(admin_auth, '_password_hash', None)
+    monkeypatch.setattr(admin_auth, '_serializer', None)
+
+
+def _rotate(monkeypatch, **settings):
+    for name, value in settings.items():
+        monkeypatch.setattr(Config, name, value)
+    monkeypatch.setattr(admin_auth, '_password_hash', None)
+    monkeypatch.setattr(admin_auth, '_serializer', None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {'t': 1_700_000_000}
+    monkeypatch.setattr(TimestampSigner, 'get_timestamp', lambda self: now['t'])
+    return now
+
+
+def test_plaintext_password_is_checked():
+    assert check_credentials(*ADMIN_AUTH)
+    assert not check_credentials('admin', 'wrong-password')
+    assert not check_credentials('someone', ADMIN_AUTH[1])
+    assert not check_credentials(None, None)
+
+
+def test_password_hash_takes_precedence(monkeypatch):
+    _rotate(monkeypatch, ADMIN_PASSWORD_HASH=generate_password_hash('from-hash', method='pbkdf2:sha256:1000'))
+    assert check_credentials('admin', 'from-hash')
+    assert not check_credentials(*ADMIN_AUTH)
+
+
+def test_token_round_trip():
+    assert check_session_token(issue_session_token())
+
+
+@pytest.mark.parametrize('mangle', [
+    lambda token: token[:-2] + ('AA' if token[-2:] != 'AA' else 'BB'),
+    lambda token: 'x' + token,
+    lambda token: '',
+    lambda token: 'not.a.token',
+])
+def test_tampered_tokens_are_rejected(mangle):
+    assert not check_session_token(mangle(issue_session_token()))
+
+
+def test_token_expires(monkeypatch, clock):
+    monkeypatch.setattr(Config, 'ADMIN_SESSION_SECONDS', 900)
+    token = issue_session_token()
+    clock['t'] += 900
+    assert check_session_token(token)
+    clock['t'] += 1
+    assert not check_session_token(token)
+
+
+@pytest.mark.parametrize('setting, value', [
+    ('ADMIN_PASSWORD', 'new-password'),
+    ('ADMIN_PASSWORD_HASH', generate_password_hash('new-password', method='pbkdf2:sha256:1000')),
+    ('ADMIN_USERNAME', 'root'),
+    ('ADMIN_SESSION_SECRET', 'another-secret'),
+])
+def test_changing_credentials_or_secret_revokes_tokens(monkeypatch, setting, value):
+    token = issue_session_token()
+    _rotate(monkeypatch, **{setting: value})
+    assert not check_session_token(token)
+
+
+def test_session_endpoint_issues_a_bearer_token(client):
+    assert client.post('/admin/session', auth=('admin', 'wrong-password')).status_code == 401
+    assert client.post('/admin/session').status_code == 401
+
+    response = client.post('/admin/session', auth=ADMIN_AUTH)
+    assert response.status_code == 201
+    token = response.get_json()['token']
+    assert client.get('/admin/templates', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+    assert client.get('/admin/templates', headers={'Authorization': f'Bearer {token}x'}).status_code == 401
+    # A session token can't be used to get another one
+    assert client.post('/admin/session', headers={'Authorization': f'Bearer {token}'}).status_code == 401
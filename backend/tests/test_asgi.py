@@ -0,0 +1,84 @@
+import asyncio
+import base64
+import json
+import asgi
+from conftest import ADMIN_AUTH
+
+
+async def _call(app, scope, messages):
+    received = list(messages)
+    sent = []
+
+    async def receive():
+        return received.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+def _request(method, path, headers=(), body=b''):
+    """Serve one HTTP request through ``asgi.app``; returns ``(status, headers, body)``."""
+    query = path.partition('?')[2]
+    if body:
+        headers = [*headers, ('Content-Length', str(len(body)))]
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http',
+        'path': path.partition('?')[0], 'root_path': '', 'query_string': query.encode(),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+    }
+    sent = asyncio.run(_call(asgi.app, scope, [{'type': 'http.request', 'body': body, 'more_body': False}]))
+    start = sent[0]
+    assert start['type'] == 'http.response.start'
+    assert not sent[-1].get('more_body')
+    return start['status'], dict(start['headers']), b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def test_serves_sync_route():
+    status, headers, body = _request('GET', '/health')
+    assert status == 200
+    assert json.loads(body)['status'] == 'healthy'
+
+
+def test_serves_catalog_route_with_query():
+    status, headers, body = _request('GET', '/api/team?limit=2')
+    assert status == 200
+    assert headers[b'content-type'] == b'application/json'
+    assert len(json.loads(body)['data']) == 2
+
+
+def test_passes_request_body_and_headers():
+    basic = base64.b64encode(':'.join(ADMIN_AUTH).encode()).decode()
+    headers = [('Authorization', f'Basic {basic}'), ('Content-Type', 'application/json')]
+    status, _, body = _request('PATCH', '/admin/team', headers=headers, body=b'{"id": "x"}')
+    assert status == 400
+    assert json.loads(body)['error'] == 'Send a non-empty JSON array of updates'
+
+
+def test_lifespan():
+    sent = asyncio.run(_call(asgi.FlaskASGI(asgi.app.wsgi_application, threads=1), {'type': 'lifespan'},
+                             [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]))
+    assert [message['type'] for message in sent] == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+def test_build_environ_maps_path_and_headers():
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'https',
+        'path': '/prefix/api/café', 'root_path': '/prefix', 'query_string': b'a=1&b=2',
+        'headers': [(b'content-type', b'text/plain'), (b'x-forwarded-for', b'1.1.1.1'), (b'x-forwarded-for', b'2.2.2.2'),
+                    (b'cookie', b'a=1'), (b'cookie', b'b=2')],
+        'server': ('example.com', 443), 'client': ('10.0.0.1', 1234),
+    }
+    environ = asgi.build_environ(scope, b'body')
+    assert environ['SCRIPT_NAME'] == '/prefix'
+    assert environ['PATH_INFO'] == '/api/café'.encode('utf-8').decode('latin-1')
+    assert environ['QUERY_STRING'] == 'a=1&b=2'
+    assert environ['CONTENT_TYPE'] == 'text/plain'
+    assert environ['HTTP_X_FORWARDED_FOR'] == '1.1.1.1,2.2.2.2'
+    assert environ['HTTP_COOKIE'] == 'a=1; b=2'
+    assert environ['wsgi.url_scheme'] == 'https' and environ['SERVER_PORT'] == '443'
+    assert environ['REMOTE_ADDR'] == '10.0.0.1'
+    assert environ['wsgi.input'].read() == b'body'
@@ -0,0 +1,161 @@
+import csv
+import io
+import json
+import pytest
+import bulk
+from bulk import ImportFormatError, RowError, detect_format, iter_records, validate_row
+from config import Config
+from conftest import ADMIN_AUTH
+
+TAKEN_ID = '00000000-0000-0000-0000-000000004e20'
+
+
+def _records(text, fmt):
+    return list(iter_records(io.BytesIO(text.encode('utf-8')), fmt))
+
+
+@pytest.fixture
+def team(fake_supabase, monkeypatch):
+    """A private copy of the team table, so imports don't leak into other tests."""
+    rows = [dict(row) for row in fake_supabase.tables['team_members']]
+    monkeypatch.setitem(fake_supabase.tables, 'team_members', rows)
+    return rows
+
+
+@pytest.mark.parametrize('requested, content_type, expected', [
+    (None, 'application/x-ndjson', 'ndjson'),
+    (None, 'text/csv; charset=utf-8', 'csv'),
+    (None, 'application/jsonl', 'ndjson'),
+    ('csv', 'application/x-ndjson', 'csv'),
+])
+def test_detect_format(requested, content_type, expected):
+    assert detect_format(requested, content_type) == expected
+
+
+@pytest.mark.parametrize('requested, content_type', [('xml', None), (None, 'application/json'), (None, None)])
+def test_detect_format_rejects_unknown_formats(requested, content_type):
+    with pytest.raises(ImportFormatError):
+        detect_format(requested, content_type)
+
+
+def test_ndjson_reports_malformed_lines_by_number():
+    records = _records('﻿{"name": "A"}\n\n{"name": \n  \n[1, 2]\n{"name": "B"}', 'ndjson')
+    assert [number for number, _ in records] == [1, 3, 5, 6]
+    assert records[0][1] == {'name': 'A'}
+    assert isinstance(records[1][1], RowError)
+    assert records[2][1] == [1, 2]
+    assert records[3][1] == {'name': 'B'}
+
+
+def test_csv_cells_are_coerced_to_column_types():
+    text = (
+        'name,role,skills,display_order,bio\n'
+        'A,Dev,"python, react",3,\n'
+        'B,Dev,"[""go"", ""rust""]",0,"two\nlines"\n'
+        'C,Dev,,x,\n'
+        'D,Dev,,1,,extra\n'
+        'E,Dev,flask,2,\n'
+    )
+    records = _records(text, 'csv')
+    assert [number for number, _ in records] == [2, 3, 5, 6, 7]
+    assert records[0][1] == {'name': 'A', 'role': 'Dev', 'skills': ['python', 'react'], 'display_order': 3}
+    assert records[1][1] == {'name': 'B', 'role': 'Dev', 'skills': ['go', 'rust'], 'display_order': 0, 'bio': 'two\nlines'}
+    assert str(records[2][1]) == 'display_order must be an integer'
+    assert str(records[3][1]) == 'Row has more cells than the header'
+    assert records[4][1]['skills'] == ['flask']
+
+
+@pytest.mark.parametrize('raw, expected', [('true', True), ('Yes', True), ('1', True), ('false', False), ('NO', False), ('0', False)])
+def test_csv_booleans(raw, expected):
+    assert bulk._csv_value('is_featured', raw) is expected
+
+
+def test_csv_rejects_other_booleans():
+    with pytest.raises(RowError):
+        bulk._csv_value('is_featured', 'maybe')
+
+
+@pytest.mark.parametrize('record, error', [
+    (['name'], 'Each record must be an object'),
+    ({'name': 'A', 'role': 'R', 'salary': 1}, 'Unknown columns: salary'),
+    ({'name': 'A'}, 'Missing required columns: role'),
+    ({'name': 'A', 'role': 'R', 'skills': 'python'}, 'skills must be a list of strings'),
+    ({'name': 'A', 'role': 'R', 'display_order': True}, 'display_order must be an integer'),
+])
+def test_validate_row(record, error):
+    with pytest.raises(RowError, match=error):
+        validate_row('team_members', record)
+
+
+def test_validate_row_checks_difficulty():
+    with pytest.raises(RowError, match='difficulty must be one of'):
+        validate_row('project_templates', {'title': 'T', 'description': 'D', 'difficulty': 'Expert'})
+
+
+def _import(client, body, content_type='application/x-ndjson'):
+    return client.post('/admin/import/team', data=body.encode('utf-8'), content_type=content_type, auth=ADMIN_AUTH)
+
+
+def test_import_reports_partial_failures(client, team, monkeypatch):
+    monkeypatch.setattr(Config, 'BULK_IMPORT_BATCH_SIZE', 3)
+    lines = [
+        {'name': 'New 1', 'role': 'Dev'},
+        {'name': 'New 2'},
+        # Valid, but the database refuses the reused id, which fails its batch
+        {'id': TAKEN_ID, 'name': 'Clash', 'role': 'Dev'},
+        {'name': 'New 3', 'role': 'Dev'},
+    ]
+    body = '\n'.join(json.dumps(line) for line in lines) + '\n{broken\n'
+    before = len(team)
+
+    response = _import(client, body)
+    assert response.status_code == 207
+    summary = response.get_json()['data']
+    assert summary['inserted'] == 2 and summary['failed'] == 3
+    assert [error['line'] for error in summary['errors']] == [2, 3, 5]
+    assert 'duplicate key' in summary['errors'][1]['error']
+    assert sorted(row['name'] for row in team[before:]) == ['New 1', 'New 3']
+
+
+def test_import_truncates_the_error_list(client, team, monkeypatch):
+    monkeypatch.setattr(bulk, 'MAX_REPORTED_ERRORS', 2)
+    response = _import(client, 'name,role\n' + 'A,\n' * 5 + 'B,Dev\n', content_type='text/csv')
+    summary = response.get_json()['data']
+    assert summary['inserted'] == 1 and summary['failed'] == 5
+    assert len(summary['errors']) == 2 and summary['errors_truncated']
+
+
+def test_clean_import_is_a_200(client, team):
+    response = _import(client, 'name,role,skills\nA,Dev,"python, go"\n', content_type='text/csv')
+    assert response.status_code == 200
+    assert response.get_json()['data'] == {'inserted': 1, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    assert team[-1]['skills'] == ['python', 'go']
+
+
+def test_import_needs_a_known_format(client, team):
+    assert _import(client, '{}', content_type='application/xml').status_code == 400
+    assert client.post('/admin/import/contacts', data=b'{}', content_type='application/x-ndjson',
+                       auth=ADMIN_AUTH).status_code == 404
+
+
+def test_export_pages_through_the_whole_table(client, team, monkeypatch):
+    monkeypatch.setattr(Config, 'EXPORT_PAGE_SIZE', 3)
+    ndjson = client.get('/admin/export/team', auth=ADMIN_AUTH)
+    assert ndjson.status_code == 200
+    exported = [json.loads(line) for line in ndjson.get_data(as_text=True).splitlines()]
+    assert sorted(row['id'] for row in exported) == sorted(row['id'] for row in team)
+
+    response = client.get('/admin/export/team?format=csv&fields=id,name,skills,display_order', auth=ADMIN_AUTH)
+    assert response.headers['Content-Disposition'] == 'attachment; filename="team.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == len(team)
+    assert json.loads(rows[0]['skills']) == ['python', 'react']
+
+
+def test_contact_export_escapes_formulas(client, fake_supabase, monkeypatch):
+    contacts = [dict(row) for row in fake_supabase.tables['contact_submissions']]
+    contacts[0]['name'] = '=HYPERLINK("http://evil")'
+    monkeypatch.setitem(fake_supabase.tables, 'contact_submissions', contacts)
+    response = client.get('/admin/export/contacts?format=csv&fields=id,name,submitted_at', auth=ADMIN_AUTH)
+    names = [row['name'] for row in csv.DictReader(io.StringIO(response.get_data(as_text=True)))]
+    assert '\'=HYPERLINK("http://evil")' in names
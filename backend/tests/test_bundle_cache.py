@@ -0,0 +1,59 @@
+import time
+import cache
+from cache import FRESH, MISS, STALE, TTLCache
+from conftest import ADMIN_AUTH
+
+MEMBER_ID = '00000000-0000-0000-0000-000000004e20'
+
+
+def _team_name(client, path):
+    body = client.get(path).get_json()['data']
+    team = body['team'] if isinstance(body, dict) else body
+    return next(member['name'] for member in team if member['id'] == MEMBER_ID)
+
+
+def test_reads_after_admin_write_see_it(client):
+    # Cache both the bundle and the team list it is built from
+    assert _team_name(client, '/api/bundle?include=team') != 'Renamed'
+    assert _team_name(client, '/api/team') != 'Renamed'
+
+    response = client.put(f'/admin/team/{MEMBER_ID}', json={'name': 'Renamed'}, auth=ADMIN_AUTH)
+    assert response.status_code == 200
+
+    assert _team_name(client, '/api/team') == 'Renamed'
+    assert _team_name(client, '/api/bundle?include=team') == 'Renamed'
+
+
+def test_invalidation_drops_entries_but_expiry_serves_stale():
+    cache = TTLCache(ttl=0.05, stale_ttl=60)
+    cache.set(('team_members', 'list'), ['old'])
+    cache.set((('portfolio_projects', 'team_members'), 'bundle'), {'team': ['old']})
+    cache.set(('project_templates', 'list'), ['kept'])
+
+    cache.invalidate('team_members')
+    assert cache.lookup(('team_members', 'list')) == (MISS, None)
+    assert cache.lookup((('portfolio_projects', 'team_members'), 'bundle')) == (MISS, None)
+    assert cache.lookup(('project_templates', 'list')) == (FRESH, ['kept'])
+
+    time.sleep(0.06)
+    assert cache.lookup(('project_templates', 'list')) == (STALE, ['kept'])
+
+
+def test_write_racing_a_slow_read_is_not_overwritten():
+    cache = TTLCache(ttl=60)
+    generation = cache.generation('team_members')
+    cache.invalidate('team_members')
+    cache.set(('team_members', 'list'), ['read before the write'], generation)
+    assert cache.lookup(('team_members', 'list')) == (MISS, None)
+
+
+def test_cache_hits_are_served_without_the_io_loop(client, monkeypatch):
+    assert client.get('/api/bundle').status_code == 200
+
+    def unavailable(coro):
+        coro.close()
+        raise AssertionError('a cache hit went to the I/O loop')
+
+    monkeypatch.setattr(cache, 'run_on_io_loop', unavailable)
+    assert client.get('/api/bundle').status_code == 200
+    assert client.get('/api/team').status_code == 200
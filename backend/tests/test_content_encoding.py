@@ -0,0 +1,118 @@
+import gzip
+import pytest
+from flask import Flask, Response, jsonify
+from werkzeug.http import parse_accept_header
+from config import Config
+from content_encoding import init_compression, negotiate
+
+OFFERED = ('br', 'zstd', 'gzip')
+BIG = {'rows': ['x' * 40] * 100}
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', 'gzip'),
+    ('GZIP', 'gzip'),
+    ('gzip, br', 'br'),
+    ('gzip;q=0.5, br;q=0.4', 'gzip'),
+    ('gzip, identity;q=0', 'gzip'),
+    ('identity;q=0', None),
+    ('gzip;q=0', None),
+    ('*', 'br'),
+    ('br;q=0, *', 'zstd'),
+    ('*;q=0, gzip', 'gzip'),
+    ('deflate', None),
+    ('', None),
+])
+def test_negotiate_respects_q_values(header, expected):
+    assert negotiate(parse_accept_header(header), OFFERED) == expected
+
+
+def test_negotiate_only_picks_offered_encodings():
+    assert negotiate(parse_accept_header('br, zstd'), ('gzip',)) is None
+
+
+@pytest.fixture
+def compressing_client():
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route('/big')
+    def big():
+        response = jsonify(BIG)
+        response.set_etag('abc')
+        return response
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/streamed')
+    def streamed():
+        return Response((b'x' * 100 for _ in range(50)), mimetype='application/x-ndjson')
+
+    @app.route('/encoded')
+    def encoded():
+        return Response(gzip.compress(b'x' * 5000), mimetype='application/json', headers={'Content-Encoding': 'gzip'})
+
+    @app.route('/image')
+    def image():
+        return Response(b'\x89PNG' + b'\0' * 5000, mimetype='image/png')
+
+    @app.route('/no-transform')
+    def no_transform():
+        response = jsonify(BIG)
+        response.headers['Cache-Control'] = 'no-transform'
+        return response
+
+    return app.test_client()
+
+
+def test_large_bodies_are_compressed_with_vary_and_etag(compressing_client):
+    response = compressing_client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.get_etag() == ('abc-gzip', False)
+    assert gzip.decompress(response.get_data()) == compressing_client.get('/big').get_data()
+
+
+def test_identity_only_clients_get_plain_bodies_that_still_vary(compressing_client):
+    for headers in ({}, {'Accept-Encoding': 'gzip;q=0'}, {'Accept-Encoding': 'identity'}):
+        response = compressing_client.get('/big', headers=headers)
+        assert 'Content-Encoding' not in response.headers
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert response.get_etag() == ('abc', False)
+
+
+def test_small_bodies_are_sent_plain(compressing_client):
+    response = compressing_client.get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert len(response.get_data()) < Config.COMPRESS_MIN_BYTES
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+@pytest.mark.parametrize('path', ['/streamed', '/encoded', '/image', '/no-transform'])
+def test_skips_streamed_encoded_and_incompressible_responses(compressing_client, path):
+    plain = compressing_client.get(path)
+    response = compressing_client.get(path, headers={'Accept-Encoding': 'gzip, br, zstd'})
+    assert response.headers.get('Content-Encoding') == plain.headers.get('Content-Encoding')
+    assert response.get_data() == plain.get_data()
+
+
+def test_head_requests_are_not_compressed(compressing_client):
+    response = compressing_client.head('/big', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_catalog_bodies_revalidate_per_encoding(client):
+    plain = client.get('/api/templates')
+    encoded = client.get('/api/templates', headers={'Accept-Encoding': 'gzip'})
+    assert encoded.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in encoded.headers['Vary'] and 'Accept-Encoding' in plain.headers['Vary']
+    assert encoded.get_etag()[0] == f"{plain.get_etag()[0]}-gzip"
+    assert gzip.decompress(encoded.get_data()) == plain.get_data()
+
+    revalidated = client.get('/api/templates', headers={'Accept-Encoding': 'gzip', 'If-None-Match': encoded.headers['ETag']})
+    assert revalidated.status_code == 304
+    # A plain ETag doesn't validate the gzip representation
+    mismatched = client.get('/api/templates', headers={'Accept-Encoding': 'gzip', 'If-None-Match': plain.headers['ETag']})
+    assert mismatched.status_code == 200
@@ -0,0 +1,58 @@
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from email_utils import SMTPDeliveryWorker
+
+
+class FakeSMTP:
+    """SMTP session that fails a send if it is closed mid-way."""
+
+    def __init__(self):
+        self.closed = False
+        self.sent = []
+
+    def send_message(self, msg):
+        time.sleep(0.02)
+        if self.closed:
+            raise smtplib.SMTPServerDisconnected('session closed during send')
+        self.sent.append(msg['To'])
+
+    def quit(self):
+        self.closed = True
+
+
+def _message(to):
+    msg = EmailMessage()
+    msg['To'] = to
+    return msg
+
+
+def test_idle_disconnect_waits_for_send_batch_on_another_thread():
+    worker = SMTPDeliveryWorker(idle_timeout=0.005, retry_backoff=0)
+    sessions = []
+    worker._connect = lambda: sessions.append(FakeSMTP()) or sessions[-1]
+    worker._ensure_started()
+
+    messages = [_message(f'{i}@example.com') for i in range(10)]
+    results = []
+    sender = threading.Thread(target=lambda: results.extend(worker.send_batch(messages)))
+    sender.start()
+    sender.join(5)
+
+    assert results == [True] * 10
+    assert worker.metrics()['retries'] == 0
+    assert sum(len(session.sent) for session in sessions) == 10
+    worker.stop()
+
+
+def test_worker_delivers_queued_messages_in_batches():
+    worker = SMTPDeliveryWorker(batch_size=5, idle_timeout=0.05)
+    session = FakeSMTP()
+    worker._connect = lambda: session
+    for i in range(7):
+        assert worker.submit(_message(f'{i}@example.com'))
+    assert worker.flush(5)
+    assert session.sent == [f'{i}@example.com' for i in range(7)]
+    assert worker.metrics()['sent'] == 7
+    worker.stop()
@@ -0,0 +1,25 @@
+import pytest
+from email_utils import auto_reply_address, build_auto_reply_message
+
+CONTACT = {'name': 'Ann', 'phone': None, 'message': 'Hello'}
+
+
+def test_auto_reply_goes_to_the_submitter():
+    message = build_auto_reply_message({**CONTACT, 'email': ' ann@example.com '})
+    assert message['To'] == 'ann@example.com'
+
+
+@pytest.mark.parametrize('email', [
+    'ann@example.com, boss@example.org',
+    'ann@example.com; boss@example.org',
+    'ann@example.com boss@example.org',
+    'Ann <ann@example.com>',
+    'ann@example.com\r\nBcc: boss@example.org',
+    'not-an-address',
+    '',
+    None,
+])
+def test_auto_reply_skips_anything_but_one_address(email):
+    assert auto_reply_address({**CONTACT, 'email': email}) is None
+    with pytest.raises(ValueError):
+        build_auto_reply_message({**CONTACT, 'email': email})
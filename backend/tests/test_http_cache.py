@@ -0,0 +1,29 @@
+from cache import catalog_cache
+from conftest import ADMIN_AUTH
+from http_cache import body_cache
+
+
+def test_delete_advances_last_modified(client, fake_supabase, monkeypatch):
+    monkeypatch.setitem(fake_supabase.tables, 'project_templates', [dict(row) for row in fake_supabase.tables['project_templates']])
+    body_cache.clear()
+    first = client.get('/api/templates')
+    assert first.status_code == 200
+    since = {'If-Modified-Since': first.headers['Last-Modified']}
+    assert client.get('/api/templates', headers=since).status_code == 304
+
+    victim = first.get_json()['data'][0]['id']
+    assert client.delete(f'/admin/templates/{victim}', auth=ADMIN_AUTH).status_code == 200
+
+    after = client.get('/api/templates', headers=since)
+    assert after.status_code == 200
+    assert victim not in [row['id'] for row in after.get_json()['data']]
+    assert after.last_modified > first.last_modified
+
+
+def test_reloading_unchanged_data_keeps_last_modified(client):
+    body_cache.clear()
+    first = client.get('/api/templates')
+    # A reload returns a new (equal) object, so the body is rendered again
+    catalog_cache.clear()
+    again = client.get('/api/templates', headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert again.status_code == 304
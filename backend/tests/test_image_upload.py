@@ -0,0 +1,47 @@
+import io
+from PIL import Image
+from config import Config
+from conftest import ADMIN_AUTH
+from images import MULTIPART_OVERHEAD
+
+
+def _png(width=64, height=48):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def test_upload_stores_variants(client):
+    response = client.post('/admin/upload?folder=team', auth=ADMIN_AUTH,
+                           data={'file': (io.BytesIO(_png()), 'avatar.png')})
+    assert response.status_code == 201
+    assert response.get_json()['success'] is True
+
+
+def test_oversized_upload_is_refused_before_parsing(client):
+    size = Config.IMAGE_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD + 1
+    response = client.post('/admin/upload', auth=ADMIN_AUTH, input_stream=io.BytesIO(b'x' * size),
+                           content_type='multipart/form-data; boundary=x', headers={'Content-Length': str(size)})
+    assert response.status_code == 413
+
+
+def test_upload_without_content_length_is_refused(client):
+    response = client.post('/admin/upload', auth=ADMIN_AUTH, input_stream=io.BytesIO(b'x'),
+                           content_type='multipart/form-data; boundary=x', headers={'Transfer-Encoding': 'chunked'})
+    assert response.status_code == 411
+
+
+def test_narrow_source_variants_record_real_sizes(client):
+    response = client.post('/admin/upload?folder=narrow', auth=ADMIN_AUTH,
+                           data={'file': (io.BytesIO(_png(500, 250)), 'narrow.png')})
+    image = response.get_json()['image']
+    webp = [variant for variant in image['variants'] if variant['format'] == 'webp']
+    assert [(variant['width'], variant['height']) for variant in webp] == [(320, 160), (500, 250)]
+    assert image['srcset']['webp'].endswith(' 500w')
+    assert response.get_json()['url'].split('?')[0].endswith('/500.webp')
+
+    # A re-upload is answered from the probe, with the same variants
+    again = client.post('/admin/upload?folder=narrow', auth=ADMIN_AUTH,
+                        data={'file': (io.BytesIO(_png(500, 250)), 'narrow.png')})
+    assert again.status_code == 200
+    assert again.get_json()['image'] == image
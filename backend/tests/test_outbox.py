@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+import outbox
+from config import Config
+
+
+class RecordingWorker:
+    """Delivery worker stand-in; ``fail`` is the set of recipients whose delivery fails."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.batches = []
+
+    def send_batch(self, messages):
+        self.batches.append(messages)
+        return [msg['Reply-To'] not in self.fail for msg in messages]
+
+
+@pytest.fixture
+def outbox_rows(fake_supabase, monkeypatch):
+    monkeypatch.setattr(outbox, 'email_configured', lambda: True)
+    monkeypatch.setattr(Config, 'CONTACT_AUTO_REPLY', False)
+    rows = fake_supabase.tables['notification_outbox']
+    rows.clear()
+
+    def add(count, **fields):
+        now = datetime.now(timezone.utc)
+        for i in range(count):
+            rows.append({
+                'id': f'outbox-{len(rows)}', 'kind': 'contact_notification', 'status': 'pending', 'attempts': 0,
+                'created_at': (now + timedelta(milliseconds=len(rows))).isoformat(), 'claimed_at': None,
+                'payload': {'name': f'Visitor {len(rows)}', 'email': f'v{len(rows)}@example.com', 'message': 'Hi'},
+                **fields,
+            })
+        return rows
+    return add
+
+
+def _use_worker(monkeypatch, worker):
+    monkeypatch.setattr(outbox, 'get_delivery_worker', lambda: worker)
+    return worker
+
+
+def test_small_batch_sends_one_email_per_row(outbox_rows, monkeypatch):
+    rows = outbox_rows(2)
+    worker = _use_worker(monkeypatch, RecordingWorker())
+    assert outbox.drain_outbox() == {'sent': 2, 'failed': 0, 'emails': 2}
+    assert [row['status'] for row in rows] == ['sent', 'sent']
+    assert len(worker.batches[0]) == 2
+
+
+def test_burst_is_coalesced_into_a_digest(outbox_rows, monkeypatch):
+    rows = outbox_rows(Config.OUTBOX_DIGEST_THRESHOLD)
+    worker = _use_worker(monkeypatch, RecordingWorker())
+    assert outbox.drain_outbox() == {'sent': len(rows), 'failed': 0, 'emails': 1}
+    assert len(worker.batches) == 1 and len(worker.batches[0]) == 1
+
+
+def test_failed_delivery_is_retried_then_marked_failed(outbox_rows, monkeypatch):
+    monkeypatch.setattr(Config, 'OUTBOX_MAX_ATTEMPTS', 2)
+    rows = outbox_rows(2)
+    _use_worker(monkeypatch, RecordingWorker(fail={'v0@example.com'}))
+
+    assert outbox.drain_outbox() == {'sent': 1, 'failed': 1, 'emails': 1}
+    assert [(row['status'], row['attempts']) for row in rows] == [('pending', 1), ('sent', 0)]
+
+    assert outbox.drain_outbox() == {'sent': 0, 'failed': 1, 'emails': 0}
+    assert rows[0]['status'] == 'failed' and rows[0]['attempts'] == 2
+    assert outbox.drain_outbox() == {'sent': 0, 'failed': 0, 'emails': 0}
+
+
+def test_stuck_claims_are_released_but_live_ones_are_not(outbox_rows, monkeypatch):
+    long_ago = (datetime.now(timezone.utc) - timedelta(seconds=Config.OUTBOX_CLAIM_TIMEOUT + 60)).isoformat()
+    just_now = datetime.now(timezone.utc).isoformat()
+    rows = outbox_rows(1, status='sending', claimed_at=long_ago)
+    outbox_rows(1, status='sending', claimed_at=just_now)
+    _use_worker(monkeypatch, RecordingWorker())
+
+    assert outbox.drain_outbox()['sent'] == 1
+    assert [row['status'] for row in rows] == ['sent', 'sending']
+
+
+def test_contact_submission_drains_inline(client, outbox_rows, monkeypatch):
+    monkeypatch.setattr(Config, 'NOTIFICATION_OUTBOX', True)
+    monkeypatch.setattr(Config, 'OUTBOX_DRAIN_INLINE', True)
+    monkeypatch.setattr(Config, 'RATE_LIMIT_ENABLED', False)
+    rows = outbox_rows(0)
+    worker = _use_worker(monkeypatch, RecordingWorker())
+
+    response = client.post('/api/contact', json={'name': 'Ann', 'email': 'ann@example.com', 'message': 'Hello'})
+    assert response.status_code == 201
+    assert [row['status'] for row in rows] == ['sent']
+    assert worker.batches[0][0]['Reply-To'] == 'ann@example.com'
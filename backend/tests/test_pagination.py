@@ -0,0 +1,62 @@
+import base64
+import json
+import pytest
+from pagination import CATALOG_KEYSET, QueryParamError, decode_cursor
+
+
+def _cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def test_next_cursor_continues_the_list(client):
+    first = client.get('/api/templates?limit=2').get_json()
+    second = client.get(f"/api/templates?limit=2&cursor={first['next_cursor']}").get_json()
+    assert len(second['data']) == 2
+    assert not {row['id'] for row in first['data']} & {row['id'] for row in second['data']}
+
+
+@pytest.mark.parametrize('values', [
+    [[1], 'x', 'y'],
+    [{'a': 1}, 'x', 'y'],
+    [1, 'x'],
+    {'display_order': 1},
+])
+def test_decode_cursor_rejects_malformed_values(values):
+    with pytest.raises(QueryParamError):
+        decode_cursor(_cursor(values), CATALOG_KEYSET)
+
+
+def test_decode_cursor_accepts_scalars():
+    assert decode_cursor(_cursor([1, None, 'x']), CATALOG_KEYSET) == (1, None, 'x')
+
+
+@pytest.mark.parametrize('cursor', [_cursor([[1], 'x', 'y']), _cursor([{'a': 1}, 'x', 'y']), 'not-base64!'])
+def test_list_answers_bad_cursor_with_400(client, cursor):
+    response = client.get(f'/api/templates?limit=2&cursor={cursor}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
+
+
+def _walk(client, path):
+    rows, cursor = [], None
+    while True:
+        body = client.get(f'{path}&cursor={cursor}' if cursor else path).get_json()
+        rows.extend(body['data'])
+        cursor = body.get('next_cursor')
+        if not cursor:
+            return rows
+
+
+def test_paging_through_null_keys_matches_the_full_list(client, fake_supabase, monkeypatch):
+    # Ties on display_order fall through to created_at (descending, nullable)
+    templates = [dict(row) for row in fake_supabase.tables['project_templates']]
+    for i, row in enumerate(templates):
+        row['display_order'] = i // 4
+        if i % 3 == 0:
+            row['created_at'] = None
+    monkeypatch.setitem(fake_supabase.tables, 'project_templates', templates)
+
+    everything = client.get('/api/templates').get_json()['data']
+    paged = _walk(client, '/api/templates?limit=2')
+    assert [row['id'] for row in paged] == [row['id'] for row in everything]
+    assert len(paged) == len(templates)
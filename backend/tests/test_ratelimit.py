@@ -0,0 +1,119 @@
+import types
+import pytest
+import ratelimit
+from config import Config
+from ratelimit import ContactRejected, MemoryBackend, client_ip, forget_contact, retry_after_header, throttle_contact
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, 'time', types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def limits(monkeypatch, clock):
+    """A fresh in-memory backend with small, round limits."""
+    monkeypatch.setattr(ratelimit, '_backend', MemoryBackend())
+    for name, value in (
+        ('RATE_LIMIT_ENABLED', True),
+        ('CONTACT_RATE_LIMIT_IP_BURST', 3), ('CONTACT_RATE_LIMIT_IP_PER_HOUR', 3600),
+        ('CONTACT_RATE_LIMIT_EMAIL_BURST', 2), ('CONTACT_RATE_LIMIT_EMAIL_PER_HOUR', 3600),
+        ('CONTACT_DEDUP_SECONDS', 600),
+    ):
+        monkeypatch.setattr(Config, name, value)
+    return clock
+
+
+def test_bucket_spends_its_burst_then_waits(clock):
+    backend = MemoryBackend()
+    assert [backend.take('k', rate=0.5, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert backend.take('k', rate=0.5, burst=3) == pytest.approx(2)
+
+
+def test_bucket_refills_at_its_rate_up_to_the_burst(clock):
+    backend = MemoryBackend()
+    for _ in range(2):
+        backend.take('k', rate=0.5, burst=2)
+    clock.now += 1
+    assert backend.take('k', rate=0.5, burst=2) == pytest.approx(1)
+    clock.now += 1
+    assert backend.take('k', rate=0.5, burst=2) == 0
+
+    # A long idle period refills only up to the burst
+    clock.now += 3600
+    assert [backend.take('k', rate=0.5, burst=2) for _ in range(3)][-1] > 0
+
+
+def test_reset_refills_and_lru_bounds_memory(clock):
+    backend = MemoryBackend(max_keys=2)
+    backend.take('a', rate=0.001, burst=1)
+    backend.reset('a')
+    assert backend.take('a', rate=0.001, burst=1) == 0
+    backend.take('b', rate=0.001, burst=1)
+    backend.take('c', rate=0.001, burst=1)
+    assert len(backend._buckets) == 2 and 'a' not in backend._buckets
+
+
+def test_duplicate_is_rejected_until_the_window_passes(limits):
+    throttle_contact('1.1.1.1', 'Me@Example.com', 'Hello  there')
+    with pytest.raises(ContactRejected) as rejected:
+        throttle_contact('2.2.2.2', ' me@example.com', 'Hello there ')
+    assert rejected.value.status == 409
+    assert rejected.value.retry_after == pytest.approx(600)
+
+    limits.now += 600
+    throttle_contact('2.2.2.2', 'me@example.com', 'Hello there')
+
+
+def test_failed_submission_can_be_retried_at_once(limits):
+    key = throttle_contact('1.1.1.1', 'me@example.com', 'Hello')
+    forget_contact(key)
+    throttle_contact('1.1.1.1', 'me@example.com', 'Hello')
+
+
+def test_rate_limited_message_is_not_counted_as_a_duplicate(limits):
+    throttle_contact('1.1.1.1', 'me@example.com', 'one')
+    throttle_contact('1.1.1.1', 'me@example.com', 'two')
+    with pytest.raises(ContactRejected) as rejected:
+        throttle_contact('1.1.1.1', 'me@example.com', 'three')
+    assert rejected.value.status == 429
+    assert rejected.value.retry_after == pytest.approx(1)
+
+    limits.now += 1
+    throttle_contact('1.1.1.1', 'me@example.com', 'three')
+
+
+def test_ip_bucket_is_shared_across_emails(limits):
+    for n in range(3):
+        throttle_contact('1.1.1.1', f'user{n}@example.com', 'Hello')
+    with pytest.raises(ContactRejected) as rejected:
+        throttle_contact('1.1.1.1', 'user3@example.com', 'Hello')
+    assert rejected.value.status == 429
+
+
+def test_zero_dedup_window_turns_the_check_off(limits, monkeypatch):
+    monkeypatch.setattr(Config, 'CONTACT_DEDUP_SECONDS', 0)
+    assert throttle_contact('1.1.1.1', 'me@example.com', 'Hello') is None
+    assert throttle_contact('1.1.1.1', 'me@example.com', 'Hello') is None
+
+
+@pytest.mark.parametrize('hops, expected', [(0, '10.0.0.9'), (1, '198.51.100.2'), (2, '203.0.113.1'), (5, '6.6.6.6')])
+def test_client_ip_trusts_only_the_configured_hops(app, monkeypatch, hops, expected):
+    monkeypatch.setattr(Config, 'TRUSTED_PROXY_HOPS', hops)
+    headers = {'X-Forwarded-For': '6.6.6.6, 203.0.113.1, 198.51.100.2'}
+    with app.test_request_context('/', headers=headers, environ_base={'REMOTE_ADDR': '10.0.0.9'}):
+        assert client_ip() == expected
+
+
+def test_retry_after_rounds_up_to_whole_seconds():
+    assert [retry_after_header(s) for s in (0, 0.2, 1, 1.5)] == ['1', '1', '1', '2']
@@ -0,0 +1,174 @@
+import asyncio
+import types
+import httpx
+import pytest
+import resilience
+from postgrest.exceptions import APIError
+from config import Config
+from conftest import ADMIN_AUTH
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, SupabaseUnavailable, call, call_async
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience, 'time', types.SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    return clock
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=10)
+    monkeypatch.setattr(resilience, 'breaker', breaker)
+    monkeypatch.setattr(Config, 'SUPABASE_READ_RETRIES', 2)
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures(breaker, clock):
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now += 4
+    with pytest.raises(SupabaseUnavailable) as refused:
+        breaker.before_call()
+    assert refused.value.retry_after == pytest.approx(6)
+
+
+def test_half_open_admits_one_trial(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(SupabaseUnavailable):
+        breaker.before_call()
+
+    # A failed trial reopens the circuit for another cooldown
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.retry_after() == pytest.approx(10)
+
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_released_trial_lets_the_next_call_try(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def _failing(error, calls):
+    def attempt(timeout):
+        calls.append(timeout)
+        raise error
+    return attempt
+
+
+@pytest.mark.parametrize('table, operation, tries', [
+    ('project_templates', 'select', 3),
+    ('project_templates', 'count', 3),
+    ('search_templates', 'rpc', 3),
+    ('project_templates', 'insert', 1),
+    ('project_templates', 'update', 1),
+    ('project_templates', 'delete', 1),
+    ('apply_row_patches', 'rpc', 1),
+])
+def test_only_reads_are_retried(breaker, table, operation, tries):
+    calls = []
+    with pytest.raises(httpx.ConnectError):
+        call(_failing(httpx.ConnectError('down'), calls), table, operation)
+    assert len(calls) == tries
+
+
+def test_retry_succeeds_within_the_deadline(breaker):
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            raise httpx.ReadTimeout('slow')
+        return 'rows'
+
+    assert call(attempt, 'team_members', 'select', deadline=5) == 'rows'
+    assert calls[0] == pytest.approx(5) and calls[1] <= calls[0]
+    assert breaker.state == CLOSED
+
+
+def test_errors_from_a_healthy_supabase_are_not_retried_or_counted(breaker):
+    calls = []
+    for _ in range(5):
+        with pytest.raises(APIError):
+            call(_failing(APIError({'code': '23505', 'message': 'duplicate key'}), calls), 'team_members', 'select')
+    assert len(calls) == 5
+    assert breaker.state == CLOSED
+
+
+def test_open_circuit_refuses_without_calling(breaker):
+    calls = []
+    with pytest.raises(httpx.ConnectError):
+        call(_failing(httpx.ConnectError('down'), calls), 'team_members', 'select')
+    assert breaker.state == OPEN
+    with pytest.raises(SupabaseUnavailable):
+        call(_failing(httpx.ConnectError('down'), calls), 'team_members', 'select')
+    assert len(calls) == 3
+
+
+def test_async_calls_retry_reads_only(breaker, monkeypatch):
+    async def no_wait(delay):
+        pass
+
+    monkeypatch.setattr(resilience.asyncio, 'sleep', no_wait)
+    calls = []
+
+    async def attempt(timeout):
+        calls.append(timeout)
+        raise httpx.ConnectError('down')
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(call_async(attempt, 'project_templates', 'insert'))
+    assert len(calls) == 1
+    breaker.record_success()
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(call_async(attempt, 'project_templates', 'select'))
+    assert len(calls) == 4
+
+
+def test_admin_routes_answer_an_open_circuit_with_503(client, monkeypatch):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+    monkeypatch.setattr(resilience, 'breaker', breaker)
+
+    for response in (
+        client.get('/admin/templates', auth=ADMIN_AUTH),
+        client.put('/admin/team/00000000-0000-0000-0000-000000004e21', json={'name': 'A'}, auth=ADMIN_AUTH),
+        client.delete('/admin/templates/00000000-0000-0000-0000-000000000001', auth=ADMIN_AUTH),
+    ):
+        assert response.status_code == 503
+        assert 25 <= int(response.headers['Retry-After']) <= 30
@@ -0,0 +1,101 @@
+import pytest
+import row_patches
+from conftest import ADMIN_AUTH
+from row_patches import PatchError, coalesce_patches, parse_patch
+
+MEMBER_ID = '00000000-0000-0000-0000-000000004e21'
+OTHER_ID = '00000000-0000-0000-0000-000000004e22'
+UNKNOWN_ID = '00000000-0000-0000-0000-0000000fffff'
+
+
+@pytest.fixture
+def team(fake_supabase, monkeypatch):
+    """A private copy of the team table, so edits don't leak into other tests."""
+    rows = [dict(row) for row in fake_supabase.tables['team_members']]
+    monkeypatch.setitem(fake_supabase.tables, 'team_members', rows)
+    return {row['id']: row for row in rows}
+
+
+def test_parse_patch_drops_read_only_columns():
+    patch = parse_patch('team_members', {'id': MEMBER_ID, 'version': 3, 'updated_at': 'x', 'name': 'A'})
+    assert patch == {'id': MEMBER_ID, 'version': 3, 'changes': {'name': 'A'}}
+
+
+@pytest.mark.parametrize('record, row_id', [
+    ({'name': 'A'}, None),
+    ({'name': 'A'}, 'not-a-uuid'),
+    ({'id': "1' or 1=1", 'name': 'A'}, None),
+    ({'id': MEMBER_ID, 'version': '3'}, None),
+    ({'id': MEMBER_ID, 'version': True}, None),
+    ({'id': MEMBER_ID, 'password': 'x'}, None),
+    (['name'], None),
+])
+def test_parse_patch_rejects_malformed_edits(record, row_id):
+    with pytest.raises(PatchError):
+        parse_patch('team_members', record, row_id)
+
+
+def test_coalesce_keeps_later_values_and_the_first_version():
+    merged = coalesce_patches([
+        {'id': MEMBER_ID, 'version': None, 'changes': {'name': 'A', 'role': 'R'}},
+        {'id': OTHER_ID, 'version': 1, 'changes': {'name': 'O'}},
+        {'id': MEMBER_ID, 'version': 2, 'changes': {'name': 'B'}},
+        {'id': MEMBER_ID, 'version': 5, 'changes': {}},
+    ])
+    assert merged == [
+        {'id': MEMBER_ID, 'version': 2, 'changes': {'name': 'B', 'role': 'R'}},
+        {'id': OTHER_ID, 'version': 1, 'changes': {'name': 'O'}},
+    ]
+
+
+def test_malformed_id_in_url_is_a_400(client):
+    response = client.put('/admin/team/not-a-uuid', json={'name': 'A'}, auth=ADMIN_AUTH)
+    assert response.status_code == 400
+
+
+def _put(client, row_id, body):
+    return client.put(f'/admin/team/{row_id}', json=body, auth=ADMIN_AUTH)
+
+
+def _check_update_rules(client, team):
+    version = team[MEMBER_ID]['version']
+
+    response = _put(client, MEMBER_ID, {'name': 'Renamed', 'version': version})
+    assert response.status_code == 200
+    assert response.get_json()['changed'] == 1
+    assert team[MEMBER_ID]['name'] == 'Renamed' and team[MEMBER_ID]['version'] == version + 1
+
+    # Writing the same values again is a no-op that keeps the version
+    response = _put(client, MEMBER_ID, {'name': 'Renamed', 'version': version + 1})
+    assert response.status_code == 200
+    assert response.get_json()['changed'] == 0
+    assert team[MEMBER_ID]['version'] == version + 1
+
+    # An edit made against the old version is refused with the current row
+    response = _put(client, MEMBER_ID, {'name': 'Lost update', 'version': version})
+    assert response.status_code == 409
+    assert response.get_json()['conflicts'][0]['name'] == 'Renamed'
+    assert team[MEMBER_ID]['name'] == 'Renamed'
+
+    response = _put(client, UNKNOWN_ID, {'name': 'Ghost'})
+    assert response.status_code == 404
+    assert response.get_json()['missing'] == [UNKNOWN_ID]
+
+    # One conflict in a batch blocks the whole batch
+    response = client.patch('/admin/team', json=[
+        {'id': OTHER_ID, 'name': 'Batch', 'version': team[OTHER_ID]['version']},
+        {'id': MEMBER_ID, 'name': 'Batch', 'version': version},
+    ], auth=ADMIN_AUTH)
+    assert response.status_code == 409
+    assert team[OTHER_ID]['name'] != 'Batch'
+
+
+def test_updates_through_apply_row_patches(client, team):
+    _check_update_rules(client, team)
+
+
+def test_updates_without_migration_008_fall_back_to_plain_updates(client, team, fake_supabase, monkeypatch):
+    monkeypatch.setattr(fake_supabase, 'missing_functions', {'apply_row_patches'})
+    monkeypatch.setattr(row_patches, '_rpc_missing', False)
+    _check_update_rules(client, team)
+    assert row_patches._rpc_missing
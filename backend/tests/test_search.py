@@ -0,0 +1,80 @@
+import pytest
+from pagination import (
+    DIFFICULTIES, MAX_SEARCH_LENGTH, QueryParamError, parse_choice_arg, parse_list_arg, parse_offset, parse_search_text
+)
+
+
+def _search(client, query):
+    response = client.get(f'/api/templates/search?{query}')
+    assert response.status_code == 200
+    return response.get_json()['data']
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('q=%20%20Flask%20%20%20API%20', 'flask api'),
+    ('q=%20%20', None),
+    ('', None),
+])
+def test_search_text_is_normalised(app, query, expected):
+    with app.test_request_context(f'/?{query}'):
+        assert parse_search_text() == expected
+
+
+def test_search_text_length_is_capped(app):
+    with app.test_request_context(f"/?q={'a' * (MAX_SEARCH_LENGTH + 1)}"):
+        with pytest.raises(QueryParamError):
+            parse_search_text()
+
+
+@pytest.mark.parametrize('query, expected', [('tags=python,%20react,,python', ('python', 'react')), ('tags=', None), ('', None)])
+def test_tags_are_deduplicated_and_sorted(app, query, expected):
+    with app.test_request_context(f'/?{query}'):
+        assert parse_list_arg('tags') == expected
+
+
+@pytest.mark.parametrize('query, expected', [('', 0), ('offset=20', 20)])
+def test_offset(app, query, expected):
+    with app.test_request_context(f'/?{query}'):
+        assert parse_offset() == expected
+
+
+@pytest.mark.parametrize('query', ['offset=-1', 'offset=two'])
+def test_bad_offset_is_rejected(app, query):
+    with app.test_request_context(f'/?{query}'):
+        with pytest.raises(QueryParamError):
+            parse_offset()
+
+
+@pytest.mark.parametrize('query, expected', [('', None), ('difficulty=Advanced', 'Advanced')])
+def test_difficulty(app, query, expected):
+    with app.test_request_context(f'/?{query}'):
+        assert parse_choice_arg('difficulty', DIFFICULTIES) == expected
+
+
+@pytest.mark.parametrize('query', ['difficulty=Expert', 'difficulty=beginner'])
+def test_unknown_difficulty_is_rejected(app, query):
+    with app.test_request_context(f'/?{query}'):
+        with pytest.raises(QueryParamError):
+            parse_choice_arg('difficulty', DIFFICULTIES)
+
+
+def test_search_pages_with_limit_and_offset(client):
+    first = _search(client, 'q=template&limit=3')
+    second = _search(client, 'q=template&limit=3&offset=3')
+    assert first['total'] == second['total'] == 10
+    assert len(first['results']) == len(second['results']) == 3
+    assert not {row['id'] for row in first['results']} & {row['id'] for row in second['results']}
+
+
+def test_search_filters_and_facets(client):
+    data = _search(client, 'tags=python&difficulty=Beginner')
+    assert data['results'] and all('python' in row['tags'] and row['difficulty'] == 'Beginner' for row in data['results'])
+    # Difficulty counts ignore the difficulty filter, so every option shows what it would give
+    unfiltered = _search(client, 'tags=python')
+    assert data['facets']['difficulty'] == unfiltered['facets']['difficulty']
+    assert {'tag': 'python', 'count': data['total']} in data['facets']['tags']
+
+
+@pytest.mark.parametrize('query', ['offset=-1', 'difficulty=Expert', 'limit=0', f"q={'a' * (MAX_SEARCH_LENGTH + 1)}"])
+def test_search_answers_bad_parameters_with_400(client, query):
+    assert client.get(f'/api/templates/search?{query}').status_code == 400
@@ -2,7 +2,8 @@ import { ExternalLink } from "lucide-react";
 import { Card, CardContent } from "@/components/ui/card";
 import { useIsMobile } from "@/hooks/use-mobile";
 import { useState, useRef, useEffect } from "react";
-import { fetchPortfolio, PortfolioProject } from "@/lib/api";
+import { fetchHomeBundle, PortfolioProject } from "@/lib/api";
+import { responsiveImage } from "@/lib/utils";
 import projectImage1 from "@/assets/project-dashboard-1.png";
 import projectImage2 from "@/assets/project-dashboard-2.png";
 import projectImage3 from "@/assets/project-dashboard-3.png";
@@ -23,7 +24,7 @@ const PortfolioSection = () => {
   useEffect(() => {
     const loadPortfolio = async () => {
       try {
-        const data = await fetchPortfolio();
+        const data = (await fetchHomeBundle()).portfolio || [];
         setProjects(data);
         setCardOrder(data.map((_, i) => i));
       } catch (error) {
@@ -149,7 +150,7 @@ const PortfolioSection = () => {
                   {/* Image - Top */}
                   <div className="relative aspect-video overflow-hidden flex-shrink-0">
                     <img
-                      src={getProjectImage(project, projectIndex)}
+                      {...responsiveImage(getProjectImage(project, projectIndex), "100vw")}
                       alt={project.title}
                       className="w-full h-full object-cover"
                     />
@@ -206,7 +207,7 @@ const PortfolioSection = () => {
                 >
                   <div className="relative aspect-video overflow-hidden">
                     <img
-                      src={getProjectImage(project, index)}
+                      {...responsiveImage(getProjectImage(project, index), "(min-width: 640px) 380px, 320px")}
                       alt={project.title}
                       className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-105"
                     />
@@ -243,7 +244,7 @@ const PortfolioSection = () => {
                 >
                   <div className="relative aspect-video overflow-hidden">
                     <img
-                      src={getProjectImage(project, index)}
+                      {...responsiveImage(getProjectImage(project, index), "(min-width: 640px) 380px, 320px")}
                       alt={project.title}
                       className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-105"
                     />
@@ -1,7 +1,8 @@
 import { Github, Linkedin } from "lucide-react";
 import { useIsMobile } from "@/hooks/use-mobile";
 import { useState, useRef, useEffect } from "react";
-import { fetchTeam, TeamMember } from "@/lib/api";
+import { fetchHomeBundle, TeamMember } from "@/lib/api";
+import { responsiveImage } from "@/lib/utils";
 
 const TeamSection = () => {
   const isMobile = useIsMobile();
@@ -16,7 +17,7 @@ const TeamSection = () => {
   useEffect(() => {
     const loadTeam = async () => {
       try {
-        const data = await fetchTeam();
+        const data = (await fetchHomeBundle()).team || [];
         setTeam(data);
         setCardOrder(data.map((_, i) => i));
       } catch (error) {
@@ -152,7 +153,7 @@ const TeamSection = () => {
                   {/* Avatar */}
                   {member.avatar_url ? (
                     <img
-                      src={member.avatar_url}
+                      {...responsiveImage(member.avatar_url, "80px")}
                       alt={member.name}
                       className="w-16 h-16 rounded-2xl mb-4 object-cover"
                     />
@@ -217,7 +218,7 @@ const TeamSection = () => {
                   {/* Avatar */}
                   {member.avatar_url ? (
                     <img
-                      src={member.avatar_url}
+                      {...responsiveImage(member.avatar_url, "80px")}
                       alt={member.name}
                       className="w-20 h-20 rounded-2xl mb-4 object-cover"
                     />
@@ -1,6 +1,7 @@
 import { useState, useRef } from "react";
 import { Upload, X, Loader2, ImageIcon } from "lucide-react";
 import { Button } from "@/components/ui/button";
+import { getAuthHeader } from "@/lib/adminAuth";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
@@ -17,11 +18,6 @@ const ImageUpload = ({ value, onChange, bucket = "images", folder = "" }: ImageU
     const [error, setError] = useState<string | null>(null);
     const fileInputRef = useRef<HTMLInputElement>(null);
 
-    const getAuthHeader = () => {
-        const auth = localStorage.getItem('admin_auth');
-        return auth ? { 'Authorization': `Basic ${auth}` } : {};
-    };
-
     const handleFileUpload = async (file: File) => {
         if (!file.type.startsWith('image/')) {
             setError('Please select an image file');
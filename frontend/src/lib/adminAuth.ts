@@ -0,0 +1,83 @@
+// Admin authentication: Basic credentials are exchanged for a short-lived
+// session token (POST /admin/session), which is sent as a Bearer token so
+// the backend checks an HMAC instead of the password hash on every call.
+
+const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
+
+const CREDENTIALS_KEY = 'admin_auth';
+const SESSION_KEY = 'admin_session';
+
+// Renew this long before expiry so in-flight requests don't race it
+const RENEW_MARGIN_MS = 30_000;
+
+interface AdminSession {
+    token: string;
+    expiresAt: number;
+}
+
+let renewing: Promise<boolean> | null = null;
+
+function readSession(): AdminSession | null {
+    try {
+        const raw = sessionStorage.getItem(SESSION_KEY);
+        return raw ? (JSON.parse(raw) as AdminSession) : null;
+    } catch {
+        return null;
+    }
+}
+
+/**
+ * Exchange Basic credentials (base64 "user:password") for a session token.
+ * Returns false if the backend rejects them.
+ */
+export async function startAdminSession(basic: string): Promise<boolean> {
+    const response = await fetch(`${API_BASE_URL}/admin/session`, {
+        method: 'POST',
+        headers: { 'Authorization': `Basic ${basic}` },
+    });
+    if (!response.ok) {
+        return false;
+    }
+    const data: { token: string; expires_in: number } = await response.json();
+    sessionStorage.setItem(SESSION_KEY, JSON.stringify({
+        token: data.token,
+        expiresAt: Date.now() + data.expires_in * 1000,
+    }));
+    localStorage.setItem(CREDENTIALS_KEY, basic);
+    return true;
+}
+
+export function clearAdminSession(): void {
+    sessionStorage.removeItem(SESSION_KEY);
+    localStorage.removeItem(CREDENTIALS_KEY);
+}
+
+export function hasAdminCredentials(): boolean {
+    return localStorage.getItem(CREDENTIALS_KEY) !== null;
+}
+
+/**
+ * Authorization header for admin API calls.
+ *
+ * Uses the session token while it is valid; otherwise falls back to Basic
+ * credentials for this call and renews the session in the background.
+ */
+export function getAuthHeader(json = false): Record<string, string> {
+    const headers: Record<string, string> = json ? { 'Content-Type': 'application/json' } : {};
+    const session = readSession();
+    if (session && session.expiresAt - Date.now() > RENEW_MARGIN_MS) {
+        headers['Authorization'] = `Bearer ${session.token}`;
+        return headers;
+    }
+    const basic = localStorage.getItem(CREDENTIALS_KEY);
+    if (!basic) {
+        return {};
+    }
+    headers['Authorization'] = `Basic ${basic}`;
+    if (!renewing) {
+        renewing = startAdminSession(basic)
+            .catch(() => false)
+            .finally(() => { renewing = null; });
+    }
+    return headers;
+}
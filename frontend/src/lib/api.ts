@@ -64,14 +64,75 @@ export async function fetchPortfolio(): Promise<PortfolioProject[]> {
     return result.data || [];
 }
 
-// Fetch project templates
-export async function fetchTemplates(): Promise<ProjectTemplate[]> {
-    const response = await fetch(`${API_BASE}/templates`);
-    const result: ApiResponse<ProjectTemplate[]> = await response.json();
+// Server-side filters, projection and keyset paging for template lists
+export interface TemplateQuery {
+    difficulty?: ProjectTemplate['difficulty'];
+    tags?: string[];
+    featured?: boolean;
+    fields?: (keyof ProjectTemplate)[];
+    limit?: number;
+    cursor?: string;
+}
+
+export interface TemplatePage {
+    data: ProjectTemplate[];
+    nextCursor: string | null;
+}
+
+function templateQueryString(query: TemplateQuery): string {
+    const params = new URLSearchParams();
+    if (query.difficulty) params.set('difficulty', query.difficulty);
+    if (query.tags?.length) params.set('tags', query.tags.join(','));
+    if (query.featured !== undefined) params.set('featured', String(query.featured));
+    if (query.fields?.length) params.set('fields', query.fields.join(','));
+    if (query.limit) params.set('limit', String(query.limit));
+    if (query.cursor) params.set('cursor', query.cursor);
+    const qs = params.toString();
+    return qs ? `?${qs}` : '';
+}
+
+// Fetch one page of project templates
+export async function fetchTemplatesPage(query: TemplateQuery = {}): Promise<TemplatePage> {
+    const response = await fetch(`${API_BASE}/templates${templateQueryString(query)}`);
+    const result: ApiResponse<ProjectTemplate[]> & { next_cursor?: string | null } = await response.json();
     if (!result.success) {
         throw new Error(result.error || 'Failed to fetch templates');
     }
-    return result.data || [];
+    return { data: result.data || [], nextCursor: result.next_cursor ?? null };
+}
+
+// Ranked template search with difficulty and tag facets
+export interface TemplateSearchQuery {
+    q?: string;
+    difficulty?: ProjectTemplate['difficulty'];
+    tags?: string[];
+    limit?: number;
+    offset?: number;
+}
+
+export interface TemplateSearchResult {
+    results: (ProjectTemplate & { rank: number })[];
+    total: number;
+    facets: {
+        difficulty: Partial<Record<ProjectTemplate['difficulty'], number>>;
+        tags: { tag: string; count: number }[];
+    };
+}
+
+export async function searchTemplates(query: TemplateSearchQuery = {}): Promise<TemplateSearchResult> {
+    const params = new URLSearchParams();
+    if (query.q) params.set('q', query.q);
+    if (query.difficulty) params.set('difficulty', query.difficulty);
+    if (query.tags?.length) params.set('tags', query.tags.join(','));
+    if (query.limit) params.set('limit', String(query.limit));
+    if (query.offset) params.set('offset', String(query.offset));
+    const qs = params.toString();
+    const response = await fetch(`${API_BASE}/templates/search${qs ? `?${qs}` : ''}`);
+    const result: ApiResponse<TemplateSearchResult> = await response.json();
+    if (!result.success || !result.data) {
+        throw new Error(result.error || 'Failed to search templates');
+    }
+    return result.data;
 }
 
 // Fetch team members
@@ -84,6 +145,39 @@ export async function fetchTeam(): Promise<TeamMember[]> {
     return result.data || [];
 }
 
+// Collections available from /api/bundle
+export interface HomeBundle {
+    portfolio: PortfolioProject[];
+    team: TeamMember[];
+    templates: ProjectTemplate[];
+}
+
+export type BundleCollection = keyof HomeBundle;
+
+const HOME_COLLECTIONS: BundleCollection[] = ['portfolio', 'team'];
+let homeBundleRequest: Promise<Partial<HomeBundle>> | null = null;
+
+// Fetch several collections in one request
+export async function fetchBundle(include: BundleCollection[]): Promise<Partial<HomeBundle>> {
+    const response = await fetch(`${API_BASE}/bundle?include=${include.join(',')}`);
+    const result: ApiResponse<Partial<HomeBundle>> = await response.json();
+    if (!result.success) {
+        throw new Error(result.error || 'Failed to fetch bundle');
+    }
+    return result.data || {};
+}
+
+// Fetch the home page collections. Sections that mount together share one
+// in-flight request instead of each calling its own endpoint.
+export function fetchHomeBundle(): Promise<Partial<HomeBundle>> {
+    if (!homeBundleRequest) {
+        homeBundleRequest = fetchBundle(HOME_COLLECTIONS).finally(() => {
+            homeBundleRequest = null;
+        });
+    }
+    return homeBundleRequest;
+}
+
 // Submit contact form
 export async function submitContact(data: ContactFormData): Promise<void> {
     const response = await fetch(`${API_BASE}/contact`, {
@@ -4,3 +4,30 @@ import { twMerge } from "tailwind-merge";
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs));
 }
+
+// Uploads from /admin/upload are stored as `<prefix>/<width>.<format>` in each
+// of these widths (IMAGE_VARIANT_WIDTHS on the backend). A narrower source is
+// not upscaled: it has one variant at its own width instead of the larger ones.
+const IMAGE_VARIANT_WIDTHS = [320, 640, 1280];
+const IMAGE_VARIANT_PATTERN = /\/(\d+)\.(webp|avif)(\?[^/]*)?$/;
+
+/**
+ * Build `src`/`srcSet`/`sizes` props for an image URL. Uploaded variants get a
+ * srcset so the browser downloads the smallest adequate width; any other URL
+ * (bundled assets, external links) is passed through unchanged.
+ *
+ * The stored URL is the largest variant, so the srcset is the configured
+ * widths below it plus its own.
+ */
+export function responsiveImage(url: string, sizes: string) {
+  const match = url.match(IMAGE_VARIANT_PATTERN);
+  if (!match) {
+    return { src: url };
+  }
+  const [, largestWidth, format, query = ""] = match;
+  const largest = Number(largestWidth);
+  const srcSet = [...IMAGE_VARIANT_WIDTHS.filter((width) => width < largest), largest]
+    .map((width) => `${url.replace(IMAGE_VARIANT_PATTERN, `/${width}.${format}${query}`)} ${width}w`)
+    .join(", ");
+  return { src: url, srcSet, sizes };
+}
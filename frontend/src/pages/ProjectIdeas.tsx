@@ -1,14 +1,16 @@
-import { useState, useEffect } from "react";
-import { ArrowRight, ExternalLink, FileText, ChevronUp, ChevronLeft, ChevronRight } from "lucide-react";
+import { useState, useEffect, useRef } from "react";
+import { ArrowRight, ExternalLink, FileText, ChevronUp, ChevronLeft, ChevronRight, Search, X } from "lucide-react";
 import { Link } from "react-router-dom";
 import Navbar from "@/components/Navbar";
 import Footer from "@/components/Footer";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
+import { Input } from "@/components/ui/input";
 import { useContactModal } from "@/contexts/ContactModalContext";
 import { useIsMobile } from "@/hooks/use-mobile";
 import TechSpecsModal from "@/components/TechSpecsModal";
-import { fetchTemplates, ProjectTemplate } from "@/lib/api";
+import { fetchTemplatesPage, searchTemplates, ProjectTemplate, TemplateSearchResult } from "@/lib/api";
+import { responsiveImage } from "@/lib/utils";
 import { toast } from "sonner";
 import projectImage1 from "@/assets/project-dashboard-1.png";
 import projectImage2 from "@/assets/project-dashboard-2.png";
@@ -20,6 +22,11 @@ const fallbackImages = [projectImage1, projectImage2, projectImage3];
 // Items per page
 const ITEMS_PER_PAGE = 8;
 
+const DIFFICULTIES: ProjectTemplate["difficulty"][] = ["Beginner", "Intermediate", "Advanced"];
+
+// Tag chips offered from the search facets
+const MAX_TAG_FILTERS = 10;
+
 const getDifficultyColor = (difficulty: string) => {
   switch (difficulty) {
     case "Beginner":
@@ -41,27 +48,106 @@ const ProjectIdeas = () => {
   const [expandedCardId, setExpandedCardId] = useState<string | null>(null);
   const [modalProject, setModalProject] = useState<ProjectTemplate | null>(null);
   const [currentPage, setCurrentPage] = useState(1);
+  // Keyset cursors: pageCursors.current[i] loads page i + 1. Pages are
+  // fetched one at a time, so only pages up to the next one are known.
+  const pageCursors = useRef<(string | undefined)[]>([undefined]);
+  const [knownPages, setKnownPages] = useState(1);
+  // Search and filters: any of these switches the grid to /templates/search,
+  // which pages by offset and reports a total plus difficulty/tag facets.
+  const [searchInput, setSearchInput] = useState("");
+  const [searchText, setSearchText] = useState("");
+  const [difficulty, setDifficulty] = useState<ProjectTemplate["difficulty"] | undefined>();
+  const [selectedTags, setSelectedTags] = useState<string[]>([]);
+  const [searchResult, setSearchResult] = useState<TemplateSearchResult | null>(null);
+  const isSearching = !!searchText || !!difficulty || selectedTags.length > 0;
+  // The API takes tags comma-separated, so this also keys the fetch effect
+  const tagKey = selectedTags.join(",");
+
+  // Debounce typing into the search box
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      const text = searchInput.trim();
+      if (text !== searchText) {
+        setSearchText(text);
+        setCurrentPage(1);
+      }
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchInput, searchText]);
 
-  // Fetch templates on mount
+  // Fetch the current page
   useEffect(() => {
+    let cancelled = false;
     const loadTemplates = async () => {
+      setIsLoading(true);
       try {
-        const data = await fetchTemplates();
-        setTemplates(data);
+        if (isSearching) {
+          const result = await searchTemplates({
+            q: searchText || undefined,
+            difficulty,
+            tags: tagKey ? tagKey.split(",") : [],
+            limit: ITEMS_PER_PAGE,
+            offset: (currentPage - 1) * ITEMS_PER_PAGE,
+          });
+          if (cancelled) return;
+          setTemplates(result.results);
+          setSearchResult(result);
+        } else {
+          const page = await fetchTemplatesPage({ limit: ITEMS_PER_PAGE, cursor: pageCursors.current[currentPage - 1] });
+          if (cancelled) return;
+          setTemplates(page.data);
+          setSearchResult(null);
+          if (page.nextCursor) {
+            pageCursors.current[currentPage] = page.nextCursor;
+          }
+          setKnownPages(pageCursors.current.length);
+        }
       } catch (error) {
         console.error("Failed to load templates:", error);
+        if (!cancelled && isSearching) {
+          toast.error("Search is unavailable right now. Please try again later.");
+        }
       } finally {
-        setIsLoading(false);
+        if (!cancelled) setIsLoading(false);
       }
     };
     loadTemplates();
-  }, []);
+    return () => {
+      cancelled = true;
+    };
+  }, [currentPage, isSearching, searchText, difficulty, tagKey]);
 
-  // Calculate pagination
-  const totalPages = Math.ceil(templates.length / ITEMS_PER_PAGE);
+  // Calculate pagination: search knows its total, browsing only the pages
+  // reached so far
+  const searchTotal = searchResult?.total ?? 0;
+  const totalPages = isSearching ? Math.max(1, Math.ceil(searchTotal / ITEMS_PER_PAGE)) : knownPages;
+  const hasMorePages = !isSearching && knownPages > currentPage;
   const startIndex = (currentPage - 1) * ITEMS_PER_PAGE;
-  const endIndex = startIndex + ITEMS_PER_PAGE;
-  const currentTemplates = templates.slice(startIndex, endIndex);
+  const endIndex = startIndex + templates.length;
+  const totalLabel = isSearching ? searchTotal : endIndex;
+  const tagOptions = Array.from(new Set([
+    ...selectedTags,
+    ...(searchResult?.facets.tags ?? []).slice(0, MAX_TAG_FILTERS).map((facet) => facet.tag),
+  ]));
+
+  // Filter changes start again from the first page
+  const selectDifficulty = (value: ProjectTemplate["difficulty"] | undefined) => {
+    setDifficulty(difficulty === value ? undefined : value);
+    setCurrentPage(1);
+  };
+
+  const toggleTag = (tag: string) => {
+    setSelectedTags(selectedTags.includes(tag) ? selectedTags.filter((t) => t !== tag) : [...selectedTags, tag]);
+    setCurrentPage(1);
+  };
+
+  const clearFilters = () => {
+    setSearchInput("");
+    setSearchText("");
+    setDifficulty(undefined);
+    setSelectedTags([]);
+    setCurrentPage(1);
+  };
 
   // Handle page change
   const goToPage = (page: number) => {
@@ -165,8 +251,10 @@ const ProjectIdeas = () => {
           <div className="glass-card rounded-xl p-4 sm:p-6 flex flex-col sm:flex-row items-center justify-between gap-4">
             <div className="flex items-center gap-4 sm:gap-8">
               <div className="text-center">
-                <div className="text-xl sm:text-2xl font-bold text-primary">{templates.length || '—'}</div>
-                <div className="text-xs text-muted-foreground">Templates</div>
+                <div className="text-xl sm:text-2xl font-bold text-primary">
+                  {totalLabel ? `${totalLabel}${hasMorePages ? '+' : ''}` : '—'}
+                </div>
+                <div className="text-xs text-muted-foreground">{isSearching ? 'Matches' : 'Templates'}</div>
               </div>
               <div className="w-px h-8 bg-border" />
               <div className="text-center">
@@ -183,6 +271,65 @@ const ProjectIdeas = () => {
               Request Custom Project
             </Button>
           </div>
+
+          {/* Search and facet filters */}
+          <div className="glass-card rounded-xl p-4 sm:p-6 mt-4 flex flex-col gap-4">
+            <div className="relative">
+              <Search size={16} className="absolute left-3 top-1/2 -translate-y-1/2 text-muted-foreground" />
+              <Input
+                type="search"
+                value={searchInput}
+                onChange={(e) => setSearchInput(e.target.value)}
+                placeholder="Search templates by title, description or tech..."
+                maxLength={200}
+                className="pl-9 min-h-[44px]"
+                aria-label="Search templates"
+              />
+            </div>
+            <div className="flex flex-wrap items-center gap-2">
+              <Button
+                variant={difficulty ? "outline" : "default"}
+                size="sm"
+                onClick={() => selectDifficulty(undefined)}
+              >
+                All levels
+              </Button>
+              {DIFFICULTIES.map((level) => {
+                const count = searchResult?.facets.difficulty[level];
+                return (
+                  <Button
+                    key={level}
+                    variant={difficulty === level ? "default" : "outline"}
+                    size="sm"
+                    onClick={() => selectDifficulty(level)}
+                  >
+                    {level}{searchResult ? ` (${count ?? 0})` : ''}
+                  </Button>
+                );
+              })}
+              {isSearching && (
+                <Button variant="ghost" size="sm" className="gap-1 ml-auto" onClick={clearFilters}>
+                  <X size={14} />
+                  Clear
+                </Button>
+              )}
+            </div>
+            {tagOptions.length > 0 && (
+              <div className="flex flex-wrap gap-1.5">
+                {tagOptions.map((tag) => (
+                  <button
+                    key={tag}
+                    type="button"
+                    onClick={() => toggleTag(tag)}
+                    className={`tech-badge text-xs ${selectedTags.includes(tag) ? 'border-primary text-primary' : ''}`}
+                    aria-pressed={selectedTags.includes(tag)}
+                  >
+                    {tag}
+                  </button>
+                ))}
+              </div>
+            )}
+          </div>
         </div>
       </section>
 
@@ -193,14 +340,14 @@ const ProjectIdeas = () => {
             <div className="flex justify-center py-12">
               <div className="animate-pulse text-muted-foreground">Loading templates...</div>
             </div>
-          ) : templates.length === 0 ? (
+          ) : templates.length === 0 && currentPage === 1 ? (
             <div className="text-center py-12 text-muted-foreground">
-              No templates available yet. Check back soon!
+              {isSearching ? "No templates match your search." : "No templates available yet. Check back soon!"}
             </div>
           ) : (
             <>
               <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
-                {currentTemplates.map((project, index) => {
+                {templates.map((project, index) => {
                   const isExpanded = expandedCardId === project.id;
                   const absoluteIndex = startIndex + index;
 
@@ -212,7 +359,7 @@ const ProjectIdeas = () => {
                       {/* Image Container - 16:9 aspect ratio */}
                       <div className="relative aspect-video overflow-hidden">
                         <img
-                          src={getTemplateImage(project, absoluteIndex)}
+                          {...responsiveImage(getTemplateImage(project, absoluteIndex), "(min-width: 1280px) 25vw, (min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw")}
                           alt={project.title}
                           className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-105"
                         />
@@ -335,7 +482,7 @@ const ProjectIdeas = () => {
               {/* Page Info */}
               {totalPages > 1 && (
                 <div className="text-center mt-4 text-sm text-muted-foreground">
-                  Showing {startIndex + 1}-{Math.min(endIndex, templates.length)} of {templates.length} templates
+                  Showing {startIndex + 1}-{endIndex}{hasMorePages ? '' : ` of ${totalLabel}`} templates
                 </div>
               )}
             </>
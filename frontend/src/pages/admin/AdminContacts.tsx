@@ -1,14 +1,10 @@
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useInfiniteQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { Trash2, Mail, Phone, Check, Eye } from "lucide-react";
 import { Button } from "@/components/ui/button";
+import { getAuthHeader } from "@/lib/adminAuth";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
-const getAuthHeader = () => {
-    const auth = localStorage.getItem('admin_auth');
-    return auth ? { 'Authorization': `Basic ${auth}`, 'Content-Type': 'application/json' } : {};
-};
-
 interface ContactSubmission {
     id: string;
     name: string;
@@ -23,20 +19,28 @@ interface ContactSubmission {
 const AdminContacts = () => {
     const queryClient = useQueryClient();
 
-    const { data: contacts = [], isLoading } = useQuery<ContactSubmission[]>({
+    // Contacts are served newest-first in keyset-paginated pages
+    const { data, isLoading, hasNextPage, fetchNextPage, isFetchingNextPage } = useInfiniteQuery({
         queryKey: ['admin', 'contacts'],
-        queryFn: async () => {
-            const res = await fetch(`${API_BASE_URL}/admin/contacts`, { headers: getAuthHeader() });
-            const data = await res.json();
-            return data.data || [];
+        queryFn: async ({ pageParam }: { pageParam: string | null }) => {
+            const params = pageParam ? `?cursor=${encodeURIComponent(pageParam)}` : '';
+            const res = await fetch(`${API_BASE_URL}/admin/contacts${params}`, { headers: getAuthHeader(true) });
+            const result = await res.json();
+            return {
+                data: (result.data || []) as ContactSubmission[],
+                nextCursor: (result.next_cursor ?? null) as string | null,
+            };
         },
+        initialPageParam: null as string | null,
+        getNextPageParam: (lastPage) => lastPage.nextCursor,
     });
+    const contacts = data?.pages.flatMap((page) => page.data) ?? [];
 
     const markReadMutation = useMutation({
         mutationFn: async (id: string) => {
             const res = await fetch(`${API_BASE_URL}/admin/contacts/${id}/read`, {
                 method: 'PUT',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
             });
             return res.json();
         },
@@ -49,7 +53,7 @@ const AdminContacts = () => {
         mutationFn: async (id: string) => {
             const res = await fetch(`${API_BASE_URL}/admin/contacts/${id}`, {
                 method: 'DELETE',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
             });
             return res.json();
         },
@@ -83,7 +87,7 @@ const AdminContacts = () => {
                 <div>
                     <h1 className="text-3xl font-bold mb-2">Contact Submissions</h1>
                     <p className="text-muted-foreground">
-                        {contacts.length} total submissions
+                        {contacts.length}{hasNextPage ? '+' : ''} submissions
                         {unreadCount > 0 && (
                             <span className="ml-2 px-2 py-0.5 bg-destructive text-destructive-foreground text-xs rounded-full">
                                 {unreadCount} unread
@@ -176,6 +180,17 @@ const AdminContacts = () => {
                             </div>
                         </div>
                     ))}
+                    {hasNextPage && (
+                        <div className="text-center pt-4">
+                            <Button
+                                variant="outline"
+                                onClick={() => fetchNextPage()}
+                                disabled={isFetchingNextPage}
+                            >
+                                {isFetchingNextPage ? 'Loading...' : 'Load more'}
+                            </Button>
+                        </div>
+                    )}
                 </div>
             )}
         </div>
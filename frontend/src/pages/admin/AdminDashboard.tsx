@@ -7,58 +7,43 @@ import {
     TrendingUp
 } from "lucide-react";
 import { Link } from "react-router-dom";
+import { getAuthHeader } from "@/lib/adminAuth";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
-const getAuthHeader = () => {
-    const auth = localStorage.getItem('admin_auth');
-    return auth ? { 'Authorization': `Basic ${auth}` } : {};
-};
+interface DashboardStats {
+    templates: number;
+    portfolio: number;
+    team: number;
+    contacts: { total: number; unread: number };
+    recent_contacts: {
+        id: string;
+        name: string;
+        email: string;
+        message: string;
+        is_read: boolean;
+        submitted_at: string;
+    }[];
+}
 
 const AdminDashboard = () => {
-    // Fetch counts for dashboard
-    const { data: templates } = useQuery({
-        queryKey: ['admin', 'templates'],
-        queryFn: async () => {
-            const res = await fetch(`${API_BASE_URL}/admin/templates`, { headers: getAuthHeader() });
-            const data = await res.json();
-            return data.data || [];
-        },
-    });
-
-    const { data: portfolio } = useQuery({
-        queryKey: ['admin', 'portfolio'],
-        queryFn: async () => {
-            const res = await fetch(`${API_BASE_URL}/admin/portfolio`, { headers: getAuthHeader() });
-            const data = await res.json();
-            return data.data || [];
-        },
-    });
-
-    const { data: team } = useQuery({
-        queryKey: ['admin', 'team'],
-        queryFn: async () => {
-            const res = await fetch(`${API_BASE_URL}/admin/team`, { headers: getAuthHeader() });
-            const data = await res.json();
-            return data.data || [];
-        },
-    });
-
-    const { data: contacts } = useQuery({
-        queryKey: ['admin', 'contacts'],
+    // Counts and recent contacts are computed server-side in one request
+    const { data: dashboard } = useQuery<DashboardStats | null>({
+        queryKey: ['admin', 'stats'],
         queryFn: async () => {
-            const res = await fetch(`${API_BASE_URL}/admin/contacts`, { headers: getAuthHeader() });
+            const res = await fetch(`${API_BASE_URL}/admin/stats`, { headers: getAuthHeader() });
             const data = await res.json();
-            return data.data || [];
+            return data.data ?? null;
         },
     });
 
-    const unreadContacts = contacts?.filter((c: any) => !c.is_read)?.length || 0;
+    const unreadContacts = dashboard?.contacts.unread || 0;
+    const recentContacts = dashboard?.recent_contacts || [];
 
     const stats = [
         {
             label: 'Project Templates',
-            count: templates?.length || 0,
+            count: dashboard?.templates || 0,
             icon: FolderKanban,
             color: 'text-primary',
             bgColor: 'bg-primary/10',
@@ -66,7 +51,7 @@ const AdminDashboard = () => {
         },
         {
             label: 'Portfolio Projects',
-            count: portfolio?.length || 0,
+            count: dashboard?.portfolio || 0,
             icon: Briefcase,
             color: 'text-secondary',
             bgColor: 'bg-secondary/10',
@@ -74,7 +59,7 @@ const AdminDashboard = () => {
         },
         {
             label: 'Team Members',
-            count: team?.length || 0,
+            count: dashboard?.team || 0,
             icon: Users,
             color: 'text-blue-500',
             bgColor: 'bg-blue-500/10',
@@ -82,7 +67,7 @@ const AdminDashboard = () => {
         },
         {
             label: 'Contact Submissions',
-            count: contacts?.length || 0,
+            count: dashboard?.contacts.total || 0,
             icon: MessageSquare,
             color: 'text-amber-500',
             bgColor: 'bg-amber-500/10',
@@ -135,9 +120,9 @@ const AdminDashboard = () => {
                     </Link>
                 </div>
 
-                {contacts && contacts.length > 0 ? (
+                {recentContacts.length > 0 ? (
                     <div className="space-y-3">
-                        {contacts.slice(0, 5).map((contact: any) => (
+                        {recentContacts.map((contact) => (
                             <div
                                 key={contact.id}
                                 className={`p-4 rounded-lg border ${contact.is_read ? 'border-border bg-muted/30' : 'border-primary/30 bg-primary/5'}`}
@@ -11,8 +11,7 @@ import {
     LogOut
 } from "lucide-react";
 import { Button } from "@/components/ui/button";
-
-const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
+import { clearAdminSession, hasAdminCredentials, startAdminSession } from "@/lib/adminAuth";
 
 interface AdminLayoutProps {
     children?: React.ReactNode;
@@ -26,26 +25,14 @@ const AdminLayout = ({ children }: AdminLayoutProps) => {
 
     // Check if user is authenticated
     useEffect(() => {
-        const storedAuth = localStorage.getItem('admin_auth');
-        if (storedAuth) {
-            setIsAuthenticated(true);
-        } else {
-            setIsAuthenticated(false);
-        }
+        setIsAuthenticated(hasAdminCredentials());
     }, []);
 
     const handleLogin = async (e: React.FormEvent) => {
         e.preventDefault();
         try {
-            // Test authentication with the API
-            const response = await fetch(`${API_BASE_URL}/admin/templates`, {
-                headers: {
-                    'Authorization': 'Basic ' + btoa(`${credentials.username}:${credentials.password}`)
-                }
-            });
-
-            if (response.ok) {
-                localStorage.setItem('admin_auth', btoa(`${credentials.username}:${credentials.password}`));
+            // Exchange the credentials for a session token
+            if (await startAdminSession(btoa(`${credentials.username}:${credentials.password}`))) {
                 setIsAuthenticated(true);
             } else {
                 alert('Invalid credentials');
@@ -57,7 +44,7 @@ const AdminLayout = ({ children }: AdminLayoutProps) => {
     };
 
     const handleLogout = () => {
-        localStorage.removeItem('admin_auth');
+        clearAdminSession();
         setIsAuthenticated(false);
     };
 
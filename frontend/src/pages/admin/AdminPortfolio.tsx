@@ -5,14 +5,10 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Textarea } from "@/components/ui/textarea";
 import ImageUpload from "@/components/admin/ImageUpload";
+import { getAuthHeader } from "@/lib/adminAuth";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
-const getAuthHeader = () => {
-    const auth = localStorage.getItem('admin_auth');
-    return auth ? { 'Authorization': `Basic ${auth}`, 'Content-Type': 'application/json' } : {};
-};
-
 interface PortfolioProject {
     id: string;
     title: string;
@@ -22,6 +18,7 @@ interface PortfolioProject {
     live_link: string | null;
     is_featured: boolean;
     display_order?: number;
+    version?: number; // Sent back on update so concurrent edits get a 409
 }
 
 const emptyProject: Partial<PortfolioProject> = {
@@ -44,7 +41,7 @@ const AdminPortfolio = () => {
     const { data: projects = [], isLoading } = useQuery<PortfolioProject[]>({
         queryKey: ['admin', 'portfolio'],
         queryFn: async () => {
-            const res = await fetch(`${API_BASE_URL}/admin/portfolio`, { headers: getAuthHeader() });
+            const res = await fetch(`${API_BASE_URL}/admin/portfolio`, { headers: getAuthHeader(true) });
             const data = await res.json();
             return data.data || [];
         },
@@ -54,7 +51,7 @@ const AdminPortfolio = () => {
         mutationFn: async (project: Partial<PortfolioProject>) => {
             const res = await fetch(`${API_BASE_URL}/admin/portfolio`, {
                 method: 'POST',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
                 body: JSON.stringify(project),
             });
             return res.json();
@@ -69,22 +66,26 @@ const AdminPortfolio = () => {
         mutationFn: async ({ id, ...project }: Partial<PortfolioProject> & { id: string }) => {
             const res = await fetch(`${API_BASE_URL}/admin/portfolio/${id}`, {
                 method: 'PUT',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
                 body: JSON.stringify(project),
             });
+            if (res.status === 409) {
+                throw new Error('This project was changed elsewhere since you opened it. Close the editor, reopen it and try again.');
+            }
             return res.json();
         },
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['admin', 'portfolio'] });
             closeModal();
         },
+        onError: (error: Error) => alert(error.message),
     });
 
     const deleteMutation = useMutation({
         mutationFn: async (id: string) => {
             const res = await fetch(`${API_BASE_URL}/admin/portfolio/${id}`, {
                 method: 'DELETE',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
             });
             return res.json();
         },
@@ -97,7 +98,7 @@ const AdminPortfolio = () => {
         mutationFn: async (order: string[]) => {
             const res = await fetch(`${API_BASE_URL}/admin/portfolio/reorder`, {
                 method: 'POST',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
                 body: JSON.stringify({ order }),
             });
             return res.json();
@@ -5,14 +5,10 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Textarea } from "@/components/ui/textarea";
 import ImageUpload from "@/components/admin/ImageUpload";
+import { getAuthHeader } from "@/lib/adminAuth";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
-const getAuthHeader = () => {
-    const auth = localStorage.getItem('admin_auth');
-    return auth ? { 'Authorization': `Basic ${auth}`, 'Content-Type': 'application/json' } : {};
-};
-
 interface TeamMember {
     id: string;
     name: string;
@@ -24,6 +20,7 @@ interface TeamMember {
     linkedin_url: string | null;
     color_theme: 'primary' | 'secondary';
     display_order: number;
+    version?: number; // Sent back on update so concurrent edits get a 409
 }
 
 const emptyMember: Partial<TeamMember> = {
@@ -47,7 +44,7 @@ const AdminTeam = () => {
     const { data: members = [], isLoading } = useQuery<TeamMember[]>({
         queryKey: ['admin', 'team'],
         queryFn: async () => {
-            const res = await fetch(`${API_BASE_URL}/admin/team`, { headers: getAuthHeader() });
+            const res = await fetch(`${API_BASE_URL}/admin/team`, { headers: getAuthHeader(true) });
             const data = await res.json();
             return data.data || [];
         },
@@ -57,7 +54,7 @@ const AdminTeam = () => {
         mutationFn: async (member: Partial<TeamMember>) => {
             const res = await fetch(`${API_BASE_URL}/admin/team`, {
                 method: 'POST',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
                 body: JSON.stringify(member),
             });
             return res.json();
@@ -72,22 +69,26 @@ const AdminTeam = () => {
         mutationFn: async ({ id, ...member }: Partial<TeamMember> & { id: string }) => {
             const res = await fetch(`${API_BASE_URL}/admin/team/${id}`, {
                 method: 'PUT',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
                 body: JSON.stringify(member),
             });
+            if (res.status === 409) {
+                throw new Error('This team member was changed elsewhere since you opened it. Close the editor, reopen it and try again.');
+            }
             return res.json();
         },
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['admin', 'team'] });
             closeModal();
         },
+        onError: (error: Error) => alert(error.message),
     });
 
     const deleteMutation = useMutation({
         mutationFn: async (id: string) => {
             const res = await fetch(`${API_BASE_URL}/admin/team/${id}`, {
                 method: 'DELETE',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
             });
             return res.json();
         },
@@ -5,14 +5,10 @@ import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Textarea } from "@/components/ui/textarea";
 import ImageUpload from "@/components/admin/ImageUpload";
+import { getAuthHeader } from "@/lib/adminAuth";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
-const getAuthHeader = () => {
-    const auth = localStorage.getItem('admin_auth');
-    return auth ? { 'Authorization': `Basic ${auth}`, 'Content-Type': 'application/json' } : {};
-};
-
 interface Template {
     id: string;
     title: string;
@@ -23,6 +19,7 @@ interface Template {
     live_preview_url: string | null;
     is_featured: boolean;
     display_order?: number;
+    version?: number; // Sent back on update so concurrent edits get a 409
 }
 
 const emptyTemplate: Partial<Template> = {
@@ -47,7 +44,7 @@ const AdminTemplates = () => {
     const { data: templates = [], isLoading } = useQuery<Template[]>({
         queryKey: ['admin', 'templates'],
         queryFn: async () => {
-            const res = await fetch(`${API_BASE_URL}/admin/templates`, { headers: getAuthHeader() });
+            const res = await fetch(`${API_BASE_URL}/admin/templates`, { headers: getAuthHeader(true) });
             const data = await res.json();
             return data.data || [];
         },
@@ -58,7 +55,7 @@ const AdminTemplates = () => {
         mutationFn: async (template: Partial<Template>) => {
             const res = await fetch(`${API_BASE_URL}/admin/templates`, {
                 method: 'POST',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
                 body: JSON.stringify(template),
             });
             return res.json();
@@ -74,15 +71,19 @@ const AdminTemplates = () => {
         mutationFn: async ({ id, ...template }: Partial<Template> & { id: string }) => {
             const res = await fetch(`${API_BASE_URL}/admin/templates/${id}`, {
                 method: 'PUT',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
                 body: JSON.stringify(template),
             });
+            if (res.status === 409) {
+                throw new Error('This template was changed elsewhere since you opened it. Close the editor, reopen it and try again.');
+            }
             return res.json();
         },
         onSuccess: () => {
             queryClient.invalidateQueries({ queryKey: ['admin', 'templates'] });
             closeModal();
         },
+        onError: (error: Error) => alert(error.message),
     });
 
     // Delete mutation
@@ -90,7 +91,7 @@ const AdminTemplates = () => {
         mutationFn: async (id: string) => {
             const res = await fetch(`${API_BASE_URL}/admin/templates/${id}`, {
                 method: 'DELETE',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
             });
             return res.json();
         },
@@ -104,7 +105,7 @@ const AdminTemplates = () => {
         mutationFn: async (order: string[]) => {
             const res = await fetch(`${API_BASE_URL}/admin/templates/reorder`, {
                 method: 'POST',
-                headers: getAuthHeader(),
+                headers: getAuthHeader(true),
                 body: JSON.stringify({ order }),
             });
             return res.json();